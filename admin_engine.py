@@ -1,28 +1,37 @@
 import streamlit as st
-import pandas as pd
-import os
-from match_engine import find_matches
-
-USER_FILE = "data/users.csv"
-MATCH_FILE = "data/matches.csv"
+import storage
+import match_worker
 
 def show_engine_tab():
     st.markdown("### ⚙️ Run AI Matching Engine")
 
-    if not os.path.exists(USER_FILE):
+    if not storage.exists("users"):
         st.warning("User file not found.")
         return
 
     if st.button("🔄 Re-run AI Matching"):
-        user_df = pd.read_csv(USER_FILE)
+        user_df = storage.load("users")
 
         # Ensure required columns exist
         if not {"Name", "Email", "CanTeach", "WantsToLearn", "Role"}.issubset(user_df.columns):
             st.error("❌ Required user fields missing. Please check your CSV.")
             return
 
-        matches = find_matches(user_df, threshold=0.6, show_progress=True)
-        pd.DataFrame(matches).to_csv(MATCH_FILE, index=False)
+        job_id = match_worker.request_rematch()
+        st.session_state["rematch_job"] = job_id
+        st.success(f"✅ Re-matching queued as job #{job_id}. New matches appear once it is done.")
+
+    show_job_status()
 
-        st.success("✅ Matches re-generated and saved.")
-        st.dataframe(pd.DataFrame(matches))
+def show_job_status():
+    """Status of the last re-match requested here, plus the recent job queue."""
+    if "rematch_job" in st.session_state:
+        job = match_worker.job_status(st.session_state["rematch_job"])
+        if job is not None:
+            st.info(f"Job #{job['id']}: {job['status']}" + (f" — {job['result']}" if job["result"] else ""))
+            if job["status"] == "running" and job["progress"] is not None:
+                st.progress(job["progress"], text="Encoding skills")
+            if job["error"]:
+                st.error(job["error"])
+    st.markdown("#### Recent matching jobs")
+    st.dataframe(match_worker.recent_jobs())
@@ -0,0 +1,30 @@
+import streamlit as st
+import pandas as pd
+import metrics
+
+def show_performance_tab():
+    st.markdown("### ⚡ Performance")
+
+    if not metrics.ENABLED:
+        st.info("ℹ️ Metrics are off. Start the app with GETSKILLED_METRICS=1 to record timings.")
+        return
+
+    runs = metrics.recent_runs()
+    if not runs:
+        st.info("ℹ️ No runs recorded yet.")
+        return
+
+    st.subheader("🕒 Recent Runs")
+    st.dataframe(pd.DataFrame([
+        {"Started": run["started"], "Page": run["label"], "Wall (ms)": run["wall_ms"]} for run in runs
+    ]))
+
+    st.subheader("📊 Timers and Counters")
+    table = pd.DataFrame(metrics.summary_table(runs))
+    if table.empty:
+        st.info("ℹ️ No timers were hit in the recorded runs.")
+        return
+    totals = table.groupby("name").agg(
+        calls=("calls", "sum"), total_ms=("total_ms", "sum"), max_ms=("max_ms", "max")
+    ).sort_values("total_ms", ascending=False)
+    st.dataframe(totals)
@@ -1,14 +1,13 @@
 import streamlit as st
-import pandas as pd
-import os
-
-RATINGS_FILE = "data/ratings.csv"
+import storage
+import ratings_store
 
 def show_ratings_tab():
     st.markdown("### 🌟 Submitted Ratings")
     
-    if os.path.exists(RATINGS_FILE):
-        ratings_df = pd.read_csv(RATINGS_FILE)
+    if storage.exists("ratings"):
+        # Live ratings, one row per (learner, teacher), as the averages use
+        ratings_df = ratings_store.get_store().table()
         st.dataframe(ratings_df)
     else:
         st.info("No ratings file found yet.")
@@ -1,29 +1,48 @@
 import streamlit as st
 import pandas as pd
-import os
+from datetime import datetime, timedelta
+import storage
+import snapshot
 
-USER_FILE = "data/users.csv"
-MATCH_FILE = "data/matches.csv"
+SUMMARY_TABLES = ("users", "matches", "study_log")
+
+def match_status(all_users, matches):
+    """Users with a normalised name and a Paired/Unpaired ``Match Status`` column."""
+    all_users = all_users.copy()
+    all_users["Name"] = all_users["Name"].astype(str).str.strip().str.lower()
+    matched_names = pd.concat([
+        matches["Learner"].astype(str).str.lower(),
+        matches["Teacher"].astype(str).str.lower(),
+    ])
+    all_users["Match Status"] = all_users["Name"].isin(matched_names).map({True: "Paired", False: "Unpaired"})
+    return all_users
+
+def show_skill_chart():
+    """Matches per skill, read from the snapshot (``show_summary_tab`` refreshes it)."""
+    matches = snapshot.load("matches", ["Skill"])
+    if matches.empty:
+        st.info("ℹ️ No match data available.")
+        return
+    skill_counts = matches["Skill"].value_counts().reset_index()
+    skill_counts.columns = ["Skill", "Matches"]
+    st.bar_chart(skill_counts.set_index("Skill"))
+    st.metric("Learners", len(matches))
 
 def show_summary_tab():
     st.markdown("### 📋 User Match Summary")
 
-    if not os.path.exists(USER_FILE):
+    if not storage.exists("users"):
         st.warning("User file not found.")
         return
 
-    all_users = pd.read_csv(USER_FILE)
-    all_users["Name"] = all_users["Name"].astype(str).str.strip().str.lower()
-
-    if os.path.exists(MATCH_FILE):
-        matches = pd.read_csv(MATCH_FILE)
-        matches["Learner"] = matches["Learner"].astype(str).str.lower()
-        matches["Teacher"] = matches["Teacher"].astype(str).str.lower()
+    # Columns are projected from the Parquet snapshot; stale tables are
+    # brought up to date first (only changed partitions are rewritten)
+    snapshot.export(SUMMARY_TABLES)
 
-        matched_names = set(matches["Learner"]) | set(matches["Teacher"])
-        all_users["Match Status"] = all_users["Name"].apply(
-            lambda n: "Paired" if n in matched_names else "Unpaired"
-        )
+    if storage.exists("matches"):
+        all_users = match_status(*snapshot.user_match_status([
+            "Name", "Email", "Gender", "SkillLevel", "Role", "CanTeach", "WantsToLearn", "Timestamp"
+        ]))
 
         st.subheader("📊 All Users with Match Status")
         st.dataframe(all_users[[
@@ -39,3 +58,7 @@ def show_summary_tab():
         ]])
     else:
         st.info("No match data available.")
+
+    if storage.exists("study_log"):
+        st.subheader("📚 Study Minutes (Last 7 Days)")
+        st.dataframe(snapshot.study_minutes_since(datetime.now() - timedelta(days=7)))
@@ -1,13 +1,11 @@
 import streamlit as st
-import pandas as pd
-import os
-from sentence_transformers import SentenceTransformer, util
-from match_engine import find_matches
+from admin_engine import show_job_status
+import match_worker
 from utils import safe_load_users
-from constants import USER_FILE, RATINGS_FILE, MATCH_FILE
-
-# Load model globally
-model = SentenceTransformer('all-MiniLM-L6-v2')
+import storage
+import cache
+import ratings_store
+from match_confidence import paired_view
 
 def admin_dashboard():
     st.subheader("🔐 Admin Panel")
@@ -26,17 +24,17 @@ def admin_dashboard():
                 st.markdown("### 👥 Manage User Data")
                 if st.button("🧹 Clean & Format User Data"):
                     users = safe_load_users()
-                    users.to_csv(USER_FILE, index=False)
+                    storage.save("users", users)
                     st.success("✅ Data cleaned and saved successfully.")
 
-                if os.path.exists(USER_FILE):
-                    st.dataframe(pd.read_csv(USER_FILE))
+                if storage.exists("users"):
+                    st.dataframe(cache.load("users"))
 
             # --- RATINGS ---
             with tab2:
                 st.markdown("### 🌟 Submitted Ratings")
-                if os.path.exists(RATINGS_FILE):
-                    ratings_df = pd.read_csv(RATINGS_FILE)
+                if storage.exists("ratings"):
+                    ratings_df = ratings_store.get_store().table()
                     st.dataframe(ratings_df)
                 else:
                     st.info("No ratings file found yet.")
@@ -44,38 +42,11 @@ def admin_dashboard():
             # --- MATCHES ---
             with tab3:
                 st.markdown("### 🤝 AI-Matched Pairs")
-                if os.path.exists(MATCH_FILE):
-                    matches = pd.read_csv(MATCH_FILE)
-                    paired_users = []
-
-                    for _, row in matches.iterrows():
-                        try:
-                            learner = row["Learner"]
-                            teacher = row["Teacher"]
-                            skill = row.get("Skill", "")
-
-                            learner_embed = model.encode(learner, convert_to_tensor=True)
-                            teacher_embed = model.encode(teacher, convert_to_tensor=True)
-                            skill_embed = model.encode(skill, convert_to_tensor=True)
-
-                            match_score = (
-                                util.pytorch_cos_sim(learner_embed, skill_embed).item() +
-                                util.pytorch_cos_sim(teacher_embed, skill_embed).item()
-                            ) / 2
-                            confidence = round(match_score * 100, 2)
-
-                            paired_users.append({
-                                "User": learner.title(), "Paired With": teacher.title(),
-                                "Role": "Learner", "Skill": skill, "AI Confidence": confidence
-                            })
-                            paired_users.append({
-                                "User": teacher.title(), "Paired With": learner.title(),
-                                "Role": "Teacher", "Skill": skill, "AI Confidence": confidence
-                            })
-                        except KeyError:
-                            st.warning("⚠️ Missing 'Skill' field in some match records.")
-
-                    paired_df = pd.DataFrame(paired_users)
+                if storage.exists("matches"):
+                    matches = cache.load("matches")
+                    if "Skill" not in matches.columns:
+                        st.warning("⚠️ Missing 'Skill' field in some match records.")
+                    paired_df = paired_view(matches)
                     st.dataframe(paired_df)
                 else:
                     st.info("No match data available yet.")
@@ -83,13 +54,12 @@ def admin_dashboard():
             # --- AI MATCH ENGINE ---
             with tab4:
                 st.markdown("### ⚙️ Run AI Matching Engine")
-                if os.path.exists(USER_FILE):
+                if storage.exists("users"):
                     if st.button("🔄 Re-run AI Matching"):
-                        user_df = pd.read_csv(USER_FILE)
-                        matches = find_matches(user_df, threshold=0.6, show_progress=True)
-                        pd.DataFrame(matches).to_csv(MATCH_FILE, index=False)
-                        st.success("✅ Matches re-generated and saved.")
-                        st.dataframe(pd.DataFrame(matches))
+                        job_id = match_worker.request_rematch()
+                        st.session_state["rematch_job"] = job_id
+                        st.success(f"✅ Re-matching queued as job #{job_id}. New matches appear once it is done.")
+                    show_job_status()
                 else:
                     st.warning("User file not found.")
 
@@ -97,13 +67,13 @@ def admin_dashboard():
             with tab5:
                 st.markdown("### 📋 User Match Summary")
 
-                if os.path.exists(USER_FILE):
-                    all_users = pd.read_csv(USER_FILE)
+                if storage.exists("users"):
+                    all_users = cache.load("users")
                     all_users["Name"] = all_users["Name"].astype(str).str.strip().str.lower()
 
                     matched_names = set()
-                    if os.path.exists(MATCH_FILE):
-                        matches = pd.read_csv(MATCH_FILE)
+                    if storage.exists("matches"):
+                        matches = cache.load("matches")
                         matches["Learner"] = matches["Learner"].astype(str).str.lower()
                         matches["Teacher"] = matches["Teacher"].astype(str).str.lower()
                         matched_names = set(matches["Learner"]) | set(matches["Teacher"])
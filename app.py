@@ -3,13 +3,19 @@
 import streamlit as st
 import pandas as pd
 import os
-import time
 from datetime import datetime
-from match_engine import find_matches, display_learner_match, get_unmatched_learners
-from habit_tracker import load_users, get_study_targets, simulate_checkins, log_study_activity
+from match_engine import display_learner_match
+from habit_tracker import load_users, get_study_targets, simulate_checkins, log_study_activity, TARGET_FILE
+import storage
+import cache
+import user_directory
+import match_worker
+import metrics
+from admin_performance import show_performance_tab
+from admin_summary import show_skill_chart, show_summary_tab
 
 try:
-    from rating import load_ratings, save_rating, add_rating, get_average_ratings, generate_study_targets
+    from rating import load_ratings, save_rating, add_rating, get_average_ratings
 except Exception as e:
     import traceback
     print("Import Error in rating.py:", traceback.format_exc())
@@ -21,6 +27,9 @@ MATCH_FILE = os.path.join(DATA_DIR, "matches.csv")
 UNMATCHED_FILE = os.path.join(DATA_DIR, "unmatched.csv")
 RATINGS_FILE = os.path.join(DATA_DIR, "ratings.csv")
 
+# Timers and counters for this rerun (no-op unless GETSKILLED_METRICS=1)
+metrics.begin_run()
+
 st.set_page_config(page_title="GetSkilled", layout="centered")
 st.title("💡 GetSkilled Platform")
 st.markdown(
@@ -28,40 +37,53 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-@st.cache_data(show_spinner=True)
-def load_data(file_path):
-    return pd.read_csv(file_path) if os.path.exists(file_path) else pd.DataFrame()
+# Cached until the underlying data is written, so reruns that only change
+# widgets do no file I/O and no model calls
+def load_data(table):
+    return cache.load(table)
+
+@cache.cached("users")
+def load_users_cached():
+    return load_users()
+
+@cache.cached("ratings")
+def load_ratings_cached():
+    return load_ratings()
+
+@cache.cached("ratings")
+def get_average_ratings_cached():
+    return get_average_ratings()
+
+@cache.cached("users", TARGET_FILE)
+def get_study_targets_cached():
+    # Only users whose skills or study days changed are re-scored
+    return get_study_targets(load_users_cached())
 
 os.makedirs(DATA_DIR, exist_ok=True)
 
-if not os.path.exists(UNMATCHED_FILE):
-    pd.DataFrame(columns=["Name", "WantsToLearn", "Reason"]).to_csv(UNMATCHED_FILE, index=False)
+if not storage.exists("unmatched"):
+    storage.save("unmatched", pd.DataFrame(columns=["Name", "WantsToLearn", "Reason"]))
 
 # Load data
-users_df = load_users()
-ratings_df = load_ratings()
-study_targets = generate_study_targets(users_df)
-
-# Match unmatched users
-unmatched_users = users_df[users_df["IsMatched"] == False] if "IsMatched" in users_df.columns else users_df
-if not unmatched_users.empty:
-    matched_df, unmatched_names_df = find_matches(users_df, threshold=0.6)
-    if not matched_df.empty and "Learner" in matched_df.columns:
-        users_df.loc[users_df["Name"].isin(matched_df["Learner"]), "IsMatched"] = True
-    users_df.to_csv(USER_FILE, index=False)
-    matched_df.to_csv(MATCH_FILE, index=False)
-    if isinstance(unmatched_names_df, pd.DataFrame):
-        unmatched_names_df.to_csv(UNMATCHED_FILE, index=False)
-    else:
-        st.warning("⚠️ Unmatched data is not a DataFrame. Skipping save.")
-
-else:
-    matched_df = load_data(MATCH_FILE)
-    unmatched_names_df = load_data(UNMATCHED_FILE)
+users_df = load_users_cached()
+ratings_df = load_ratings_cached()
+study_targets = get_study_targets_cached()
+
+# Matching runs in the background worker; pages only read published results.
+# An empty match file is bootstrapped with one queued full match.
+match_worker.ensure_started()
+if not storage.exists("matches") and not match_worker.pending_count(match_worker.REMATCH):
+    match_worker.request_rematch()
+matched_df = load_data("matches")
+unmatched_names_df = load_data("unmatched")
 
 # --- Sidebar ---
 menu = st.sidebar.selectbox("Menu", ["Home", "Admin"])
 st.sidebar.markdown("---")
+if "match_job" in st.session_state:
+    job = match_worker.job_status(st.session_state["match_job"])
+    if job is not None:
+        st.sidebar.caption(f"🤖 Matching job #{job['id']}: {job['status']}")
 st.sidebar.markdown("""
 <div style='margin-top:30px; font-weight:bold;'>
     <i>GetSkilled is an AI-powered platform that connects learners with expert teachers in data analysis. 
@@ -79,7 +101,7 @@ if menu == "Admin":
     if login_button:
         if admin_username == "admin" and admin_password == "admin123":
             st.success("✅ Login successful! Welcome, Admin.")
-            tab1, tab2, tab3, tab4 = st.tabs(["📋 User Data", "⭐ Ratings", "🔗 Matches", "📈 Match Summary"])
+            tab1, tab2, tab3, tab4, tab5 = st.tabs(["📋 User Data", "⭐ Ratings", "🔗 Matches", "📈 Match Summary", "⚡ Performance"])
 
             with tab1:
                 st.subheader("👥 Registered Users")
@@ -89,7 +111,7 @@ if menu == "Admin":
                 st.subheader("⭐ User Ratings")
                 st.dataframe(ratings_df)
                 st.subheader("📊 Average Ratings")
-                st.dataframe(get_average_ratings())
+                st.dataframe(get_average_ratings_cached())
 
             with tab3:
                 st.subheader("🔗 Matches")
@@ -98,15 +120,14 @@ if menu == "Admin":
                 st.dataframe(unmatched_names_df)
 
             with tab4:
+                # Read from the Parquet snapshot, refreshed first when stale
+                show_summary_tab()
                 st.subheader("📈 Match Summary by Skill")
-                if not matched_df.empty and "Skill" in matched_df.columns:
-                    skill_counts = matched_df["Skill"].value_counts().reset_index()
-                    skill_counts.columns = ["Skill", "Matches"]
-                    st.bar_chart(skill_counts.set_index("Skill"))
-                    st.metric("Learners", len(matched_df))
-                    st.metric("Unmatched", len(unmatched_names_df))
-                else:
-                    st.info("ℹ️ No match data available.")
+                show_skill_chart()
+                st.metric("Unmatched", len(unmatched_names_df))
+
+            with tab5:
+                show_performance_tab()
         else:
             st.error("❌ Invalid admin credentials.")
 
@@ -121,23 +142,19 @@ elif menu == "Home":
             submit_login = st.form_submit_button("Login")
 
         if submit_login:
-            users_df["Name"] = users_df["Name"].astype(str)
-            user_row = users_df[users_df["Name"].str.strip().str.lower() == name_input]
-            if not user_row.empty:
-                user_actual_name = user_row.iloc[0]["Name"]
+            directory = user_directory.get_directory()
+            user_row = directory.find_user(name_input)
+            if user_row is not None:
+                user_actual_name = str(user_row["Name"])
                 st.success(f"✅ Welcome back, {user_actual_name.title()}!")
                 st.balloons()
 
-                # Reload matched_df
-                matched_df = load_data(MATCH_FILE)
-
                 tab1, tab2, tab3 = st.tabs(["🤖 AI Match Engine", "📈 Study Progress", "⭐ Rate Your Match"])
 
                 with tab1:
                     st.subheader("Your AI Match Result")
-                    matched_row = matched_df[matched_df["Learner"].str.strip().str.lower() == name_input]
-                    if not matched_row.empty:
-                        match = matched_row.iloc[0]
+                    match = directory.match_for(name_input)
+                    if match is not None:
                         st.success(f"🎉 You’ve been matched with **{match['Teacher']}** to learn **{match['Skill']}**")
                         st.markdown(f"🧠 *{match['Explanation']}*")
                         st.info(f"Confidence Score: **{match['AI_Confidence (%)']}%**")
@@ -159,7 +176,7 @@ elif menu == "Home":
                     st.subheader("⭐ Rate Your Match")
                     rating = st.slider("Rate your match", 1, 5)
                     if st.button("Submit Rating"):
-                        teacher_name = matched_row.iloc[0]["Teacher"] if not matched_row.empty else "N/A"
+                        teacher_name = match["Teacher"] if match is not None else "N/A"
                         add_rating(user_actual_name, teacher_name, rating)
                         st.success("✅ Rating submitted successfully!")
             else:
@@ -186,11 +203,10 @@ elif menu == "Home":
             submit_register = st.form_submit_button("Register")
 
         if submit_register:
-            email_column = users_df["Email"].astype(str).str.lower().fillna("")
-            if email.lower() in email_column.values:
+            if user_directory.get_directory().email_exists(email):
                 st.warning("⚠️ This email is already registered. Try logging in.")
             else:
-                new_user = pd.DataFrame([{
+                new_user = {
                     "Name": name,
                     "Email": email,
                     "Role": role,
@@ -204,23 +220,12 @@ elif menu == "Home":
                     "Reason": "",
                     "Date": datetime.now(),
                     "IsMatched": False
-                }])
-
-                users_df = pd.concat([users_df, new_user], ignore_index=True)
-                users_df.to_csv(USER_FILE, index=False)
-
-                matched_df, unmatched_names_df = find_matches(users_df, threshold=0.6)
+                }
 
-                if not matched_df.empty and "Learner" in matched_df.columns:
-                    users_df.loc[users_df["Name"].isin(matched_df["Learner"]), "IsMatched"] = True
-
-                users_df.to_csv(USER_FILE, index=False)
-                matched_df.to_csv(MATCH_FILE, index=False)
-                unmatched_names_df.to_csv(UNMATCHED_FILE, index=False)
+                st.session_state["match_job"] = match_worker.register_user(new_user)
+                user_directory.invalidate()
 
                 st.success("✅ Registration successful! You’ll be matched shortly. Please login to see details.")
                 st.balloons()
-                time.sleep(5.5)
-                st.rerun()
-
 
+metrics.end_run(menu)
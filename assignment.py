@@ -0,0 +1,110 @@
+# assignment.py
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+def optimal_assignment(learner_codes, teacher_codes, teacher_capacity, skill_scores, threshold=0.6):
+    """Maximise total confidence subject to each teacher's capacity.
+
+    Every learner with skill ``i`` scores the same against every teacher with
+    skill ``j``, so the problem is solved at skill level: a transportation
+    problem whose supplies are learner counts per skill and whose demands are
+    summed teacher capacities per skill.  Its size depends on the number of
+    distinct skills, not users, and disconnected skill blocks are solved
+    independently.  The integer flows are then handed out to learners and
+    teachers in row order, spreading load round-robin across teachers.
+
+    ``learner_codes``/``teacher_codes`` index rows/columns of ``skill_scores``.
+    Returns ``(learner_idx, teacher_idx, score)`` arrays.
+    """
+    learner_codes = np.asarray(learner_codes, dtype=np.intp)
+    teacher_codes = np.asarray(teacher_codes, dtype=np.intp)
+    teacher_capacity = np.asarray(teacher_capacity, dtype=np.int64)
+    n_learn, n_teach = skill_scores.shape
+
+    supply = np.bincount(learner_codes, minlength=n_learn)
+    demand = np.bincount(teacher_codes, weights=teacher_capacity, minlength=n_teach).astype(np.int64)
+
+    eligible = (skill_scores >= threshold) & (skill_scores > 0)
+    eligible &= (supply[:, None] > 0) & (demand[None, :] > 0)
+    rows, cols = np.nonzero(eligible)
+    empty = np.array([], dtype=np.intp)
+    if rows.size == 0:
+        return empty, empty, np.array([], dtype=np.float32)
+
+    # --- Split the skill graph into independent blocks ---
+    graph = coo_matrix((np.ones(rows.size), (rows, cols + n_learn)),
+                       shape=(n_learn + n_teach, n_learn + n_teach))
+    _, labels = connected_components(graph, directed=False)
+    edge_block = labels[rows]
+
+    flows = np.zeros(rows.size, dtype=np.int64)
+    for block in np.unique(edge_block):
+        edges = np.nonzero(edge_block == block)[0]
+        flows[edges] = _solve_block(rows[edges], cols[edges], skill_scores[rows[edges], cols[edges]],
+                                    supply, demand)
+
+    # --- Hand the skill-level flows out to individual users ---
+    learner_queues = _queues_by_code(learner_codes, np.ones(len(learner_codes), dtype=np.int64), n_learn)
+    teacher_queues = _queues_by_code(teacher_codes, teacher_capacity, n_teach)
+    learner_pos = np.zeros(n_learn, dtype=np.intp)
+    teacher_pos = np.zeros(n_teach, dtype=np.intp)
+
+    out_learners, out_teachers, out_scores = [], [], []
+    for edge in np.nonzero(flows)[0]:
+        i, j, k = rows[edge], cols[edge], flows[edge]
+        out_learners.append(learner_queues[i][learner_pos[i]:learner_pos[i] + k])
+        out_teachers.append(teacher_queues[j][teacher_pos[j]:teacher_pos[j] + k])
+        out_scores.append(np.full(k, skill_scores[i, j], dtype=np.float32))
+        learner_pos[i] += k
+        teacher_pos[j] += k
+
+    if not out_learners:
+        return empty, empty, np.array([], dtype=np.float32)
+    learner_idx = np.concatenate(out_learners)
+    order = np.argsort(learner_idx, kind="stable")
+    return learner_idx[order], np.concatenate(out_teachers)[order], np.concatenate(out_scores)[order]
+
+
+def _solve_block(rows, cols, scores, supply, demand):
+    """Integer max-weight transportation flow for one connected block of skills."""
+    learn_ids, learn_inv = np.unique(rows, return_inverse=True)
+    teach_ids, teach_inv = np.unique(cols, return_inverse=True)
+    n_edges = rows.size
+
+    # One-to-one blocks need no solver: send as much as both sides allow
+    if n_edges == 1:
+        return np.array([min(supply[rows[0]], demand[cols[0]])], dtype=np.int64)
+
+    edge_range = np.arange(n_edges)
+    a_learn = coo_matrix((np.ones(n_edges), (learn_inv, edge_range)), shape=(learn_ids.size, n_edges))
+    a_teach = coo_matrix((np.ones(n_edges), (teach_inv, edge_range)), shape=(teach_ids.size, n_edges))
+    constraints = [
+        LinearConstraint(a_learn, 0, supply[learn_ids]),
+        LinearConstraint(a_teach, 0, demand[teach_ids]),
+    ]
+    result = milp(
+        c=-np.asarray(scores, dtype=np.float64),
+        constraints=constraints,
+        integrality=np.ones(n_edges),
+        bounds=Bounds(0, np.inf),
+    )
+    if not result.success:
+        raise RuntimeError(f"Assignment solver failed: {result.message}")
+    return np.rint(result.x).astype(np.int64)
+
+
+def _queues_by_code(codes, capacity, n_codes):
+    """Row indices per code, each row repeated ``capacity`` times round-robin."""
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(n_codes + 1))
+    queues = []
+    for code in range(n_codes):
+        members = order[bounds[code]:bounds[code + 1]]
+        caps = capacity[members]
+        rounds = int(caps.max()) if members.size else 0
+        queues.append(np.concatenate([members[caps > r] for r in range(rounds)]) if rounds else members)
+    return queues
@@ -0,0 +1,3 @@
+# Benchmarks for the matching and habit pipelines.
+#
+# Run from the repository root, e.g. ``python -m benchmarks.assignment``.
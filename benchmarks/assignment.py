@@ -0,0 +1,52 @@
+# benchmarks/assignment.py
+#
+# Greedy vs globally optimal learner-teacher assignment:
+#     python -m benchmarks.assignment --sizes 1000 10000 --capacity 3
+
+import argparse
+import json
+import time
+
+import pandas as pd
+
+from match_engine import match_users
+from benchmarks.synthetic import make_users
+
+
+def _summarise(matches, elapsed):
+    df = pd.DataFrame(matches)
+    if df.empty:
+        return {"seconds": round(elapsed, 4), "matched": 0, "total_score": 0.0, "max_teacher_load": 0}
+    return {
+        "seconds": round(elapsed, 4),
+        "matched": len(df),
+        "total_score": round(float(df["AI_Confidence (%)"].sum()) / 100, 4),
+        "max_teacher_load": int(df["Teacher"].value_counts().max()),
+    }
+
+
+def run(sizes, capacity=1, threshold=0.6, seed=0):
+    results = []
+    for n in sizes:
+        users = make_users(n, seed=seed)
+        row = {"users": n, "capacity": capacity}
+        for mode in ("vectorized", "optimal"):
+            start = time.perf_counter()
+            matches, _ = match_users(users, threshold, mode=mode, capacity=capacity)
+            row[mode] = _summarise(matches, time.perf_counter() - start)
+        results.append(row)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Greedy vs optimal assignment benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--capacity", type=int, default=1)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.sizes, args.capacity, args.threshold, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bulk_encoder.py
+#
+# Throughput of bulk encoding as worker processes are added:
+#     python -m benchmarks.bulk_encoder --texts 20000 --workers 1 2 4 8
+#
+# Every run starts from an empty embedding cache in its own temporary
+# directory. One worker is the in-process path (the model using all torch
+# threads); more workers use the process pool. Speedup and per-worker
+# efficiency are relative to the one-worker run, so near-linear scaling
+# shows up as efficiency close to 1.
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import bulk_encoder
+import embedding_store
+from benchmarks.synthetic import free_text_skills
+
+
+def make_texts(n):
+    """``n`` distinct skill phrases."""
+    phrases = free_text_skills()
+    return [f"{phrases[i % len(phrases)]} level {i // len(phrases)}" for i in range(n)]
+
+
+def run(n_texts, worker_counts, chunk_size=bulk_encoder.CHUNK_SIZE):
+    texts = make_texts(n_texts)
+    cwd = os.getcwd()
+    results = []
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            embedding_store._stores.clear()
+            try:
+                start = time.perf_counter()
+                bulk_encoder.encode_bulk(texts, workers=workers, chunk_size=chunk_size)
+                seconds = time.perf_counter() - start
+            finally:
+                embedding_store._stores.clear()
+                os.chdir(cwd)
+        results.append({"workers": workers, "seconds": round(seconds, 3),
+                        "texts_per_second": round(n_texts / seconds, 1)})
+
+    base = next((row for row in results if row["workers"] == 1), results[0])
+    for row in results:
+        row["speedup"] = round(base["seconds"] / row["seconds"], 2)
+        row["efficiency"] = round(row["speedup"] * base["workers"] / row["workers"], 2)
+    return {"texts": n_texts, "cpus": os.cpu_count(), "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk encoding scaling benchmark")
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunk-size", type=int, default=bulk_encoder.CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.texts, args.workers, args.chunk_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
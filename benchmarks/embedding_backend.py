@@ -0,0 +1,112 @@
+# benchmarks/embedding_backend.py
+#
+# Throughput, memory and score parity of the embedding backends:
+#     python -m benchmarks.embedding_backend --model-dir models/minilm --texts 5000
+#
+# Each backend is loaded in a fresh process and reports load time, encode
+# throughput (model only, no embedding cache) and peak RSS. Cosine scores
+# between every pair of the synthetic skill phrases are then compared with
+# the first backend's; the exit status is 1 if any score differs by more
+# than --tolerance, i.e. the backend is not a safe drop-in.
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.pipeline import _init_worker, _peak_rss_mb
+from benchmarks.synthetic import free_text_skills
+from embedding_backend import BACKENDS
+
+TOLERANCE = 0.02
+
+
+def measure(backend, model_dir=None, n_texts=5000, batch_size=32):
+    """Load ``backend`` and encode ``n_texts`` phrases; meant to run in its own process."""
+    import model_registry
+
+    phrases = free_text_skills()
+    texts = [phrases[i % len(phrases)] for i in range(n_texts)]
+    rss_before = _peak_rss_mb()
+
+    model_registry.configure(backend=backend, model_dir=model_dir)
+    start = time.perf_counter()
+    model = model_registry.get_model()
+    model.encode(phrases[:batch_size], batch_size=batch_size)  # warm-up
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+    encode_seconds = time.perf_counter() - start
+
+    vectors = np.asarray(model.encode(phrases, batch_size=batch_size, convert_to_numpy=True), dtype=np.float32)
+    return {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 4),
+        "encode_seconds": round(encode_seconds, 4),
+        "texts_per_second": round(n_texts / encode_seconds, 1) if encode_seconds else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_before_load_mb": rss_before,
+        "dim": int(vectors.shape[1]),
+        "vectors": vectors.tolist(),
+    }
+
+
+def _cosines(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return vectors @ vectors.T
+
+
+def parity(reference, candidate):
+    """Score differences between two backends over the same phrases."""
+    ref, cand = _cosines(reference), _cosines(candidate)
+    off_diagonal = ~np.eye(len(ref), dtype=bool)
+    diff = np.abs(ref - cand)[off_diagonal]
+    np.fill_diagonal(ref, -np.inf)
+    np.fill_diagonal(cand, -np.inf)
+    return {
+        "max_abs_diff": round(float(diff.max()), 5),
+        "mean_abs_diff": round(float(diff.mean()), 5),
+        "top1_agreement": round(float((ref.argmax(axis=1) == cand.argmax(axis=1)).mean()), 4),
+    }
+
+
+def run(backends, model_dir=None, n_texts=5000, batch_size=32):
+    context = multiprocessing.get_context("spawn")
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    for backend in backends:
+        with context.Pool(1, initializer=_init_worker, initargs=(repo_root,)) as pool:
+            results.append(pool.apply(measure, (backend, model_dir, n_texts, batch_size)))
+
+    reference = results[0].pop("vectors")
+    results[0]["parity"] = None
+    for row in results[1:]:
+        row["parity"] = parity(reference, row.pop("vectors"))
+    return {"reference": backends[0], "texts": n_texts, "batch_size": batch_size, "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Embedding backend throughput and parity benchmark")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS,
+                        help="the first one is the parity reference")
+    parser.add_argument("--model-dir", help="local model directory (required for onnx)")
+    parser.add_argument("--texts", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="largest allowed absolute cosine difference from the reference")
+    args = parser.parse_args(argv)
+
+    report = run(args.backends, args.model_dir, args.texts, args.batch_size)
+    print(json.dumps(report, indent=2))
+    if any(row["parity"] and row["parity"]["max_abs_diff"] > args.tolerance for row in report["results"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
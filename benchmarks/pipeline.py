@@ -0,0 +1,197 @@
+# benchmarks/pipeline.py
+#
+# End-to-end timings of the matching and habit pipelines on synthetic data:
+#     python -m benchmarks.pipeline --sizes 1000 10000 100000 --output bench.json
+#     python -m benchmarks.pipeline --sizes 1000 10000 --baseline bench.json
+#
+# Each size runs in a fresh process inside an empty temporary working
+# directory (cold embedding cache, own data/ folder). Every step reports
+# wall time, the process's peak RSS so far and the number of model.encode
+# calls and texts it triggered. With --baseline the run is compared with an
+# earlier JSON report and the exit status is 1 if any step regressed.
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+TIME_TOLERANCE = 0.2     # relative slowdown allowed before flagging
+MIN_TIME_DELTA = 0.05    # seconds; ignore noise on very fast steps
+RSS_TOLERANCE = 0.2
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class _EncodeCounter:
+    """Counts calls into the shared model's ``encode``."""
+
+    def __init__(self):
+        self.calls = 0
+        self.texts = 0
+
+    def install(self):
+        from model_registry import get_model
+
+        model = get_model()
+        original = model.encode
+
+        def encode(sentences, *args, **kwargs):
+            self.calls += 1
+            self.texts += 1 if isinstance(sentences, str) else len(sentences)
+            return original(sentences, *args, **kwargs)
+
+        model.encode = encode
+
+
+def _steps(threshold):
+    """(name, callable) pairs, run in order; each callable gets the shared context."""
+    import storage
+    from admin_summary import match_status
+    from habit_tracker import get_defaulters
+    from match_engine import find_matches, generate_study_targets
+    from rating import get_average_ratings
+
+    def run_find_matches(ctx):
+        ctx["matched_users"] = ctx["users"].copy()
+        matches, _ = find_matches(ctx["matched_users"], threshold=threshold)
+        ctx["matches"] = matches
+
+    def publish_matches(ctx):
+        with storage.transaction() as tx:
+            tx.save("users", ctx["matched_users"])
+            tx.save("matches", ctx["matches"])
+
+    return [
+        ("find_matches", run_find_matches),
+        ("save_matches", publish_matches),
+        ("generate_study_targets", lambda ctx: generate_study_targets(ctx["users"])),
+        ("generate_study_targets_warm", lambda ctx: generate_study_targets(ctx["users"])),
+        ("get_defaulters", lambda ctx: get_defaulters()),
+        ("get_defaulters_warm", lambda ctx: get_defaulters()),
+        ("get_average_ratings", lambda ctx: get_average_ratings()),
+        ("admin_summary", lambda ctx: match_status(storage.load("users"), storage.load("matches"))),
+    ]
+
+
+def run_size(n, seed=0, threshold=0.6):
+    """Benchmark every step for ``n`` users; meant to run in its own process."""
+    from benchmarks.synthetic import write_population
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        ctx = {"users": write_population(n, seed=seed)}
+        counter = _EncodeCounter()
+        counter.install()
+        steps = {}
+        for name, step in _steps(threshold):
+            calls, texts = counter.calls, counter.texts
+            start = time.perf_counter()
+            step(ctx)
+            steps[name] = {
+                "seconds": round(time.perf_counter() - start, 4),
+                "peak_rss_mb": _peak_rss_mb(),
+                "model_calls": counter.calls - calls,
+                "texts_encoded": counter.texts - texts,
+            }
+    return {"users": n, "steps": steps}
+
+
+def run(sizes, seed=0, threshold=0.6):
+    # A fresh interpreter per size keeps peak RSS and caches independent
+    context = multiprocessing.get_context("spawn")
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    for n in sizes:
+        with context.Pool(1, initializer=_init_worker, initargs=(repo_root,)) as pool:
+            results.append(pool.apply(run_size, (n, seed, threshold)))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "threshold": threshold,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def _init_worker(repo_root):
+    if repo_root not in sys.path:
+        sys.path.insert(0, repo_root)
+
+
+# --- Comparison ---
+def compare(baseline, current, time_tolerance=TIME_TOLERANCE, rss_tolerance=RSS_TOLERANCE):
+    """Per-step changes between two reports plus the list of regressions."""
+    old_by_size = {row["users"]: row["steps"] for row in baseline["results"]}
+    changes, regressions = [], []
+    for row in current["results"]:
+        old_steps = old_by_size.get(row["users"])
+        if old_steps is None:
+            continue
+        for name, new in row["steps"].items():
+            old = old_steps.get(name)
+            if old is None:
+                continue
+            change = {"users": row["users"], "step": name,
+                      "seconds": [old["seconds"], new["seconds"]],
+                      "model_calls": [old["model_calls"], new["model_calls"]],
+                      "peak_rss_mb": [old["peak_rss_mb"], new["peak_rss_mb"]]}
+            reasons = []
+            if (new["seconds"] > old["seconds"] * (1 + time_tolerance)
+                    and new["seconds"] - old["seconds"] > MIN_TIME_DELTA):
+                reasons.append("slower")
+            if new["model_calls"] > old["model_calls"] or new["texts_encoded"] > old["texts_encoded"]:
+                reasons.append("more model calls")
+            if (old["peak_rss_mb"] and new["peak_rss_mb"]
+                    and new["peak_rss_mb"] > old["peak_rss_mb"] * (1 + rss_tolerance)):
+                reasons.append("more memory")
+            change["regressions"] = reasons
+            changes.append(change)
+            if reasons:
+                regressions.append(change)
+    return {"changes": changes, "regressions": regressions}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Matching and habit pipeline benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=TIME_TOLERANCE,
+                        help="relative slowdown or memory growth flagged as a regression")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.seed, args.threshold)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(json.load(f), report, args.tolerance, args.tolerance)
+    print(json.dumps(report, indent=2))
+    if args.baseline and report["comparison"]["regressions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
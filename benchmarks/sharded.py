@@ -0,0 +1,94 @@
+# benchmarks/sharded.py
+#
+# Sharded vs vectorized matching as shard workers are added:
+#     python -m benchmarks.sharded --users 50000 --skills 5000 --workers 1 2 4 8
+#
+# Users get free-text skills from a vocabulary of ``--skills`` distinct
+# phrases, so the per-skill matrices are large enough for sharding to pay.
+# Embeddings are cached and the clusters trained before timing, so the runs
+# compare matching work only. Agreement is the share of learners given the
+# same teacher as vectorized mode; with the fallback off it shows what the
+# cross-shard pass recovers.
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import cache
+import embedding_store
+import skill_shards
+from benchmarks.bulk_encoder import make_texts
+from benchmarks.synthetic import make_users
+from match_engine import match_users
+
+
+def make_sharded_users(n, n_skills, seed=0):
+    users = make_users(n, seed=seed)
+    skills = np.array(make_texts(n_skills), dtype=object)
+    drawn = np.random.default_rng(seed).choice(skills, size=n)
+    users["CanTeach"] = np.where(users["CanTeach"].notna(), drawn, None)
+    users["WantsToLearn"] = np.where(users["WantsToLearn"].notna(), drawn, None)
+    return users
+
+
+def _timed_match(users, threshold, mode):
+    start = time.perf_counter()
+    matches, unmatched = match_users(users, threshold, mode)
+    return {m["Learner"]: m["Teacher"] for m in matches}, len(unmatched), time.perf_counter() - start
+
+
+def run(n_users, n_skills, worker_counts, threshold=0.6, executor="thread", seed=0):
+    users = make_sharded_users(n_users, n_skills, seed)
+    cwd = os.getcwd()
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        os.makedirs("data")
+        embedding_store._stores.clear()
+        cache.clear()
+        try:
+            match_users(users, threshold, "sharded")  # warm the embedding cache and train the clusters
+            reference, _, seconds = _timed_match(users, threshold, "vectorized")
+            results.append({"mode": "vectorized", "seconds": round(seconds, 3), "matched": len(reference)})
+
+            runs = [(workers, True) for workers in worker_counts] + [(max(worker_counts), False)]
+            for workers, fallback in runs:
+                skill_shards.configure(skill_shards.SHARDS, workers, executor, fallback)
+                matched, unmatched, seconds = _timed_match(users, threshold, "sharded")
+                same = sum(reference.get(learner) == teacher for learner, teacher in matched.items())
+                results.append({
+                    "mode": "sharded", "workers": workers, "executor": executor, "fallback": fallback,
+                    "seconds": round(seconds, 3), "matched": len(matched), "unmatched": unmatched,
+                    "agreement": round(same / max(len(reference), 1), 4),
+                })
+        finally:
+            skill_shards.reset_clusters()
+            embedding_store._stores.clear()
+            cache.clear()
+            os.chdir(cwd)
+
+    base = results[0]["seconds"]
+    for row in results[1:]:
+        row["speedup_vs_vectorized"] = round(base / row["seconds"], 2)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded matching benchmark")
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--skills", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.users, args.skills, args.workers, args.threshold, args.executor, args.seed),
+                     indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/skill_index.py
+#
+# Recall and speed of the IVF teacher index against exact brute-force scoring:
+#     python -m benchmarks.skill_index --sizes 10000 100000 --nprobe 1 2 4
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from embedding_store import encode as cached_encode
+from skill_index import SkillIndex
+from benchmarks.synthetic import make_users
+
+
+def run(sizes, nprobes, threshold=0.6, seed=0):
+    results = []
+    for n in sizes:
+        users = make_users(n, seed=seed, free_text=True)
+        teachers = users[users["CanTeach"].notnull()]
+        learners = users[users["WantsToLearn"].notnull()]
+        teacher_vectors = cached_encode(teachers["CanTeach"].tolist())
+        learner_vectors = cached_encode(learners["WantsToLearn"].tolist())
+        teacher_vectors /= np.linalg.norm(teacher_vectors, axis=1, keepdims=True)
+        learner_vectors /= np.linalg.norm(learner_vectors, axis=1, keepdims=True)
+
+        # Exact best score per learner, chunked so the dense matrix stays bounded
+        start = time.perf_counter()
+        exact = np.empty(len(learner_vectors), dtype=np.float32)
+        for lo in range(0, len(learner_vectors), 1024):
+            exact[lo:lo + 1024] = (learner_vectors[lo:lo + 1024] @ teacher_vectors.T).max(axis=1)
+        exact_seconds = time.perf_counter() - start
+        has_exact = exact >= threshold
+
+        start = time.perf_counter()
+        index = SkillIndex(seed=seed).build(range(len(teacher_vectors)), teacher_vectors)
+        build_seconds = time.perf_counter() - start
+
+        row = {"users": n, "teachers": len(teachers), "learners": len(learners),
+               "exact_seconds": round(exact_seconds, 4), "index_build_seconds": round(build_seconds, 4),
+               "lists": len(index.centroids), "ann": []}
+        for nprobe in nprobes:
+            index.nprobe = nprobe
+            start = time.perf_counter()
+            hits = index.search(learner_vectors, k=1, threshold=threshold)
+            seconds = time.perf_counter() - start
+            found = np.array([h[0][1] if h else -1.0 for h in hits], dtype=np.float32)
+            recall = float((found[has_exact] >= exact[has_exact] - 1e-5).mean()) if has_exact.any() else 1.0
+            row["ann"].append({"nprobe": nprobe, "seconds": round(seconds, 4), "recall_at_1": round(recall, 4)})
+        results.append(row)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teacher skill index recall benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.sizes, args.nprobe, args.threshold, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
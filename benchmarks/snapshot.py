@@ -0,0 +1,134 @@
+# benchmarks/snapshot.py
+#
+# Admin summary reads from CSV vs the Parquet snapshot:
+#     python -m benchmarks.snapshot --rows 1000000 --users 20000
+#
+# The study log spans ``--days`` days. "csv_full" parses the whole log as
+# the admin views used to; "csv_since" is the study log's own seek to the
+# first row of the window; "parquet" reads two columns of the window's
+# partitions. The same is done for the users/matches match summary. Export
+# times are for the first snapshot and for an incremental one after a day
+# of new check-ins.
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import cache
+import ratings_store
+import snapshot
+import storage
+from benchmarks.synthetic import make_ratings, make_study_log, make_users
+
+SUMMARY_COLUMNS = ["Name", "Email", "Gender", "SkillLevel", "Role", "CanTeach", "WantsToLearn", "Timestamp"]
+REPEATS = 3
+
+
+def _best_of(func, repeats=REPEATS):
+    best = float("inf")
+    for _ in range(repeats):
+        cache.clear()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 2)
+
+
+def _write_data(n_rows, n_users, days, seed):
+    users = make_users(n_users, seed=seed)
+    users["IsMatched"] = users.index % 2 == 0
+    storage.save("users", users)
+    storage.save("ratings", make_ratings(users, seed=seed))
+    now = pd.Timestamp.now().floor("D") - pd.Timedelta(seconds=1)
+    log = make_study_log(users, seed=seed, days=days, sessions_per_week=n_rows * 7 / (n_users * days), now=now)
+    log.to_csv(storage.TABLES["study_log"][0], index=False)
+    learners = users[users["WantsToLearn"].notna()].head(n_users // 4)
+    teachers = users[users["CanTeach"].notna()].head(n_users // 4)
+    k = min(len(learners), len(teachers))
+    storage.save("matches", pd.DataFrame({
+        "Learner": learners["Name"].to_numpy()[:k], "Teacher": teachers["Name"].to_numpy()[:k],
+        "Skill": learners["WantsToLearn"].to_numpy()[:k], "AI_Confidence (%)": 80.0,
+        "Explanation": "", "Timestamp": learners["Timestamp"].to_numpy()[:k],
+    }))
+    return users, len(log)
+
+
+def run(n_rows, n_users, days=90, window=7, seed=0):
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        os.makedirs("data")
+        ratings_store._stores.clear()
+        cache.clear()
+        try:
+            users, rows = _write_data(n_rows, n_users, days, seed)
+            since = pd.Timestamp.now().floor("D") - pd.Timedelta(days=window)
+            log_path = storage.TABLES["study_log"][0]
+
+            start = time.perf_counter()
+            snapshot.export()
+            first_export = time.perf_counter() - start
+
+            def csv_full():
+                log = pd.read_csv(log_path, parse_dates=["Timestamp"])
+                log[log["Timestamp"] >= since].groupby("Name")["Minutes"].sum()
+
+            def csv_since():
+                storage.load_study_log(since=since).groupby("Name")["Minutes"].sum()
+
+            def csv_summary():
+                storage.load("users")[SUMMARY_COLUMNS]
+                storage.load("matches")[["Learner", "Teacher"]]
+
+            result = {
+                "study_log_rows": rows,
+                "study_minutes_ms": {
+                    "csv_full": _best_of(csv_full),
+                    "csv_since": _best_of(csv_since),
+                    "parquet": _best_of(lambda: snapshot.study_minutes_since(since)),
+                },
+                "match_summary_ms": {
+                    "csv": _best_of(csv_summary),
+                    "parquet": _best_of(lambda: snapshot.user_match_status(SUMMARY_COLUMNS)),
+                },
+                "csv_bytes": os.path.getsize(log_path),
+                "parquet_bytes": sum(os.path.getsize(os.path.join(root, f))
+                                     for root, _, files in os.walk(os.path.join(snapshot.SNAPSHOT_DIR, "study_log"))
+                                     for f in files),
+            }
+
+            # One more day of check-ins appended to the log
+            new_day = make_study_log(users.head(n_users // 2), seed=seed + 1, days=1,
+                                     now=pd.Timestamp.now().floor("s"))
+            new_day.to_csv(log_path, mode="a", header=False, index=False)
+            start = time.perf_counter()
+            written = snapshot.export()
+            result["export_seconds"] = {
+                "first": round(first_export, 3),
+                "incremental": round(time.perf_counter() - start, 3),
+                "incremental_partitions_written": written,
+            }
+        finally:
+            ratings_store._stores.clear()
+            cache.clear()
+            os.chdir(cwd)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parquet snapshot benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--window", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.rows, args.users, args.days, args.window, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/synthetic.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Skills offered on the registration form plus free-text variants seen in data/
+SKILLS = ["Excel", "SQL", "Python", "Power BI", "R", "Tableau", "Data Science"]
+SKILL_VARIANTS = ["Data Analysis", "Advanced Excel", "Python Programming", "SQL Queries", "Communication"]
+GENDERS = ["Male", "Female", "Other"]
+AGE_RANGES = ["18 - 24", "25 - 34", "35 - 44", "55+"]
+SKILL_LEVELS = ["Beginner", "Intermediate", "Advanced"]
+SKILL_MODIFIERS = ["", "Advanced", "Intro to", "Applied", "Practical", "Business", "Statistics with",
+                   "Dashboards in", "Automation with", "Data Cleaning in", "Reporting with", "Modelling in"]
+
+
+def free_text_skills():
+    """Skill phrases like 'Dashboards in Power BI' for a large distinct vocabulary."""
+    return [f"{modifier} {skill}".strip() for modifier in SKILL_MODIFIERS for skill in SKILLS + SKILL_VARIANTS]
+
+
+def make_users(n, seed=0, teacher_share=0.4, variant_share=0.1, free_text=False):
+    """Synthetic users with the same columns as ``data/users.csv`` after loading.
+
+    ``free_text=True`` draws skills from :func:`free_text_skills` instead of the
+    registration form's fixed list.
+    """
+    rng = np.random.default_rng(seed)
+    is_teacher = rng.random(n) < teacher_share
+    if free_text:
+        skills = rng.choice(np.array(free_text_skills(), dtype=object), size=n)
+    else:
+        skill_pool = np.array(SKILLS + SKILL_VARIANTS, dtype=object)
+        skill_p = np.r_[
+            np.full(len(SKILLS), (1 - variant_share) / len(SKILLS)),
+            np.full(len(SKILL_VARIANTS), variant_share / len(SKILL_VARIANTS)),
+        ]
+        skills = rng.choice(skill_pool, size=n, p=skill_p)
+    names = np.array([f"User {i:06d}" for i in range(n)], dtype=object)
+    timestamps = pd.Timestamp("2025-07-01") + pd.to_timedelta(rng.integers(0, 90 * 86400, n), unit="s")
+
+    return pd.DataFrame({
+        "Name": names,
+        "Email": [f"user{i:06d}@example.com" for i in range(n)],
+        "Gender": rng.choice(GENDERS, n),
+        "AgeRange": rng.choice(AGE_RANGES, n),
+        "SkillLevel": rng.choice(SKILL_LEVELS, n),
+        "Role": np.where(is_teacher, "Teacher", "Learner"),
+        "Timestamp": timestamps.strftime("%Y-%m-%d %H:%M:%S"),
+        "CanTeach": np.where(is_teacher, skills, None),
+        "WantsToLearn": np.where(is_teacher, None, skills),
+        "StudyDays": rng.integers(1, 8, n),
+        "IsMatched": False,
+    })
+
+
+def make_ratings(users, seed=0, share=0.5):
+    """Synthetic ratings with the columns of ``data/ratings.csv``.
+
+    About ``share`` of the learners rate one random teacher each.
+    """
+    rng = np.random.default_rng(seed)
+    learners = users.loc[users["WantsToLearn"].notna(), "Name"].to_numpy()
+    teachers = users.loc[users["CanTeach"].notna(), "Name"].to_numpy()
+    if not len(learners) or not len(teachers):
+        return pd.DataFrame(columns=["Learner", "Teacher", "Rating", "Comments"])
+    raters = learners[rng.random(len(learners)) < share]
+    return pd.DataFrame({
+        "Learner": raters,
+        "Teacher": rng.choice(teachers, len(raters)),
+        "Rating": rng.integers(1, 6, len(raters)),
+        "Comments": "",
+    })
+
+
+def make_study_log(users, seed=0, days=14, sessions_per_week=4, now=None):
+    """Synthetic check-ins over the last ``days`` days, in timestamp order.
+
+    Columns match ``data/study_log.csv`` as written by the study log writer.
+    """
+    rng = np.random.default_rng(seed)
+    now = pd.Timestamp(now or pd.Timestamp.now()).floor("s")
+    sessions = rng.poisson(sessions_per_week * days / 7, len(users))
+    names = np.repeat(users["Name"].to_numpy(), sessions)
+    offsets = pd.to_timedelta(rng.integers(0, days * 86400, len(names)), unit="s")
+    log = pd.DataFrame({
+        "Name": names,
+        "Minutes": rng.integers(10, 121, len(names)),
+        "Timestamp": now - offsets,
+    }).sort_values("Timestamp", kind="stable")
+    log["Timestamp"] = log["Timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    return log.reset_index(drop=True)
+
+
+def write_population(n, data_dir="data", seed=0, **user_options):
+    """Write users.csv, ratings.csv and study_log.csv for ``n`` users into ``data_dir``."""
+    os.makedirs(data_dir, exist_ok=True)
+    users = make_users(n, seed=seed, **user_options)
+    users.to_csv(os.path.join(data_dir, "users.csv"), index=False)
+    make_ratings(users, seed=seed).to_csv(os.path.join(data_dir, "ratings.csv"), index=False)
+    make_study_log(users, seed=seed).to_csv(os.path.join(data_dir, "study_log.csv"), index=False)
+    return users
@@ -0,0 +1,86 @@
+# benchmarks/user_schema.py
+#
+# Memory and filter/groupby time of the users table, untyped vs typed:
+#     python -m benchmarks.user_schema --sizes 10000 100000
+#
+# "object" is the frame as it comes out of the CSV (every column Python
+# objects, IsMatched a mix of bools and missing values filled with False);
+# "typed" is the same file through user_schema.enforce().
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import storage
+import user_schema
+from benchmarks.synthetic import make_users
+
+REPEATS = 5
+
+
+def _best_of(func, repeats=REPEATS):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+def _operations(df):
+    return {
+        "open_learners": lambda: df[df["WantsToLearn"].notnull() & (df["IsMatched"] != True)],
+        "open_teachers_by_skill": lambda: df[df["IsMatched"] != True].groupby("CanTeach", observed=True).size(),
+        "count_by_role_and_level": lambda: df.groupby(["Role", "SkillLevel"], observed=True).size(),
+        "learners_per_skill": lambda: df["WantsToLearn"].value_counts(),
+    }
+
+
+def _write_csv(n, path, seed):
+    users = make_users(n, seed=seed)
+    rng = np.random.default_rng(seed)
+    # Rows appended by older code left IsMatched empty, as in data/users.csv
+    users["IsMatched"] = np.where(rng.random(n) < 0.05, None, rng.random(n) < 0.5)
+    users.columns = [col.lower() for col in users.columns]
+    users.to_csv(path, index=False)
+
+
+def run(sizes, seed=0):
+    results = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, "users.csv")
+            _write_csv(n, path, seed)
+
+            start = time.perf_counter()
+            raw = storage.load("users", path)
+            raw["IsMatched"] = raw["IsMatched"].where(raw["IsMatched"].notna(), False)
+            object_load = time.perf_counter() - start
+
+            start = time.perf_counter()
+            typed = user_schema.enforce(storage.load("users", path))
+            typed_load = time.perf_counter() - start
+
+        row = {"users": n, "object": {}, "typed": {}}
+        for label, df, load_seconds in (("object", raw, object_load), ("typed", typed, typed_load)):
+            row[label]["load_ms"] = round(load_seconds * 1000, 3)
+            row[label]["bytes_per_user"] = round(float(user_schema.memory_per_user(df)), 1)
+            row[label].update({name: _best_of(op) for name, op in _operations(df).items()})
+        results.append(row)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Typed users table benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.sizes, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
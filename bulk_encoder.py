@@ -0,0 +1,120 @@
+# bulk_encoder.py
+#
+# Multi-process encoding for large imports and full re-matches.
+#
+# Texts are normalised and de-duplicated, anything already in the embedding
+# cache is skipped, and the rest is split into chunks encoded by a pool of
+# worker processes that each load their own copy of the model (with torch
+# threads split between them, so the workers don't oversubscribe the CPU).
+# Results are written to the shared embedding cache as chunks finish, so an
+# interrupted run keeps what it has done. Warm the cache from a CSV with:
+#     python bulk_encoder.py data/unpaired_users.csv
+
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import metrics
+import model_registry
+from constants import MODEL_NAME
+from embedding_store import get_store
+
+CHUNK_SIZE = 256
+# Below this many new texts, starting worker processes costs more than it saves
+PARALLEL_MIN = 2000
+SKILL_COLUMNS = ("WantsToLearn", "CanTeach")
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+# --- Worker processes ---
+_model = None
+
+
+def _init_worker(backend, model_dir, device, num_threads, model_name):
+    global _model
+    model_registry.configure(device, num_threads, backend, model_dir)
+    _model = model_registry.get_model(model_name)
+
+
+def _encode_chunk(texts):
+    return np.asarray(_model.encode(texts, convert_to_numpy=True), dtype=np.float32)
+
+
+# --- Public API ---
+def encode_bulk(texts, progress=None, workers=None, chunk_size=CHUNK_SIZE, model_name=MODEL_NAME):
+    """Make sure every text in ``texts`` is in the embedding cache.
+
+    ``progress(done, total)`` is called after each chunk with the number of
+    new texts encoded so far. Returns how many texts had to be encoded.
+    """
+    store = get_store(model_name)
+    todo = store.missing(texts)
+    total = len(todo)
+    if progress:
+        progress(0, total)
+    if not todo:
+        return 0
+
+    chunks = [todo[lo:lo + chunk_size] for lo in range(0, total, chunk_size)]
+    workers = min(workers or default_workers(), len(chunks))
+    metrics.count("bulk.texts", total)
+    with metrics.timer("bulk.encode"):
+        if workers <= 1 or total < PARALLEL_MIN:
+            done = 0
+            for chunk in chunks:
+                store.encode(chunk)
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+        else:
+            _encode_parallel(store, chunks, workers, progress, total, model_name)
+    return total
+
+
+def _encode_parallel(store, chunks, workers, progress, total, model_name):
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    config = (model_registry.BACKEND, model_registry.MODEL_DIR, model_registry.DEVICE, threads, model_name)
+    # spawn: forking a process that runs threads (Streamlit, the match worker) is unsafe
+    context = multiprocessing.get_context("spawn")
+    done = 0
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=config) as pool:
+        futures = {pool.submit(_encode_chunk, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            store.add(chunk, future.result())
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+
+
+def skill_texts(users_df):
+    """Every non-empty skill text of ``users_df`` (learners and teachers)."""
+    columns = [col for col in SKILL_COLUMNS if col in users_df.columns]
+    if not columns:
+        return []
+    values = pd.concat([users_df[col] for col in columns]).dropna().astype(str)
+    return values[values.str.strip() != ""].tolist()
+
+
+def print_progress(done, total):
+    """A ``progress`` callback for the command line."""
+    print(f"\rEncoded {done}/{total}", end="\n" if done >= total else "", flush=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python bulk_encoder.py <users.csv> [workers]")
+        sys.exit(1)
+    users = pd.read_csv(sys.argv[1])
+    # Import files may use lower-case headers (e.g. data/unpaired_users.csv)
+    by_lower = {col.lower(): col for col in SKILL_COLUMNS}
+    users = users.rename(columns=lambda col: by_lower.get(str(col).lower(), col))
+    count = encode_bulk(skill_texts(users), print_progress, int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    print(f"{count} new texts encoded")
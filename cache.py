@@ -0,0 +1,74 @@
+# cache.py
+#
+# Data-version-aware memoisation for loaders and derived tables.
+#
+# A cached function names the data it depends on: storage tables
+# ("users", "ratings", ...) or plain file paths (e.g. targets.csv). Its
+# result is reused until one of those changes version: the file's
+# mtime/size, the SQLite write counter, or an explicit storage.touch()/
+# invalidate() from a write path. Checking a version is a stat() or one
+# indexed query, so a rerun with unchanged data reads no files.
+
+import functools
+import threading
+
+import pandas as pd
+
+import storage
+
+_lock = threading.Lock()
+_registry = []
+
+
+def invalidate(dependency):
+    """Force functions depending on ``dependency`` to recompute on next call."""
+    storage.touch(dependency)
+
+
+def clear():
+    """Drop every cached result."""
+    with _lock:
+        for entries in _registry:
+            entries.clear()
+
+
+def cached(*dependencies):
+    """Memoise a function until one of ``dependencies`` changes.
+
+    A dependency is a table name, a file path, or a callable that maps the
+    call's arguments to one of those. Arguments must be hashable. Only the
+    latest version of each argument combination is kept, and DataFrames are
+    returned as copies so callers can modify them freely.
+    """
+    def decorator(func):
+        entries = {}
+        _registry.append(entries)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            current = tuple(
+                storage.version(dep(*args, **kwargs) if callable(dep) else dep) for dep in dependencies
+            )
+            with _lock:
+                entry = entries.get(key)
+            if entry is None or entry[0] != current:
+                entry = (current, func(*args, **kwargs))
+                with _lock:
+                    entries[key] = entry
+            result = entry[1]
+            return result.copy() if isinstance(result, pd.DataFrame) else result
+
+        wrapper.cache_clear = entries.clear
+        return wrapper
+    return decorator
+
+
+@cached(lambda table: table)
+def _load_table(table):
+    return storage.load(table) if storage.exists(table) else pd.DataFrame()
+
+
+def load(table):
+    """Cached ``storage.load``; an empty DataFrame if the table was never written."""
+    return _load_table(table)
@@ -0,0 +1,46 @@
+# conftest.py
+
+import os
+import shutil
+import zlib
+
+import numpy as np
+import pytest
+
+import embedding_store
+import storage
+
+SHIPPED_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+EMBEDDING_DIM = 32
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A copy of the shipped CSVs (lowercase headers) as the working data/ directory."""
+    shutil.copytree(SHIPPED_DATA, tmp_path / "data", ignore=shutil.ignore_patterns("snapshot", "embeddings", "*.db*"))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(storage, "BACKEND", "csv")
+    return tmp_path / "data"
+
+
+def text_vector(text):
+    """A fixed pseudo-random embedding per (normalised) text."""
+    seed = zlib.crc32(embedding_store.normalize_text(text).encode("utf-8"))
+    return np.random.default_rng(seed).normal(size=EMBEDDING_DIM).astype(np.float32)
+
+
+@pytest.fixture
+def embeddings(data_dir, monkeypatch):
+    """Seed the embedding cache so matching never loads the model.
+
+    Returns ``seed(texts, vectors=None)``; texts without vectors get ``text_vector``.
+    """
+    monkeypatch.setattr(embedding_store, "_stores", {})
+
+    def seed(texts, vectors=None):
+        texts = [str(text) for text in texts]
+        if vectors is None:
+            vectors = [text_vector(text) for text in texts]
+        embedding_store.get_store().add(texts, np.asarray(vectors, dtype=np.float32))
+
+    return seed
@@ -3,3 +3,6 @@
 USER_FILE = "data/users.csv"
 MATCH_FILE = "data/matches.csv"
 RATINGS_FILE = "data/ratings.csv"
+
+# Sentence embedding model used for skill matching
+MODEL_NAME = "all-MiniLM-L6-v2"
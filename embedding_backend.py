@@ -0,0 +1,170 @@
+# embedding_backend.py
+#
+# Pluggable skill encoders.
+#
+# Every backend exposes ``encode(sentences, batch_size=32, convert_to_numpy=True)``
+# like SentenceTransformer, so the registry can hand out either one:
+#   "sentence-transformers"  full-precision PyTorch model (the default)
+#   "onnx"                   ONNX Runtime on CPU, int8-quantised by default
+# The ONNX backend only needs onnxruntime and tokenizers (no torch) and reads
+# everything from a local model directory: a tokenizer.json plus one of
+# ONNX_FILES. Create a directory usable by both backends with
+#     python embedding_backend.py export <dir>
+# (needs sentence-transformers and onnxruntime, and network access once) or
+# use a downloaded snapshot of the Hugging Face model, which ships onnx/.
+
+import os
+import sys
+
+import numpy as np
+
+from constants import MODEL_NAME
+
+SENTENCE_TRANSFORMERS = "sentence-transformers"
+ONNX = "onnx"
+BACKENDS = (SENTENCE_TRANSFORMERS, ONNX)
+
+# Searched in order inside the model directory; quantised files first
+ONNX_FILES = (
+    "model_int8.onnx",
+    os.path.join("onnx", "model_quint8_avx2.onnx"),
+    os.path.join("onnx", "model_qint8_avx512.onnx"),
+    "model.onnx",
+    os.path.join("onnx", "model.onnx"),
+)
+MAX_SEQ_LENGTH = 256
+
+
+class SentenceTransformerBackend:
+    """The PyTorch ``SentenceTransformer``; ``model_dir`` loads a local copy."""
+
+    name = SENTENCE_TRANSFORMERS
+
+    def __init__(self, model_name=MODEL_NAME, model_dir=None, device=None, num_threads=None):
+        # Imported here so that importing the app never pulls in torch
+        from sentence_transformers import SentenceTransformer
+
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+        if model_dir:
+            self.model = SentenceTransformer(model_dir, device=device, local_files_only=True)
+        else:
+            self.model = SentenceTransformer(model_name, device=device)
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, **kwargs):
+        return self.model.encode(sentences, batch_size=batch_size, convert_to_numpy=convert_to_numpy, **kwargs)
+
+
+class OnnxBackend:
+    """Mean-pooled, L2-normalised transformer outputs from ONNX Runtime."""
+
+    name = ONNX
+
+    def __init__(self, model_dir, onnx_file=None, num_threads=None, max_seq_length=MAX_SEQ_LENGTH):
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("The onnx backend needs the onnxruntime and tokenizers packages") from e
+        if not model_dir:
+            raise ValueError("The onnx backend needs a local model directory (GETSKILLED_MODEL_DIR)")
+
+        self.path = os.path.join(model_dir, onnx_file) if onnx_file else find_onnx_file(model_dir)
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {item.name for item in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.no_padding()
+
+    def _encode_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        width = max(len(enc.ids) for enc in encodings)
+        ids = np.zeros((len(texts), width), dtype=np.int64)
+        mask = np.zeros((len(texts), width), dtype=np.int64)
+        for row, enc in enumerate(encodings):
+            ids[row, :len(enc.ids)] = enc.ids
+            mask[row, :len(enc.ids)] = 1
+        feeds = {"input_ids": ids, "attention_mask": mask, "token_type_ids": np.zeros_like(ids)}
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+
+        weights = mask[:, :, None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else [str(s) for s in sentences]
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # Batches of similar length waste less work on padding
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        out = None
+        for lo in range(0, len(texts), batch_size):
+            rows = order[lo:lo + batch_size]
+            vectors = self._encode_batch([texts[i] for i in rows])
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[rows] = vectors
+        return out[0] if single else out
+
+
+def find_onnx_file(model_dir):
+    for name in ONNX_FILES:
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No ONNX model in {model_dir} (looked for {', '.join(ONNX_FILES)})")
+
+
+def load_backend(backend=SENTENCE_TRANSFORMERS, model_name=MODEL_NAME, model_dir=None, device=None, num_threads=None):
+    """Instantiate the named backend."""
+    if backend == SENTENCE_TRANSFORMERS:
+        return SentenceTransformerBackend(model_name, model_dir, device, num_threads)
+    if backend == ONNX:
+        return OnnxBackend(model_dir, num_threads=num_threads)
+    raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+
+# --- Export ---
+def export_onnx(model_dir, model_name=MODEL_NAME, quantize=True):
+    """Save ``model_name`` to ``model_dir`` for offline use by either backend.
+
+    The directory gets the SentenceTransformer files, tokenizer.json,
+    model.onnx and (if ``quantize``) model_int8.onnx.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device="cpu")
+    model.save(model_dir)
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    sample = tokenizer(["an example skill"], return_tensors="pt")
+    names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic = {name: {0: "batch", 1: "sequence"} for name in names + ["last_hidden_state"]}
+    fp32_path = os.path.join(model_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer, tuple(sample[name] for name in names), fp32_path,
+            input_names=names, output_names=["last_hidden_state"],
+            dynamic_axes=dynamic, opset_version=14,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(fp32_path, os.path.join(model_dir, "model_int8.onnx"), weight_type=QuantType.QInt8)
+    return model_dir
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "export":
+        print("Exported to", export_onnx(sys.argv[2], *sys.argv[3:4]))
+    else:
+        print("usage: python embedding_backend.py export <model_dir> [model_name]")
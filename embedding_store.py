@@ -0,0 +1,233 @@
+# embedding_store.py
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from filelock import FileLock
+
+from constants import MODEL_NAME
+from model_registry import cache_name, get_model
+import metrics
+
+# --- Paths ---
+DATA_DIR = "data"
+EMBEDDING_DIR = os.path.join(DATA_DIR, "embeddings")
+
+# Vectors kept in process memory in front of the on-disk matrix
+LRU_SIZE = 4096
+INITIAL_CAPACITY = 256
+
+
+def normalize_text(text):
+    """Canonical cache key for a piece of text: trimmed, single-spaced."""
+    return " ".join(str(text).split())
+
+
+class EmbeddingStore:
+    """Embeddings for one model, persisted as a memory-mapped ``.npy`` matrix.
+
+    ``<model>.npy`` holds one vector per row and ``<model>.json`` maps the
+    normalised text to its row.  Lookups go through a bounded LRU first, then
+    the memory map, and only texts never seen before reach the model.
+    ``name`` (default: the model name) keys the files, so vectors from
+    different backends of the same model are kept apart.
+
+    The app and the match worker may share the files: appends hold a file
+    lock, first adopt rows other processes added, and replace the matrix
+    before the index that points into it.
+    """
+
+    def __init__(self, model_name=MODEL_NAME, directory=EMBEDDING_DIR, lru_size=LRU_SIZE, name=None):
+        self.model_name = model_name
+        self.name = name or model_name
+        self.directory = directory
+        self.lru_size = lru_size
+        slug = self.name.replace("/", "__")
+        self.matrix_path = os.path.join(directory, f"{slug}.npy")
+        self.index_path = os.path.join(directory, f"{slug}.json")
+
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(os.path.join(directory, f"{slug}.lock"))
+        self._lru = OrderedDict()
+        self._rows = {}
+        self._count = 0
+        self._matrix = None
+        self._load()
+
+    # --- Disk ---
+    def _tmp_path(self, path):
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def _load(self):
+        if not (os.path.exists(self.index_path) and os.path.exists(self.matrix_path)):
+            return
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            matrix = np.load(self.matrix_path, mmap_mode="r+")
+        except (OSError, ValueError) as e:
+            print("Error loading embedding cache:", e)
+            return
+        if index.get("model") != self.name or index.get("count", 0) > matrix.shape[0]:
+            return
+        self._rows = index.get("rows", {})
+        self._count = index["count"]
+        self._matrix = matrix
+
+    def _refresh(self):
+        """Adopt rows appended (and matrix files replaced) by other processes; file lock held."""
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                on_disk = json.load(f).get("count", 0)
+        except (OSError, ValueError):
+            return
+        if on_disk != self._count:
+            self._load()
+
+    def _ensure_capacity(self, needed, dim):
+        if self._matrix is not None and self._matrix.shape[0] >= needed:
+            return
+        capacity = max(INITIAL_CAPACITY, needed, 2 * (0 if self._matrix is None else self._matrix.shape[0]))
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._tmp_path(self.matrix_path)
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, dim))
+        if self._matrix is not None and self._count:
+            grown[:self._count] = self._matrix[:self._count]
+        grown.flush()
+        # Release both maps before swapping the file (required on Windows)
+        del grown
+        self._matrix = None
+        os.replace(tmp_path, self.matrix_path)
+        self._matrix = np.load(self.matrix_path, mmap_mode="r+")
+
+    def _append(self, texts, vectors):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._file_lock:
+            self._refresh()
+            keep = [i for i, text in enumerate(texts) if text not in self._rows]
+            if not keep:
+                return
+            texts, vectors = [texts[i] for i in keep], vectors[keep]
+
+            start = self._count
+            self._ensure_capacity(start + len(texts), vectors.shape[1])
+            self._matrix[start:start + len(texts)] = vectors
+            self._matrix.flush()
+            for offset, text in enumerate(texts):
+                self._rows[text] = start + offset
+            self._count = start + len(texts)
+
+            # Rows are flushed before the index that points at them is replaced
+            index = {"model": self.name, "count": self._count, "rows": self._rows}
+            tmp_path = self._tmp_path(self.index_path)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self.index_path)
+
+    # --- LRU ---
+    def _remember(self, text, vector):
+        self._lru[text] = vector
+        self._lru.move_to_end(text)
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _recall(self, text):
+        vector = self._lru.get(text)
+        if vector is not None:
+            self._lru.move_to_end(text)
+            return vector
+        row = self._rows.get(text)
+        if row is None:
+            return None
+        vector = np.array(self._matrix[row])
+        self._remember(text, vector)
+        return vector
+
+    # --- Public API ---
+    def __contains__(self, text):
+        key = normalize_text(text)
+        return key in self._lru or key in self._rows
+
+    def __len__(self):
+        return self._count
+
+    def missing(self, texts):
+        """Normalised texts (de-duplicated, in order) that would have to be encoded."""
+        with self._lock:
+            return [key for key in dict.fromkeys(normalize_text(t) for t in texts)
+                    if key not in self._lru and key not in self._rows]
+
+    def add(self, texts, vectors):
+        """Store vectors encoded elsewhere, e.g. by ``bulk_encoder``'s worker processes."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            new = {}
+            for text, vector in zip(texts, vectors):
+                key = normalize_text(text)
+                if key not in self._rows and key not in new:
+                    new[key] = vector
+            if new:
+                self._append(list(new), np.stack(list(new.values())))
+                for key, vector in new.items():
+                    self._remember(key, vector)
+        return len(new)
+
+    def encode(self, texts, model=None):
+        """Return a ``(len(texts), dim)`` float32 array, encoding only unseen texts.
+
+        The model is only fetched from the registry when something is missing.
+        """
+        keys = [normalize_text(t) for t in texts]
+        with self._lock:
+            found = {}
+            missing = []
+            for key in dict.fromkeys(keys):
+                vector = self._recall(key)
+                if vector is None:
+                    missing.append(key)
+                else:
+                    found[key] = vector
+
+            metrics.count("embedding.cache_hits", len(found))
+            if missing:
+                model = model or get_model(self.model_name)
+                metrics.count("model.texts", len(missing))
+                with metrics.timer("model.encode"):
+                    vectors = np.asarray(model.encode(missing, convert_to_numpy=True), dtype=np.float32)
+                self._append(missing, vectors)
+                for key, vector in zip(missing, vectors):
+                    found[key] = vector
+                    self._remember(key, vector)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+
+# --- Shared stores, one per model and backend ---
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(model_name=MODEL_NAME):
+    name = cache_name(model_name)
+    with _stores_lock:
+        store = _stores.get(name)
+        if store is None:
+            store = _stores[name] = EmbeddingStore(model_name, name=name)
+        return store
+
+
+def encode(texts, model_name=MODEL_NAME):
+    """Encode a list of texts through the shared cache for ``model_name``."""
+    return get_store(model_name).encode(texts)
+
+
+@metrics.timed("cos_sim")
+def cos_sim(a, b):
+    """Cosine similarity of two 1-D embeddings as a Python float."""
+    denom = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(np.dot(a, b) / denom) if denom else 0.0
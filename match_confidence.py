@@ -0,0 +1,87 @@
+# match_confidence.py
+#
+# Pair confidences shown in the admin Matches tabs.
+#
+# A pair's confidence is the mean similarity of the learner's and the
+# teacher's name to the matched skill. It is computed when a match is
+# created, in one batch over the distinct strings, and kept in the
+# match_confidence table next to matches.csv keyed by (learner, teacher,
+# skill). Opening a tab only computes the rows that are not stored yet.
+
+import numpy as np
+import pandas as pd
+
+from embedding_store import encode as cached_encode
+import storage
+
+KEY_COLUMNS = ["Learner", "Teacher", "Skill"]
+
+
+def _text(values):
+    return values.fillna("").astype(str)
+
+
+def _keys(matches):
+    """Normalised (learner, teacher, skill) columns used for scoring and lookup.
+
+    Stored keys go through the same function, so a missing value is ""
+    on both sides of the lookup (never "nan" on one of them).
+    """
+    return pd.DataFrame({
+        "Learner": _text(matches["Learner"]).str.strip().str.lower(),
+        "Teacher": _text(matches["Teacher"]).str.strip().str.lower(),
+        "Skill": _text(matches["Skill"]) if "Skill" in matches.columns else "",
+    }, index=matches.index)
+
+
+def compute_confidences(keys):
+    """Confidence (%) per row of ``keys``, encoding each distinct string once."""
+    if keys.empty:
+        return np.zeros(0)
+    n = len(keys)
+    codes, uniques = pd.factorize(pd.concat([keys["Learner"], keys["Teacher"], keys["Skill"]], ignore_index=True))
+    vectors = np.asarray(cached_encode(list(uniques)), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-8)
+    learner, teacher, skill = vectors[codes[:n]], vectors[codes[n:2 * n]], vectors[codes[2 * n:]]
+    score = (np.einsum("ij,ij->i", learner, skill) + np.einsum("ij,ij->i", teacher, skill)) / 2
+    return np.round(score.astype(float) * 100, 2)
+
+
+def record(matches):
+    """Store confidences for newly created matches that are not stored yet."""
+    if matches is None or matches.empty or not {"Learner", "Teacher"}.issubset(matches.columns):
+        return
+    confidences(matches)
+
+
+def confidences(matches):
+    """Confidence (%) for every row of ``matches``; missing pairs are computed and stored."""
+    keys = _keys(matches)
+    stored = storage.load("match_confidence") if storage.exists("match_confidence") else None
+    if stored is None or stored.empty:
+        stored = pd.DataFrame(columns=KEY_COLUMNS + ["Confidence"])
+    stored = _keys(stored).assign(Confidence=stored["Confidence"]).drop_duplicates(KEY_COLUMNS, keep="last")
+
+    merged = keys.merge(stored, on=KEY_COLUMNS, how="left")
+    missing = merged["Confidence"].isna().to_numpy()
+    if missing.any():
+        new_keys = keys[missing].drop_duplicates(KEY_COLUMNS)
+        new_rows = new_keys.assign(Confidence=compute_confidences(new_keys))
+        storage.append("match_confidence", new_rows)
+        known = pd.concat([stored, new_rows], ignore_index=True) if len(stored) else new_rows
+        merged = keys.merge(known, on=KEY_COLUMNS, how="left")
+    return merged["Confidence"].astype(float).to_numpy()
+
+
+def paired_view(matches):
+    """Two rows per match (learner's and teacher's view) with their confidence."""
+    keys = _keys(matches).reset_index(drop=True)
+    confidence = confidences(matches)
+    learners, teachers = keys["Learner"].str.title(), keys["Teacher"].str.title()
+    as_learner = pd.DataFrame({"User": learners, "Paired With": teachers, "Role": "Learner",
+                               "Skill": keys["Skill"], "AI Confidence": confidence})
+    as_teacher = pd.DataFrame({"User": teachers, "Paired With": learners, "Role": "Teacher",
+                               "Skill": keys["Skill"], "AI Confidence": confidence})
+    # Interleave so each pair's two rows stay together, as before
+    paired = pd.concat([as_learner, as_teacher], keys=[0, 1]).swaplevel().sort_index()
+    return paired.reset_index(drop=True)
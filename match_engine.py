@@ -1,78 +1,510 @@
 # match_engine.py
 
+import numpy as np
 import pandas as pd
-from sentence_transformers import SentenceTransformer, util
 import os
 from datetime import datetime
+from constants import MODEL_NAME
+from embedding_store import encode as cached_encode, cos_sim
+from model_registry import cache_name
+from assignment import optimal_assignment
+from skill_index import SkillIndex
+import skill_shards
+import storage
+import targets
+import metrics
+import match_confidence
+import bulk_encoder
+from match_results import first_exact_teacher
+from teacher_features import TeacherFeatures, level_codes, rated_scores
 
 # --- Paths ---
 DATA_DIR = "data"
 MATCHES_FILE = os.path.join(DATA_DIR, "matches.csv")
 USER_FILE = os.path.join(DATA_DIR, "users.csv")
 TARGETS_FILE = os.path.join(DATA_DIR, "targets.csv")
+UNMATCHED_FILE = os.path.join(DATA_DIR, "unmatched.csv")
+TEACHER_INDEX_FILE = os.path.join(DATA_DIR, "teacher_index.npz")
 
-# --- Load model once ---
-model = SentenceTransformer("all-MiniLM-L6-v2")
+# Distinct learner skills scored at once in vectorized mode
+SCORE_CHUNK = 1024
 
 # --- AI-Powered Match Learners to Teachers ---
-def find_matches(users_df, threshold=0.6):
+@metrics.timed("find_matches")
+def find_matches(users_df, threshold=0.6, mode="vectorized", capacity=1, prefilter=None, show_progress=False,
+                 scoring="cosine"):
+    """Pair each open learner with their most similar open teacher.
+
+    ``mode="vectorized"`` scores each distinct learner skill against the
+    distinct teacher skills in chunked matrix products; ``mode="loop"`` is
+    the original pairwise scan.
+    Both are greedy and return the same matches at the same ``threshold``.
+    ``mode="optimal"`` maximises total confidence with each teacher taking at
+    most ``capacity`` learners (or their own ``Capacity`` column value).
+    ``mode="ann"`` looks teachers up in the approximate ``SkillIndex`` instead
+    of scoring all of them, for teacher pools too large for a dense matrix.
+    ``mode="sharded"`` splits users by skill cluster and matches the shards
+    in parallel, with a cross-shard pass for learners left over; see
+    ``skill_shards`` for the pool size, executor and fallback settings.
+    ``prefilter="exact"`` first pairs learners with a teacher of exactly the
+    same (normalised) skill at 100% confidence, and only scores the rest.
+    ``scoring="rated"`` (vectorized mode) ranks the teachers above the
+    threshold by similarity plus their rating and skill-level fit, see
+    ``teacher_features``; the reported confidence stays the similarity.
+
+    Skill texts missing from the embedding cache are encoded up front by
+    ``bulk_encoder`` (across processes for large imports). ``show_progress``
+    is True to print that progress or a ``callback(done, total)``.
+
+    Matched users are flagged in ``users_df`` but nothing is written here:
+    the caller commits users, matches and unmatched together with
+    ``storage.transaction()``.
+    """
     required_columns = ["Name", "WantsToLearn", "CanTeach", "IsMatched"]
     if not all(col in users_df.columns for col in required_columns):
         return pd.DataFrame(), []
 
+    progress = show_progress if callable(show_progress) else (bulk_encoder.print_progress if show_progress else None)
+    bulk_encoder.encode_bulk(bulk_encoder.skill_texts(users_df[users_df["IsMatched"] != True]), progress)
+
+    matches, unmatched_learners = match_users(users_df, threshold, mode, capacity, prefilter, scoring)
+
+    # Mark both as matched in the original DataFrame, in one pass over the names
+    matched_names = [match["Learner"] for match in matches] + [match["Teacher"] for match in matches]
+    users_df.loc[users_df["Name"].isin(matched_names), "IsMatched"] = True
+
+    matches_df = pd.DataFrame(matches)
+    match_confidence.record(matches_df)
+    return matches_df, unmatched_learners
+
+def match_users(users_df, threshold=0.6, mode="vectorized", capacity=1, prefilter=None, scoring="cosine"):
+    """Compute matches for the open users without touching ``users_df`` or disk."""
     learners = users_df[(users_df["WantsToLearn"].notnull()) & (users_df["IsMatched"] != True)].copy()
     teachers = users_df[(users_df["CanTeach"].notnull()) & (users_df["IsMatched"] != True)].copy()
 
+    if prefilter == "exact":
+        exact_matches, learners = _exact_prefilter(learners, teachers, mode)
+        matches, unmatched_learners = _dispatch(learners, teachers, threshold, mode, capacity, scoring)
+        return exact_matches + matches, unmatched_learners
+    if prefilter is not None:
+        raise ValueError(f"Unknown prefilter: {prefilter}")
+    return _dispatch(learners, teachers, threshold, mode, capacity, scoring)
+
+def _dispatch(learners, teachers, threshold, mode, capacity, scoring="cosine"):
+    if scoring not in ("cosine", "rated"):
+        raise ValueError(f"Unknown scoring: {scoring}")
+    if scoring == "rated" and mode != "vectorized":
+        raise ValueError("scoring='rated' is only supported with mode='vectorized'")
+    if mode == "vectorized":
+        return _match_vectorized(learners, teachers, threshold, scoring)
+    if mode == "loop":
+        return _match_loop(learners, teachers, threshold)
+    if mode == "optimal":
+        return _match_optimal(learners, teachers, threshold, capacity)
+    if mode == "ann":
+        return _match_ann(learners, teachers, threshold)
+    if mode == "sharded":
+        return _match_sharded(learners, teachers, threshold)
+    raise ValueError(f"Unknown matching mode: {mode}")
+
+def _exact_prefilter(learners, teachers, mode):
+    """Pair learners that have an exact-skill teacher; return them and the remaining learners."""
+    if mode == "optimal":
+        # Exact pairs would not count against teacher capacity
+        raise ValueError("prefilter='exact' is not supported with mode='optimal'")
+    first = first_exact_teacher(learners["Name"], learners["WantsToLearn"], teachers["Name"], teachers["CanTeach"])
+    found = first >= 0
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    teacher_rows = teachers.iloc[first[found]]
+    matches = [
+        _build_match(learner_name, str(learner_skill), teacher_name, teacher_skill, 1.0, timestamp)
+        for learner_name, learner_skill, teacher_name, teacher_skill in zip(
+            learners["Name"][found], learners["WantsToLearn"][found],
+            teacher_rows["Name"], teacher_rows["CanTeach"])
+    ]
+    return matches, learners[~found]
+
+def _build_match(learner_name, learner_skill, teacher_name, teacher_skill, score, timestamp=None):
+    return {
+        "Learner": learner_name,
+        "Teacher": teacher_name,
+        "Skill": learner_skill,
+        "AI_Confidence (%)": round(score * 100, 2),
+        "Explanation": f"Paired based on similarity between '{learner_skill}' and '{teacher_skill}'",
+        "Timestamp": timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def _match_loop(learners, teachers, threshold):
     matches = []
-    matched_learners = set()
     unmatched_learners = []
 
     for _, learner_row in learners.iterrows():
         learner_name = learner_row["Name"]
         learner_skill = str(learner_row["WantsToLearn"])
-        learner_embedding = model.encode(learner_skill)
+        learner_embedding = cached_encode([learner_skill])[0]
 
         best_score = 0
         best_teacher = None
 
         for _, teacher_row in teachers.iterrows():
-            teacher_name = teacher_row["Name"]
             teacher_skill = str(teacher_row["CanTeach"])
-            teacher_embedding = model.encode(teacher_skill)
+            teacher_embedding = cached_encode([teacher_skill])[0]
 
-            score = util.cos_sim(learner_embedding, teacher_embedding).item()
+            score = cos_sim(learner_embedding, teacher_embedding)
 
             if score > best_score and score >= threshold:
                 best_score = score
                 best_teacher = teacher_row
 
         if best_teacher is not None:
-            matches.append({
-                "Learner": learner_name,
-                "Teacher": best_teacher["Name"],
-                "Skill": learner_skill,
-                "AI_Confidence (%)": round(best_score * 100, 2),
-                "Explanation": f"Paired based on similarity between '{learner_skill}' and '{best_teacher['CanTeach']}'",
-                "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
-            matched_learners.add(learner_name)
-
-            # Mark both as matched in the original DataFrame
-            users_df.loc[users_df["Name"] == learner_name, "IsMatched"] = True
-            users_df.loc[users_df["Name"] == best_teacher["Name"], "IsMatched"] = True
+            matches.append(_build_match(
+                learner_name, learner_skill, best_teacher["Name"], best_teacher["CanTeach"], best_score
+            ))
         else:
             unmatched_learners.append(learner_name)
 
-    # Save updated user match status
-    users_df.to_csv(USER_FILE, index=False)
+    return matches, unmatched_learners
 
-    matches_df = pd.DataFrame(matches)
-    return matches_df, unmatched_learners
+def _encode_normalized(texts):
+    """Encode unique texts in one batch and L2-normalise the rows."""
+    embeddings = cached_encode(texts)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-8)
+
+def _skill_codes(skills):
+    """Distinct skills in first-seen order plus each row's index into them."""
+    unique = list(dict.fromkeys(skills))
+    pos = {skill: i for i, skill in enumerate(unique)}
+    codes = np.fromiter((pos[s] for s in skills), dtype=np.intp, count=len(skills))
+    return unique, codes
+
+def _first_rows(codes, n_codes):
+    """Row of the first occurrence of each code."""
+    first = np.zeros(n_codes, dtype=np.intp)
+    first[codes[::-1]] = np.arange(len(codes))[::-1]
+    return first
+
+@metrics.timed("similarity_matrix")
+def best_teacher_rows(learner_skills, teacher_skills, threshold):
+    """Best teacher row and cosine score for each distinct learner skill.
+
+    Only distinct skills are scored, ``SCORE_CHUNK`` learner skills at a
+    time, so memory is bounded by the chunk times the distinct teacher
+    skills however many users share them. Ties go to the first teacher in
+    row order, as in the loop. Returns each learner's skill code and, per
+    distinct learner skill, ``(teacher_row, score)`` with row -1 for no match.
+    """
+    unique_learn, learner_codes = _skill_codes(learner_skills)
+    unique_teach, teacher_codes = _skill_codes(teacher_skills)
+    learn_vectors = _encode_normalized(unique_learn)
+    teach_vectors = _encode_normalized(unique_teach)
+    first_rows = _first_rows(teacher_codes, len(unique_teach))
+
+    rows = np.full(len(unique_learn), -1, dtype=np.intp)
+    scores = np.zeros(len(unique_learn), dtype=np.float32)
+    for lo in range(0, len(unique_learn), SCORE_CHUNK):
+        hi = lo + SCORE_CHUNK
+        rows[lo:hi], scores[lo:hi] = skill_shards.best_teachers(learn_vectors[lo:hi], teach_vectors, first_rows,
+                                                                threshold)
+    return learner_codes, rows, scores
+
+@metrics.timed("similarity_matrix")
+def rated_teacher_rows(learners, teachers, threshold):
+    """``best_teacher_rows`` ranked by ``teacher_features.rated_scores``.
+
+    The rank depends on the learner's level and each teacher's features, so
+    learners are grouped by (skill, level) and each chunk of groups is
+    scored against every teacher row. Codes index the groups.
+    """
+    unique_learn, learner_codes = _skill_codes(learners["WantsToLearn"].astype(str).tolist())
+    unique_teach, teacher_codes = _skill_codes(teachers["CanTeach"].astype(str).tolist())
+    learn_vectors = _encode_normalized(unique_learn)
+    teach_vectors = _encode_normalized(unique_teach)
+    levels = level_codes(learners["SkillLevel"]) if "SkillLevel" in learners else np.full(len(learners), -1)
+    groups, codes = np.unique(learner_codes * 4 + (levels.astype(np.intp) + 1), return_inverse=True)
+    features = TeacherFeatures.build(teachers)
+
+    rows = np.full(len(groups), -1, dtype=np.intp)
+    scores = np.zeros(len(groups), dtype=np.float32)
+    for lo in range(0, len(groups), SCORE_CHUNK):
+        chunk = groups[lo:lo + SCORE_CHUNK]
+        similarity = (learn_vectors[chunk // 4] @ teach_vectors.T)[:, teacher_codes]
+        eligible = (similarity >= threshold) & (similarity > 0)
+        rank = rated_scores(similarity, chunk % 4 - 1, features)
+        best = np.where(eligible, rank, -np.inf).argmax(axis=1)
+        found = eligible.any(axis=1)
+        rows[lo:lo + len(chunk)] = np.where(found, best, -1)
+        scores[lo:lo + len(chunk)] = np.where(found, similarity[np.arange(len(chunk)), best], 0.0)
+    return codes.reshape(-1), rows, scores
+
+def _match_vectorized(learners, teachers, threshold, scoring="cosine"):
+    learner_names = learners["Name"].tolist()
+    learner_skills = learners["WantsToLearn"].astype(str).tolist()
+    teacher_names = teachers["Name"].tolist()
+    teacher_skills = teachers["CanTeach"].astype(str).tolist()
+
+    if not learner_names:
+        return [], []
+    if not teacher_names:
+        return [], learner_names
+
+    # Same acceptance rule as the loop: strictly positive and above threshold,
+    # with ties going to the first teacher in row order
+    if scoring == "rated":
+        codes, rows, scores = rated_teacher_rows(learners, teachers, threshold)
+    else:
+        codes, rows, scores = best_teacher_rows(learner_skills, teacher_skills, threshold)
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    matches = []
+    unmatched_learners = []
+    for learner_name, learner_skill, code in zip(learner_names, learner_skills, codes):
+        j = rows[code]
+        if j >= 0:
+            matches.append(_build_match(
+                learner_name, learner_skill, teacher_names[j], teacher_skills[j], float(scores[code]), timestamp
+            ))
+        else:
+            unmatched_learners.append(learner_name)
+
+    return matches, unmatched_learners
+
+def _match_optimal(learners, teachers, threshold, capacity):
+    learner_names = learners["Name"].tolist()
+    learner_skills = learners["WantsToLearn"].astype(str).tolist()
+    teacher_names = teachers["Name"].tolist()
+    teacher_skills = teachers["CanTeach"].astype(str).tolist()
+
+    if not learner_names:
+        return [], []
+    if not teacher_names:
+        return [], learner_names
+
+    if "Capacity" in teachers.columns:
+        capacities = pd.to_numeric(teachers["Capacity"], errors="coerce").fillna(capacity).astype(int)
+    else:
+        capacities = np.full(len(teacher_names), capacity, dtype=int)
+
+    unique_learn, learner_codes = _skill_codes(learner_skills)
+    unique_teach, teacher_codes = _skill_codes(teacher_skills)
+    skill_scores = _encode_normalized(unique_learn) @ _encode_normalized(unique_teach).T
+    learner_idx, teacher_idx, scores = optimal_assignment(
+        learner_codes, teacher_codes, capacities, skill_scores, threshold
+    )
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    matches = [
+        _build_match(learner_names[i], learner_skills[i], teacher_names[j], teacher_skills[j],
+                     float(score), timestamp)
+        for i, j, score in zip(learner_idx, teacher_idx, scores)
+    ]
+    matched = set(learner_idx.tolist())
+    unmatched_learners = [name for i, name in enumerate(learner_names) if i not in matched]
+    return matches, unmatched_learners
+
+def _match_ann(learners, teachers, threshold):
+    learner_names = learners["Name"].tolist()
+    learner_skills = learners["WantsToLearn"].astype(str).tolist()
+
+    if not learner_names:
+        return [], []
+    if teachers.empty:
+        return [], learner_names
+
+    index = load_teacher_index(teachers)
+    index.save(teacher_index_path())
+    teacher_skills = dict(zip(teachers["Name"].astype(str), teachers["CanTeach"].astype(str)))
+
+    # Learners sharing a skill share a query
+    unique_learn, codes = _skill_codes(learner_skills)
+    hits = index.search(cached_encode(unique_learn), k=1, threshold=threshold)
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    matches = []
+    unmatched_learners = []
+    for learner_name, learner_skill, code in zip(learner_names, learner_skills, codes):
+        if hits[code]:
+            teacher_name, score = hits[code][0]
+            matches.append(_build_match(
+                learner_name, learner_skill, teacher_name, teacher_skills[teacher_name], score, timestamp
+            ))
+        else:
+            unmatched_learners.append(learner_name)
+
+    return matches, unmatched_learners
+
+@metrics.timed("match_sharded")
+def _match_sharded(learners, teachers, threshold):
+    learner_names = learners["Name"].tolist()
+    learner_skills = learners["WantsToLearn"].astype(str).tolist()
+    teacher_names = teachers["Name"].tolist()
+    teacher_skills = teachers["CanTeach"].astype(str).tolist()
+
+    if not learner_names:
+        return [], []
+    if not teacher_names:
+        return [], learner_names
+
+    unique_learn, learner_codes = _skill_codes(learner_skills)
+    unique_teach, teacher_codes = _skill_codes(teacher_skills)
+    learn_vectors = _encode_normalized(unique_learn)
+    teach_vectors = _encode_normalized(unique_teach)
+
+    # Clustered once on the skills seen first; later skills join the nearest centroid
+    clusters = skill_shards.get_clusters(unique_learn + unique_teach, np.vstack([learn_vectors, teach_vectors]))
+    first_rows = _first_rows(teacher_codes, len(unique_teach))
+    rows, skill_scores = skill_shards.match_shards(
+        learn_vectors, skill_shards.assign(clusters, learn_vectors),
+        teach_vectors, skill_shards.assign(clusters, teach_vectors),
+        first_rows, threshold,
+    )
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    matches = []
+    unmatched_learners = []
+    for learner_name, learner_skill, code in zip(learner_names, learner_skills, learner_codes):
+        j = rows[code]
+        if j >= 0:
+            matches.append(_build_match(
+                learner_name, learner_skill, teacher_names[j], teacher_skills[j], float(skill_scores[code]), timestamp
+            ))
+        else:
+            unmatched_learners.append(learner_name)
+
+    return matches, unmatched_learners
+
+# --- Teacher Skill Index ---
+def teacher_index_path():
+    """Saved index file for the active embedding backend."""
+    name = cache_name()
+    if name == MODEL_NAME:
+        return TEACHER_INDEX_FILE
+    return TEACHER_INDEX_FILE.replace(".npz", f"_{name.rsplit('@', 1)[-1]}.npz")
+
+def load_teacher_index(teachers, path=None):
+    """Open the saved teacher index and bring it in line with ``teachers``.
+
+    Teachers no longer in the frame are removed and new ones added, so an
+    existing index is never re-clustered from scratch.
+    """
+    path = path or teacher_index_path()
+    index = SkillIndex.load(path) if os.path.exists(path) else SkillIndex()
+    names = teachers["Name"].astype(str).tolist()
+    skills = teachers["CanTeach"].astype(str).tolist()
+
+    open_names = set(names)
+    index.remove([name for name in index.ids if name not in open_names])
+    new = [(name, skill) for name, skill in zip(names, skills) if name not in index]
+    if new:
+        new_names, new_skills = zip(*new)
+        index.add(new_names, cached_encode(list(new_skills)))
+    return index
+
+def _update_teacher_index(add=None, remove=None, path=None):
+    """Keep a saved teacher index current after a single registration."""
+    path = path or teacher_index_path()
+    if not os.path.exists(path):
+        return
+    index = SkillIndex.load(path)
+    if remove:
+        index.remove([remove])
+    if add:
+        index.add([add[0]], cached_encode([add[1]]))
+    index.save(path)
+
+# --- Incremental Match for a Newly Registered User ---
+@metrics.timed("match_new_user")
+def match_new_user(user, users_df, threshold=0.6, saved=False):
+    """Match one new user against the open pool on the other side.
+
+    A new learner is paired with their most similar open teacher; a new
+    teacher picks up the most similar waiting learner (earliest registered
+    on ties). Only the new user's skill and the distinct open skills are
+    scored, all through the embedding cache. The match is appended to
+    ``matches.csv`` and ``unmatched.csv`` is updated for the one learner
+    involved. ``users.csv`` gets a single appended row unless an existing
+    user's ``IsMatched`` flag changes. All of it is one storage commit.
+
+    ``saved=True`` means the user's row is already stored (registration
+    writes it before matching runs in the background), so it is updated
+    rather than appended.
+
+    Returns ``(users_df, match)`` where ``users_df`` includes the new user
+    and ``match`` is the new match row or ``None``.
+    """
+    user = dict(user)
+    user["IsMatched"] = False
+    is_learner = _has_skill(user.get("WantsToLearn"))
+    skill = str(user.get("WantsToLearn") if is_learner else user.get("CanTeach", ""))
+
+    # The pool is the open users on the other side of the new user
+    side = "CanTeach" if is_learner else "WantsToLearn"
+    open_mask = (users_df["IsMatched"] != True) & users_df[side].map(_has_skill)
+    pool = users_df[open_mask]
+
+    match = None
+    if _has_skill(skill) and not pool.empty:
+        pool_skills = pool[side].astype(str).tolist()
+        unique_skills, codes = _skill_codes(pool_skills)
+        skill_scores = (_encode_normalized([skill]) @ _encode_normalized(unique_skills).T)[0]
+        scores = skill_scores[codes]
+        eligible = (scores >= threshold) & (scores > 0)
+        if eligible.any():
+            best = int(np.where(eligible, scores, -np.inf).argmax())
+            partner = pool.iloc[best]
+            if is_learner:
+                match = _build_match(user["Name"], skill, partner["Name"], partner[side], float(scores[best]))
+            else:
+                match = _build_match(partner["Name"], partner[side], user["Name"], skill, float(scores[best]))
+
+    new_row = pd.DataFrame([user])
+    new_row["IsMatched"] = match is not None
+    # The row's all-NA columns (the other side's skill) take the frame's dtypes
+    parts = [users_df, new_row.dropna(axis=1, how="all")] if not users_df.empty else [new_row]
+    users_df = pd.concat(parts, ignore_index=True)
+
+    if match is not None:
+        users_df.loc[users_df["Name"] == partner["Name"], "IsMatched"] = True
+        with storage.transaction() as tx:
+            if saved:
+                tx.save_user_changes(users_df, None, [partner["Name"], user["Name"]], USER_FILE)
+            else:
+                tx.save_user_changes(users_df, new_row, [partner["Name"]], USER_FILE)
+            tx.append("matches", pd.DataFrame([match]), MATCHES_FILE)
+            if not is_learner:
+                tx.delete_unmatched(partner["Name"], UNMATCHED_FILE)
+        match_confidence.record(pd.DataFrame([match]))
+        if is_learner:
+            _update_teacher_index(remove=str(partner["Name"]))
+    else:
+        with storage.transaction() as tx:
+            if not saved:
+                tx.save_user_changes(users_df, new_row, path=USER_FILE)
+            if is_learner:
+                tx.append("unmatched", pd.DataFrame([{
+                    "Name": user["Name"], "WantsToLearn": skill, "Reason": "No teacher above threshold"
+                }]), UNMATCHED_FILE)
+        if not is_learner and _has_skill(skill):
+            _update_teacher_index(add=(str(user["Name"]), skill))
+
+    return users_df, match
+
+def match_registered_user(name, users_df, threshold=0.6):
+    """Run ``match_new_user`` for a user whose row is already in ``users_df`` and on disk."""
+    rows = users_df["Name"] == name
+    if not rows.any() or (users_df.loc[rows, "IsMatched"] == True).any():
+        return users_df, None
+    user = users_df[rows].iloc[-1].to_dict()
+    return match_new_user(user, users_df[~rows], threshold, saved=True)
+
+def _has_skill(value):
+    return pd.notnull(value) and str(value).strip() != ""
 
 # --- Save matches to CSV ---
 def save_matches(matches_df):
     if not matches_df.empty:
-        matches_df.to_csv(MATCHES_FILE, index=False)
+        storage.save("matches", matches_df, MATCHES_FILE)
 
 # --- Display a Learner's Match ---
 def display_learner_match(name, matches_df):
@@ -86,27 +518,4 @@ def get_unmatched_learners(unmatched_names):
 
 # --- Generate AI-Inferred Study Targets ---
 def generate_study_targets(users_df):
-    targets = []
-    for _, row in users_df.iterrows():
-        base = 30
-        boost = 10 if str(row.get("SkillLevel", "")).lower() == "beginner" else 5
-
-        wants = str(row.get("WantsToLearn", ""))
-        teach = str(row.get("CanTeach", ""))
-
-        try:
-            sim_score = util.cos_sim(
-                model.encode(wants, convert_to_tensor=True),
-                model.encode(teach, convert_to_tensor=True)
-            ).item() * 10
-        except:
-            sim_score = 0
-
-        targets.append({
-            "Name": row["Name"],
-            "TargetMinutes": round(base + boost + sim_score, 2)
-        })
-
-    df = pd.DataFrame(targets)
-    df.to_csv(TARGETS_FILE, index=False)
-    return df
+    return targets.update_targets(users_df, TARGETS_FILE)
@@ -1,22 +1,104 @@
+# match_results.py
+#
+# Exact-skill matching.
+#
+# Pairs every learner with every teacher whose CanTeach equals their
+# WantsToLearn after normalisation (case, surrounding and repeated
+# whitespace). Teachers are sorted by skill once and each learner's
+# teachers are a contiguous slice of that order, so pairs are produced
+# by a hash/sort join in fixed-size chunks instead of a nested scan.
+
+import numpy as np
 import pandas as pd
-def generate_matches(df):
-    matches = []
-    for _, learner in df.iterrows():
-        for _, teacher in df.iterrows():
-            if (
-                learner["WantsToLearn"] == teacher["CanTeach"]
-                and learner["Name"] != teacher["Name"]
-            ):
-                matches.append({
-                    "User1": learner["Name"],
-                    "User2": teacher["Name"],
-                    "SharedSkill": learner["WantsToLearn"]
-                })
-    return pd.DataFrame(matches)
-
-# Example: Reading a CSV file
-data = pd.read_csv('file.csv')
-print(data.head())
+
+import metrics
+
+CHUNK_ROWS = 100_000
+MATCH_COLUMNS = ["User1", "User2", "SharedSkill"]
+
+
+def normalize_skill(values):
+    """Lower-cased, whitespace-collapsed skill text; missing values stay missing."""
+    values = pd.Series(values)
+    normalized = values.astype(str).str.strip().str.lower().str.replace(r"\s+", " ", regex=True)
+    return normalized.where(values.notna())
+
+
+def _join_plan(learner_skills, teacher_skills):
+    """Teacher positions sorted by skill, and each learner's [start, stop) slice of them."""
+    learner_keys = normalize_skill(learner_skills).reset_index(drop=True)
+    teacher_keys = normalize_skill(teacher_skills).reset_index(drop=True)
+    codes, _ = pd.factorize(pd.concat([learner_keys, teacher_keys], ignore_index=True))
+    learner_codes, teacher_codes = codes[:len(learner_keys)], codes[len(learner_keys):]
+
+    order = np.argsort(teacher_codes, kind="stable")
+    sorted_codes = teacher_codes[order]
+    start = np.searchsorted(sorted_codes, learner_codes, side="left")
+    stop = np.searchsorted(sorted_codes, learner_codes, side="right")
+    stop[learner_codes < 0] = start[learner_codes < 0]  # missing skills match nothing
+    return order, start, stop
+
+
+def iter_pairs(learner_skills, teacher_skills, chunksize=CHUNK_ROWS):
+    """Yield ``(learner_pos, teacher_pos)`` arrays of at most ``chunksize`` exact pairs.
+
+    Pairs come in learner order, then teacher order, like a nested loop would.
+    """
+    order, start, stop = _join_plan(learner_skills, teacher_skills)
+    offsets = np.concatenate([[0], np.cumsum(stop - start)])
+    total = int(offsets[-1])
+    for lo in range(0, total, chunksize):
+        flat = np.arange(lo, min(lo + chunksize, total))
+        learner_pos = np.searchsorted(offsets, flat, side="right") - 1
+        yield learner_pos, order[start[learner_pos] + flat - offsets[learner_pos]]
+
+
+def iter_matches(df, chunksize=CHUNK_ROWS):
+    """Stream exact-skill pairs of ``df`` as DataFrames with ``MATCH_COLUMNS``."""
+    names = df["Name"].to_numpy()
+    wants = df["WantsToLearn"].to_numpy()
+    for learner_pos, teacher_pos in iter_pairs(df["WantsToLearn"], df["CanTeach"], chunksize):
+        keep = names[learner_pos] != names[teacher_pos]
+        learner_pos, teacher_pos = learner_pos[keep], teacher_pos[keep]
+        if len(learner_pos):
+            yield pd.DataFrame({
+                "User1": names[learner_pos],
+                "User2": names[teacher_pos],
+                "SharedSkill": wants[learner_pos],
+            })
+
+
+def generate_matches(df, chunksize=CHUNK_ROWS):
+    """All exact-skill learner/teacher pairs of ``df`` in one DataFrame."""
+    chunks = list(iter_matches(df, chunksize))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=MATCH_COLUMNS)
+
+
+def save_matches(df, path, chunksize=CHUNK_ROWS):
+    """Write every exact-skill pair to ``path`` one chunk at a time; returns the row count."""
+    rows = 0
+    pd.DataFrame(columns=MATCH_COLUMNS).to_csv(path, index=False)
+    for chunk in iter_matches(df, chunksize):
+        with metrics.timer("csv.write"):
+            chunk.to_csv(path, mode="a", header=False, index=False)
+        rows += len(chunk)
+    return rows
 
 
+def first_exact_teacher(learner_names, learner_skills, teacher_names, teacher_skills):
+    """Position of each learner's first exact-skill teacher other than themselves, or -1."""
+    if len(teacher_names) == 0:
+        return np.full(len(learner_names), -1, dtype=np.intp)
+    order, start, stop = _join_plan(learner_skills, teacher_skills)
+    learner_names = np.asarray(learner_names, dtype=object)
+    teacher_names = np.asarray(teacher_names, dtype=object)
 
+    first = np.full(len(start), -1, dtype=np.intp)
+    has_any = start < stop
+    first[has_any] = order[start[has_any]]
+    # A user who both wants and teaches the same skill is skipped in favour of the next teacher
+    is_self = has_any & (teacher_names[np.maximum(first, 0)] == learner_names)
+    has_next = is_self & (start + 1 < stop)
+    first[is_self] = -1
+    first[has_next] = order[start[has_next] + 1]
+    return first
@@ -0,0 +1,322 @@
+# match_worker.py
+#
+# Background matching.
+#
+# Page renders never run the model: registration stores the new user and
+# queues a "user_registered" job, and the admin button queues a "rematch"
+# job. Jobs live in a small SQLite queue (data/jobs.db) and are processed
+# in batches by a worker thread started inside the app, or by a separate
+# process:
+#     python match_worker.py
+# Results are published through storage.transaction() (files renamed
+# together under a lock, or one SQLite transaction), so the UI only ever
+# reads complete match tables from the same run.
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+from filelock import FileLock
+
+import metrics
+import storage
+import user_schema
+from match_engine import find_matches, match_registered_user
+
+# --- Setup ---
+DATA_DIR = "data"
+JOBS_DB = os.path.join(DATA_DIR, "jobs.db")
+WRITE_LOCK_FILE = os.path.join(DATA_DIR, "matching.lock")
+THRESHOLD = 0.6
+BATCH_SIZE = 50
+POLL_INTERVAL = 1.0
+HEARTBEAT_INTERVAL = 10.0   # seconds between lease renewals of running jobs
+LEASE_SECONDS = 60.0        # a running job not renewed for this long belongs to a dead worker
+
+USER_REGISTERED = "user_registered"
+REMATCH = "rematch"
+
+_local = threading.local()
+_write_lock = FileLock(WRITE_LOCK_FILE)
+
+
+# --- Queue ---
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(JOBS_DB) or ".", exist_ok=True)
+        conn = sqlite3.connect(JOBS_DB, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, payload TEXT, "
+            "status TEXT NOT NULL DEFAULT 'queued', created TEXT, started TEXT, finished TEXT, "
+            "result TEXT, error TEXT, progress REAL, heartbeat REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, id)")
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column in ("progress", "heartbeat"):
+            if column not in existing:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} REAL")
+        _local.conn = conn
+    return conn
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def enqueue(kind, payload=None):
+    """Queue a job and return its id."""
+    cursor = _connect().execute(
+        "INSERT INTO jobs (kind, payload, created) VALUES (?, ?, ?)",
+        (kind, json.dumps(payload or {}, default=str), _now()),
+    )
+    return cursor.lastrowid
+
+
+def job_status(job_id):
+    """The job as a dict (status, progress, result, error, ...), or None if unknown."""
+    conn = _connect()
+    columns = ["id", "kind", "status", "created", "started", "finished", "result", "error", "progress"]
+    row = conn.execute(f"SELECT {', '.join(columns)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(zip(columns, row))
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def recent_jobs(limit=20):
+    rows = _connect().execute(
+        "SELECT id, kind, status, created, finished, error FROM jobs ORDER BY id DESC LIMIT ?", (limit,)
+    ).fetchall()
+    return pd.DataFrame(rows, columns=["id", "kind", "status", "created", "finished", "error"])
+
+
+def pending_count(kind=None):
+    sql = "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+    params = ()
+    if kind is not None:
+        sql += " AND kind = ?"
+        params = (kind,)
+    return _connect().execute(sql, params).fetchone()[0]
+
+
+def _claim(limit=BATCH_SIZE):
+    """Atomically move up to ``limit`` queued jobs to running and return them."""
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute(
+            "SELECT id, kind, payload FROM jobs WHERE status = 'queued' ORDER BY id LIMIT ?", (limit,)
+        ).fetchall()
+        conn.executemany("UPDATE jobs SET status = 'running', started = ?, heartbeat = ? WHERE id = ?",
+                         [(_now(), time.time(), job_id) for job_id, _, _ in rows])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return [(job_id, kind, json.loads(payload or "{}")) for job_id, kind, payload in rows]
+
+
+def _finish(job_id, result=None, error=None):
+    _connect().execute(
+        "UPDATE jobs SET status = ?, finished = ?, result = ?, error = ? WHERE id = ?",
+        ("failed" if error else "done", _now(), json.dumps(result, default=str) if result is not None else None,
+         error, job_id),
+    )
+
+
+def _set_progress(job_ids, fraction):
+    _connect().executemany("UPDATE jobs SET progress = ? WHERE id = ?", [(fraction, job_id) for job_id in job_ids])
+
+
+def _renew(job_ids):
+    _connect().executemany("UPDATE jobs SET heartbeat = ? WHERE id = ? AND status = 'running'",
+                           [(time.time(), job_id) for job_id in job_ids])
+
+
+def _fail_unfinished(job_ids, error):
+    """Mark jobs of an aborted batch failed instead of leaving them running."""
+    _connect().executemany(
+        "UPDATE jobs SET status = 'failed', finished = ?, error = ? WHERE id = ? AND status = 'running'",
+        [(_now(), error, job_id) for job_id in job_ids],
+    )
+
+
+def _requeue_stale(lease=LEASE_SECONDS):
+    """Jobs whose worker stopped renewing them (it died) are put back in the queue.
+
+    Jobs of a live worker, in this process or another, renew their lease
+    every HEARTBEAT_INTERVAL and are left alone.
+    """
+    _connect().execute(
+        "UPDATE jobs SET status = 'queued', started = NULL, progress = NULL, heartbeat = NULL "
+        "WHERE status = 'running' AND (heartbeat IS NULL OR heartbeat < ?)",
+        (time.time() - lease,),
+    )
+
+
+# --- Entry points used by the UI ---
+def register_user(new_user):
+    """Store a new user right away and queue their matching; returns the job id.
+
+    Only the users schema columns are stored. The row is appended through a
+    storage commit, which never waits for a match run in progress.
+    """
+    row = pd.DataFrame([{col: new_user.get(col) for col in user_schema.USER_COLUMNS}])
+    with storage.transaction() as tx:
+        tx.append("users", row)
+    return enqueue(USER_REGISTERED, {"Name": new_user["Name"]})
+
+
+def request_rematch():
+    """Queue a full re-match unless one is already waiting; returns the job id."""
+    queued = _connect().execute(
+        "SELECT id FROM jobs WHERE kind = ? AND status = 'queued' ORDER BY id LIMIT 1", (REMATCH,)
+    ).fetchone()
+    return queued[0] if queued else enqueue(REMATCH)
+
+
+# --- Processing ---
+def _load_users():
+    return user_schema.enforce(storage.load("users"))
+
+
+def process_batch(jobs):
+    """Run one batch: registrations first, then at most one full re-match.
+
+    The claimed jobs' leases are renewed while the batch runs. If the batch
+    aborts (the users table cannot be loaded, say), its unfinished jobs are
+    marked failed rather than left running. Each batch is one metrics run,
+    so its timings reach the Performance tab like a page rerun's.
+    """
+    job_ids = [job_id for job_id, _, _ in jobs]
+    metrics.begin_run("worker")
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            _renew(job_ids)
+
+    renewer = threading.Thread(target=heartbeat, name="match-worker-heartbeat", daemon=True)
+    renewer.start()
+    try:
+        _process(jobs)
+    except Exception as e:
+        _fail_unfinished(job_ids, repr(e))
+        raise
+    finally:
+        stop.set()
+        renewer.join()
+        metrics.end_run()
+
+
+def _process(jobs):
+    # The lock keeps two workers from matching the same open users; UI writes
+    # go through storage commits and do not wait for it
+    with _write_lock:
+        users_df = _load_users()
+        for job_id, kind, payload in jobs:
+            if kind != USER_REGISTERED:
+                continue
+            try:
+                users_df, match = match_registered_user(payload.get("Name"), users_df, THRESHOLD)
+                _finish(job_id, {"matched": match is not None,
+                                 "Teacher": match["Teacher"] if match else None,
+                                 "Learner": match["Learner"] if match else None})
+            except Exception as e:
+                _finish(job_id, error=repr(e))
+
+        rematch_ids = [job_id for job_id, kind, _ in jobs if kind == REMATCH]
+        if rematch_ids:
+            try:
+                result = _rematch(users_df, rematch_ids)
+                for job_id in rematch_ids:
+                    _finish(job_id, result)
+            except Exception as e:
+                for job_id in rematch_ids:
+                    _finish(job_id, error=repr(e))
+
+        for job_id, kind, _ in jobs:
+            if kind not in (USER_REGISTERED, REMATCH):
+                _finish(job_id, error=f"Unknown job kind: {kind}")
+
+
+def _rematch(users_df, job_ids=()):
+    """Match every open user; new pairs are added to the existing matches."""
+    def progress(done, total):
+        # Encoding is the slow part of a re-match for a large import
+        _set_progress(job_ids, done / total if total else 1.0)
+
+    new_matches, unmatched = find_matches(users_df, threshold=THRESHOLD, show_progress=progress)
+    wants = users_df.drop_duplicates("Name").set_index("Name")["WantsToLearn"]
+    matched_names = list(new_matches["Learner"]) + list(new_matches["Teacher"]) if not new_matches.empty else []
+    # Users, matches and unmatched of one run are published together; users
+    # registered while it ran are kept
+    with storage.transaction() as tx:
+        tx.save_user_changes(users_df, None, matched_names)
+        if storage.exists("matches"):
+            tx.append("matches", new_matches)
+        else:
+            tx.save("matches", new_matches)
+        tx.save("unmatched", pd.DataFrame({
+            "Name": unmatched, "WantsToLearn": wants.reindex(unmatched).values,
+            "Reason": "No teacher above threshold",
+        }))
+    return {"new_matches": len(new_matches), "unmatched": len(unmatched)}
+
+
+def run_once(limit=BATCH_SIZE):
+    """Process one batch of queued jobs; returns how many were claimed."""
+    _requeue_stale()
+    jobs = _claim(limit)
+    if jobs:
+        process_batch(jobs)
+    return len(jobs)
+
+
+def run_forever(poll_interval=POLL_INTERVAL, stop_event=None):
+    while stop_event is None or not stop_event.is_set():
+        try:
+            claimed = run_once()
+        except Exception as e:
+            print("Match worker error:", e)
+            claimed = 0
+        if not claimed:
+            time.sleep(poll_interval)
+
+
+# --- In-process worker thread ---
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def ensure_started():
+    """Start the worker thread once per process (e.g. from app.py).
+
+    Jobs whose lease expired (their worker died) are queued again; jobs a
+    live worker in another process is running keep their lease.
+    """
+    global _thread
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _requeue_stale()
+            _thread = threading.Thread(target=run_forever, name="match-worker", daemon=True)
+            _thread.start()
+    return _thread
+
+
+if __name__ == "__main__":
+    _requeue_stale()
+    print("Match worker running; press Ctrl+C to stop.")
+    try:
+        run_forever()
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,143 @@
+# metrics.py
+#
+# Lightweight timers and counters for the hot paths.
+#
+# Disabled unless GETSKILLED_METRICS=1 (or enable() is called); a disabled
+# timer is a shared no-op context manager and a disabled counter returns
+# immediately. When enabled, each Streamlit rerun collects its own
+# measurements between begin_run() and end_run(); recent summaries are kept
+# for the admin Performance tab and, if GETSKILLED_METRICS_FILE is set,
+# appended to that file as JSON lines.
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+ENABLED = os.environ.get("GETSKILLED_METRICS", "").lower() in ("1", "true", "yes")
+METRICS_FILE = os.environ.get("GETSKILLED_METRICS_FILE") or None
+HISTORY = 50
+
+_local = threading.local()
+_history = deque(maxlen=HISTORY)
+_history_lock = threading.Lock()
+_file_lock = threading.Lock()
+_NOOP = contextlib.nullcontext()
+
+
+def enable(path=METRICS_FILE):
+    global ENABLED, METRICS_FILE
+    ENABLED = True
+    METRICS_FILE = path
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def _current():
+    run = getattr(_local, "run", None)
+    if run is None:
+        run = _local.run = {"label": None, "started": time.time(), "timers": {}, "counters": {}}
+    return run
+
+
+# --- Recording ---
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stats = _current()["timers"].setdefault(self.name, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] = max(stats[2], elapsed)
+        return False
+
+
+def timer(name):
+    """``with timer("csv.read"): ...`` records one call and its duration."""
+    return _Timer(name) if ENABLED else _NOOP
+
+
+def timed(name):
+    """Decorator form of :func:`timer`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _Timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    if not ENABLED:
+        return
+    counters = _current()["counters"]
+    counters[name] = counters.get(name, 0) + n
+
+
+# --- Per-run summaries ---
+def begin_run(label=None):
+    """Start collecting for one rerun on this thread."""
+    if ENABLED:
+        _local.run = {"label": label, "started": time.time(), "timers": {}, "counters": {}}
+
+
+def end_run(label=None):
+    """Finish this thread's run; returns its summary (None when disabled).
+
+    ``label`` replaces the one given to :func:`begin_run`, for runs that only
+    know what they were (e.g. which page) once they are done.
+    """
+    if not ENABLED:
+        return None
+    run = _current()
+    _local.run = None
+    summary = {
+        "label": label or run["label"],
+        "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["started"])),
+        "wall_ms": round((time.time() - run["started"]) * 1000, 2),
+        "timers": {
+            name: {"calls": calls, "total_ms": round(total * 1000, 3), "max_ms": round(peak * 1000, 3)}
+            for name, (calls, total, peak) in sorted(run["timers"].items())
+        },
+        "counters": dict(sorted(run["counters"].items())),
+    }
+    with _history_lock:
+        _history.append(summary)
+    if METRICS_FILE:
+        with _file_lock, open(METRICS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary) + "\n")
+    return summary
+
+
+def recent_runs():
+    """Summaries of the most recent runs, newest last."""
+    with _history_lock:
+        return list(_history)
+
+
+def summary_table(runs=None):
+    """One row per (run, timer) for display: label, name, calls, total and max ms."""
+    rows = []
+    for run in recent_runs() if runs is None else runs:
+        for name, stats in run["timers"].items():
+            rows.append({"started": run["started"], "label": run["label"], "name": name, **stats})
+        for name, value in run["counters"].items():
+            rows.append({"started": run["started"], "label": run["label"], "name": name, "calls": value})
+    return rows
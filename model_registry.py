@@ -0,0 +1,52 @@
+# model_registry.py
+
+import os
+import threading
+
+from constants import MODEL_NAME
+from embedding_backend import SENTENCE_TRANSFORMERS, load_backend
+
+# --- Settings (overridable from the environment) ---
+DEVICE = os.environ.get("GETSKILLED_DEVICE") or None
+NUM_THREADS = int(os.environ.get("GETSKILLED_THREADS", "0")) or None
+BACKEND = os.environ.get("GETSKILLED_BACKEND") or SENTENCE_TRANSFORMERS
+MODEL_DIR = os.environ.get("GETSKILLED_MODEL_DIR") or None
+
+_models = {}
+_lock = threading.Lock()
+
+
+def configure(device=None, num_threads=None, backend=SENTENCE_TRANSFORMERS, model_dir=None):
+    """Set the device, thread count, backend and local model directory used for models loaded after this call."""
+    global DEVICE, NUM_THREADS, BACKEND, MODEL_DIR
+    DEVICE = device
+    NUM_THREADS = num_threads
+    BACKEND = backend
+    MODEL_DIR = model_dir
+
+
+def cache_name(model_name=MODEL_NAME):
+    """Name embeddings are cached under; other backends never share vectors with the default."""
+    return model_name if BACKEND == SENTENCE_TRANSFORMERS else f"{model_name}@{BACKEND}"
+
+
+def get_model(model_name=MODEL_NAME):
+    """Return the process-wide model instance, loading it on first use.
+
+    Every caller (including functions wrapped in ``st.cache_resource``) gets
+    the same object, so the weights are only ever held in memory once.
+    """
+    key = (BACKEND, model_name)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            model = _models[key] = load_backend(BACKEND, model_name, MODEL_DIR, DEVICE, NUM_THREADS)
+    return model
+
+
+def is_loaded(model_name=MODEL_NAME):
+    return (BACKEND, model_name) in _models
@@ -3,47 +3,35 @@
 import pandas as pd
 import os
 from datetime import datetime
+import storage
+import ratings_store
 
 DATA_DIR = "data"
 RATINGS_FILE = os.path.join("data", "ratings.csv")
 
 def load_ratings():
+    """One row per (learner, teacher): the latest rating wins."""
     # If file doesn't exist or is empty, create it with proper headers
-    if not os.path.exists(RATINGS_FILE) or os.path.getsize(RATINGS_FILE) == 0:
+    if not storage.using_sqlite() and (not os.path.exists(RATINGS_FILE) or os.path.getsize(RATINGS_FILE) == 0):
         df = pd.DataFrame(columns=["Learner", "Teacher", "Rating", "Comments"])
-        df.to_csv(RATINGS_FILE, index=False)
+        storage.save("ratings", df, RATINGS_FILE)
         return df
-    return pd.read_csv(RATINGS_FILE)
+    return ratings_store.get_store(RATINGS_FILE).table()
     
 def save_rating(df):
     """Save ratings DataFrame to file."""
-    df.to_csv(RATINGS_FILE, index=False)
+    storage.save("ratings", df, RATINGS_FILE)
 
 def add_rating(learner, teacher, rating):
     """Add a new rating or update if one already exists."""
-    df = load_ratings()
-    # Check if learner has already rated this teacher
-    existing = df[(df["Learner"] == learner) & (df["Teacher"] == teacher)]
-    if not existing.empty:
-        df.loc[existing.index, "Rating"] = rating  # Update rating
-    else:
-        new_row = pd.DataFrame([{"Learner": learner, "Teacher": teacher, "Rating": rating}])
-        df = pd.concat([df, new_row], ignore_index=True)
-    save_rating(df)
+    ratings_store.get_store(RATINGS_FILE).upsert(learner, teacher, rating)
 
 def get_average_ratings():
     """Return average ratings per teacher with star visualizations."""
-    df = load_ratings()
-    if df.empty:
+    # Running per-teacher sums and counts; no rescan of the ratings
+    avg_df = ratings_store.get_store(RATINGS_FILE).averages()
+    if avg_df.empty:
         return pd.DataFrame(columns=["Teacher", "Average Rating", "Stars"])
-    avg_df = df.groupby("Teacher")["Rating"].mean().reset_index()
-    avg_df.columns = ["Teacher", "Average Rating"]
     avg_df["Stars"] = avg_df["Average Rating"].apply(lambda x: "⭐" * int(round(x)))
     return avg_df
 
-def generate_study_targets(users_df):
-    """Simulate weekly study target per user based on their selected study days."""
-    targets = users_df[["Name", "StudyDays"]].copy()
-    targets["TargetMinutes"] = targets["StudyDays"] * 30  # Assume 30 mins per day
-    return targets
-
@@ -0,0 +1,219 @@
+# ratings_store.py
+#
+# Keyed ratings with running per-teacher aggregates.
+#
+# The store keeps the latest rating of every (learner, teacher) pair in a
+# dict and a running sum and count per teacher, so an upsert adjusts one
+# teacher's aggregate in O(1) and average ratings never rescan the rows.
+# With the CSV backend the file is append-only: an upsert appends one row
+# and the last row of a pair wins. Rows appended by other processes are
+# read from the end of the file; any other change (a rewrite, SQLite
+# writes) rebuilds the index. The file is compacted to one row per pair
+# once superseded rows outnumber live ones. Check or compact with:
+#     python ratings_store.py verify
+#     python ratings_store.py compact
+
+import os
+import sys
+import threading
+
+import pandas as pd
+from filelock import FileLock
+
+import metrics
+import storage
+
+# --- Setup ---
+DATA_DIR = "data"
+RATINGS_FILE = os.path.join(DATA_DIR, "ratings.csv")
+RATING_COLUMNS = ["Learner", "Teacher", "Rating", "Comments"]
+AVERAGE_COLUMNS = ["Teacher", "Average Rating"]
+COMPACT_RATIO = 2.0
+
+
+def _is_number(value):
+    return value is not None and not pd.isna(value)
+
+
+class RatingsStore:
+    """Latest rating per (learner, teacher) and sum/count per teacher for one ratings file."""
+
+    def __init__(self, path=RATINGS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(path + ".lock")
+        self._reset()
+
+    def _reset(self):
+        self._ratings = {}      # (learner, teacher) -> (rating, comments)
+        self._sum = {}
+        self._count = {}
+        self._rows = 0          # rows read from the file, superseded ones included
+        self._version = None
+        self._offset = 0
+        self._header = None
+
+    # --- Aggregates ---
+    def _apply(self, learner, teacher, rating, comments=None):
+        key = (learner, teacher)
+        previous = self._ratings.get(key)
+        if previous is not None:
+            if comments is None or pd.isna(comments):
+                comments = previous[1]
+            if _is_number(previous[0]):
+                self._sum[teacher] -= previous[0]
+                self._count[teacher] -= 1
+        if _is_number(rating):
+            self._sum[teacher] = self._sum.get(teacher, 0.0) + rating
+            self._count[teacher] = self._count.get(teacher, 0) + 1
+        self._ratings[key] = (rating, comments)
+        self._rows += 1
+
+    def _apply_frame(self, df):
+        df = storage.canonical_columns("ratings", df).reindex(columns=RATING_COLUMNS)
+        ratings = pd.to_numeric(df["Rating"], errors="coerce")
+        for learner, teacher, rating, comments in zip(df["Learner"], df["Teacher"], ratings, df["Comments"]):
+            self._apply(learner, teacher, float(rating) if _is_number(rating) else None, comments)
+
+    # --- Keeping in step with the file / table ---
+    def _file_state(self):
+        if storage.using_sqlite():
+            return storage.version("ratings")
+        if not os.path.exists(self.path):
+            return None
+        stat = os.stat(self.path)
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _sync(self):
+        state = self._file_state()
+        if state == self._version:
+            return
+        if (not storage.using_sqlite() and self._version is not None and state is not None
+                and state[0] == self._version[0] and state[1] > self._version[1]):
+            self._read_tail()
+        else:
+            self._rebuild()
+        self._version = self._file_state()
+
+    def _rebuild(self):
+        self._reset()
+        if storage.using_sqlite():
+            self._apply_frame(storage.load("ratings"))
+            return
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        with metrics.timer("csv.read"):
+            with open(self.path, "rb") as f:
+                df = pd.read_csv(f)
+                self._offset = f.seek(0, os.SEEK_END)
+        self._header = list(df.columns)
+        self._apply_frame(df)
+
+    def _read_tail(self):
+        """Apply rows appended since the last read (e.g. by another process)."""
+        with metrics.timer("csv.read"):
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                df = pd.read_csv(f, names=self._header, header=None)
+                self._offset = f.seek(0, os.SEEK_END)
+        self._apply_frame(df)
+
+    # --- Public API ---
+    def upsert(self, learner, teacher, rating, comments=None):
+        """Set the rating of ``learner`` for ``teacher``."""
+        with self._lock, self._file_lock:
+            self._sync()
+            if storage.using_sqlite():
+                storage.upsert_rating(learner, teacher, rating)
+            else:
+                previous = self._ratings.get((learner, teacher))
+                if comments is None and previous is not None:
+                    comments = previous[1]
+                storage.append("ratings", pd.DataFrame([{
+                    "Learner": learner, "Teacher": teacher, "Rating": rating, "Comments": comments,
+                }]), self.path)
+            self._apply(learner, teacher, float(rating), comments)
+            if not storage.using_sqlite():
+                self._offset = os.path.getsize(self.path)
+                if self._header is None:
+                    self._header = list(pd.read_csv(self.path, nrows=0).columns)
+            self._version = self._file_state()
+            if self._rows > COMPACT_RATIO * max(len(self._ratings), 1) and len(self._ratings) > 100:
+                self._compact()
+
+    def table(self):
+        """The live ratings, one row per (learner, teacher)."""
+        with self._lock:
+            self._sync()
+            rows = [(learner, teacher, rating, comments)
+                    for (learner, teacher), (rating, comments) in self._ratings.items()]
+        return pd.DataFrame(rows, columns=RATING_COLUMNS)
+
+    def averages(self):
+        """Average rating per teacher, from the running aggregates."""
+        with self._lock:
+            self._sync()
+            rows = [(teacher, self._sum[teacher] / count) for teacher, count in self._count.items() if count]
+        return pd.DataFrame(rows, columns=AVERAGE_COLUMNS)
+
+    def counts(self):
+        """Number of live ratings per teacher."""
+        with self._lock:
+            self._sync()
+            return {teacher: count for teacher, count in self._count.items() if count}
+
+    def compact(self):
+        with self._lock, self._file_lock:
+            self._sync()
+            self._compact()
+
+    def _compact(self):
+        if storage.using_sqlite():
+            return
+        live = pd.DataFrame([(learner, teacher, rating, comments)
+                             for (learner, teacher), (rating, comments) in self._ratings.items()],
+                            columns=RATING_COLUMNS)
+        storage.save("ratings", live, self.path)
+        self._rebuild()
+        self._version = self._file_state()
+
+    def verify(self):
+        """Compare the running aggregates with ones rebuilt from the raw rows; returns mismatches."""
+        with self._lock:
+            self._sync()
+            kept = pd.DataFrame({"Teacher": list(self._count), "Sum": [self._sum[t] for t in self._count],
+                                 "Count": list(self._count.values())})
+        fresh = RatingsStore(self.path)
+        with fresh._lock:
+            fresh._rebuild()
+        rebuilt = pd.DataFrame({"Teacher": list(fresh._count), "Sum": [fresh._sum[t] for t in fresh._count],
+                                "Count": list(fresh._count.values())})
+        merged = kept.merge(rebuilt, on="Teacher", how="outer", suffixes=("", "_raw")).fillna(0)
+        same = ((merged["Sum"] - merged["Sum_raw"]).abs() < 1e-9) & (merged["Count"] == merged["Count_raw"])
+        return merged[~same]
+
+
+# --- Shared stores, one per file ---
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=RATINGS_FILE):
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = RatingsStore(path)
+        return store
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "verify":
+        mismatches = get_store().verify()
+        print("aggregates match the ratings" if mismatches.empty else mismatches.to_string(index=False))
+        sys.exit(0 if mismatches.empty else 1)
+    elif command == "compact":
+        get_store().compact()
+        print(f"{len(get_store().table())} ratings kept")
+    else:
+        print("usage: python ratings_store.py verify|compact")
@@ -0,0 +1,174 @@
+# skill_index.py
+
+import json
+
+import numpy as np
+
+
+class SkillIndex:
+    """In-process IVF (inverted file) index over L2-normalised skill embeddings.
+
+    Vectors are bucketed by their nearest k-means centroid; a query only scans
+    the ``nprobe`` buckets whose centroids are closest to it.  Items are kept
+    in insertion order so equal scores resolve to the earliest item, matching
+    the row-order tie-break of the exact matcher.
+    """
+
+    def __init__(self, n_lists=None, nprobe=4, seed=0):
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids = None
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._ids = []
+        self._lists = np.zeros(0, dtype=np.intp)
+        self._alive = np.zeros(0, dtype=bool)
+        self._row_of = {}
+        self._members = {}
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, item_id):
+        return item_id in self._row_of
+
+    @property
+    def ids(self):
+        return list(self._row_of)
+
+    # --- Building ---
+    def build(self, ids, vectors, iterations=10):
+        """Train centroids on ``vectors`` and index them under ``ids``."""
+        vectors = _normalize(vectors)
+        if not len(vectors):
+            return self
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(vectors))))
+        self.centroids = _spherical_kmeans(vectors, n_lists, iterations, self.seed)
+        self._vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        self._ids = []
+        self._lists = np.zeros(0, dtype=np.intp)
+        self._alive = np.zeros(0, dtype=bool)
+        self._row_of = {}
+        self._members = {}
+        self.add(ids, vectors)
+        return self
+
+    def add(self, ids, vectors):
+        """Index new items; re-adding an existing id replaces its vector."""
+        if self.centroids is None:
+            return self.build(ids, vectors)
+        ids = list(ids)
+        if not ids:
+            return self
+        vectors = _normalize(vectors)
+        self.remove([item_id for item_id in ids if item_id in self._row_of])
+
+        start = len(self._ids)
+        lists = (vectors @ self.centroids.T).argmax(axis=1)
+        self._vectors = np.vstack([self._vectors, vectors])
+        self._ids.extend(ids)
+        self._lists = np.concatenate([self._lists, lists])
+        self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+        for offset, item_id in enumerate(ids):
+            self._row_of[item_id] = start + offset
+        self._index_rows(np.arange(start, start + len(ids)), lists)
+        return self
+
+    def _index_rows(self, rows, lists):
+        for list_id in np.unique(lists):
+            new_rows = rows[lists == list_id]
+            old_rows = self._members.get(int(list_id))
+            self._members[int(list_id)] = new_rows if old_rows is None else np.concatenate([old_rows, new_rows])
+
+    def remove(self, ids):
+        """Drop items (e.g. teachers who just got matched); unknown ids are ignored."""
+        for item_id in ids:
+            row = self._row_of.pop(item_id, None)
+            if row is not None:
+                self._alive[row] = False
+        if len(self._alive) and (~self._alive).sum() > len(self._alive) // 2:
+            self._compact()
+        return self
+
+    def _compact(self):
+        keep = np.nonzero(self._alive)[0]
+        self._vectors = self._vectors[keep]
+        self._ids = [self._ids[row] for row in keep]
+        self._lists = self._lists[keep]
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._row_of = {item_id: row for row, item_id in enumerate(self._ids)}
+        self._members = {}
+        self._index_rows(np.arange(len(keep)), self._lists)
+
+    # --- Querying ---
+    def search(self, queries, k=1, threshold=0.6):
+        """Top-``k`` items per query with cosine score >= ``threshold``.
+
+        Returns one list of ``(id, score)`` pairs per query, best first.
+        """
+        results = []
+        if self.centroids is None or not len(self):
+            return [[] for _ in range(len(queries))]
+
+        queries = _normalize(queries)
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1, kind="stable")[:, :nprobe]
+        for query, lists in zip(queries, probes):
+            rows = np.concatenate([self._members.get(int(list_id), _EMPTY_ROWS) for list_id in lists])
+            rows = rows[self._alive[rows]]
+            scores = self._vectors[rows] @ query
+            keep = (scores >= threshold) & (scores > 0)
+            rows, scores = rows[keep], scores[keep]
+            top = np.lexsort((rows, -scores))[:k]
+            results.append([(self._ids[rows[i]], float(scores[i])) for i in top])
+        return results
+
+    # --- Persistence ---
+    def save(self, path):
+        keep = np.nonzero(self._alive)[0]
+        meta = {"n_lists": self.n_lists, "nprobe": self.nprobe, "seed": self.seed,
+                "ids": [self._ids[row] for row in keep]}
+        centroids = self.centroids if self.centroids is not None else np.zeros((0, 0), dtype=np.float32)
+        with open(path, "wb") as f:
+            np.savez(f, centroids=centroids, vectors=self._vectors[keep],
+                     lists=self._lists[keep], meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            index = cls(meta["n_lists"], meta["nprobe"], meta["seed"])
+            if data["centroids"].size:
+                index.centroids = data["centroids"]
+            index._vectors = data["vectors"]
+            index._lists = data["lists"]
+        index._ids = meta["ids"]
+        index._alive = np.ones(len(index._ids), dtype=bool)
+        index._row_of = {item_id: row for row, item_id in enumerate(index._ids)}
+        index._index_rows(np.arange(len(index._ids)), index._lists)
+        return index
+
+
+_EMPTY_ROWS = np.zeros(0, dtype=np.intp)
+
+
+def _normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-8)
+
+
+def _spherical_kmeans(vectors, n_lists, iterations, seed):
+    """Cosine k-means; centroids start from distinct input vectors."""
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), 256 * n_lists), replace=False)]
+    distinct = np.unique(sample, axis=0)
+    n_lists = min(n_lists, len(distinct))
+    centroids = distinct[rng.choice(len(distinct), n_lists, replace=False)]
+    for _ in range(iterations):
+        assignment = (vectors @ centroids.T).argmax(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        filled = np.linalg.norm(sums, axis=1) > 0
+        centroids[filled] = _normalize(sums[filled])
+    return centroids
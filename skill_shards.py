@@ -0,0 +1,148 @@
+# skill_shards.py
+#
+# Sharded matching by skill cluster.
+#
+# The distinct skills are clustered once by their embeddings (spherical
+# k-means, centroids saved to data/skill_clusters*.npz); later skills join
+# their nearest centroid. Learners and teachers are partitioned by the
+# cluster of their skill and every shard is matched on its own, on a thread
+# or process pool. Within a shard the work is done per distinct skill, since
+# learners with the same skill score the same against every teacher. An
+# optional fallback pass then matches learners left without a teacher in
+# their shard against all teachers, so a skill that landed in the "wrong"
+# cluster still finds its match.
+#
+# Settings can be overridden from the environment or with configure():
+#   GETSKILLED_SHARDS           clusters to create (capped by distinct skills)
+#   GETSKILLED_SHARD_WORKERS    pool size (default: CPU count)
+#   GETSKILLED_SHARD_EXECUTOR   "thread" or "process"
+#   GETSKILLED_SHARD_FALLBACK   "0" to skip the cross-shard pass
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from model_registry import cache_name
+from constants import MODEL_NAME
+from skill_index import SkillIndex
+
+# --- Settings ---
+DATA_DIR = "data"
+CLUSTERS_FILE = os.path.join(DATA_DIR, "skill_clusters.npz")
+SHARDS = int(os.environ.get("GETSKILLED_SHARDS", "32"))
+WORKERS = int(os.environ.get("GETSKILLED_SHARD_WORKERS", "0")) or None
+EXECUTOR = os.environ.get("GETSKILLED_SHARD_EXECUTOR", "thread")
+FALLBACK = os.environ.get("GETSKILLED_SHARD_FALLBACK", "1") != "0"
+
+_clusters = {}
+_lock = threading.Lock()
+
+
+def configure(shards=32, workers=None, executor="thread", fallback=True):
+    global SHARDS, WORKERS, EXECUTOR, FALLBACK
+    SHARDS = shards
+    WORKERS = workers
+    EXECUTOR = executor
+    FALLBACK = fallback
+
+
+# --- Clusters ---
+def clusters_path():
+    """Saved centroids for the active embedding backend."""
+    name = cache_name()
+    if name == MODEL_NAME:
+        return CLUSTERS_FILE
+    return CLUSTERS_FILE.replace(".npz", f"_{name.rsplit('@', 1)[-1]}.npz")
+
+
+def get_clusters(skills, vectors, path=None):
+    """The skill clusters, trained on ``skills``/``vectors`` the first time only."""
+    path = path or clusters_path()
+    with _lock:
+        index = _clusters.get(path)
+        if index is None and os.path.exists(path):
+            index = _clusters[path] = SkillIndex.load(path)
+        if index is None or index.centroids is None:
+            index = SkillIndex(n_lists=max(1, min(SHARDS, len(skills)))).build(skills, vectors)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            index.save(path)
+            _clusters[path] = index
+        return index
+
+
+def reset_clusters(path=None):
+    """Forget the saved clusters; the next sharded run clusters again."""
+    path = path or clusters_path()
+    with _lock:
+        _clusters.pop(path, None)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def assign(index, vectors):
+    """Cluster id of each (L2-normalised) vector."""
+    return (vectors @ index.centroids.T).argmax(axis=1)
+
+
+# --- Matching one shard ---
+def best_teachers(learner_vectors, teacher_vectors, teacher_first_rows, threshold):
+    """Best teacher skill for each learner skill, at skill level.
+
+    ``teacher_first_rows`` is the first teacher row holding each teacher
+    skill; ties go to the skill whose first teacher comes first, the same
+    tie-break as the row-order argmax of the vectorized matcher. Returns
+    ``(teacher_row, score)`` per learner skill, with row -1 for no match.
+    """
+    order = np.argsort(teacher_first_rows, kind="stable")
+    scores = learner_vectors @ teacher_vectors[order].T
+    eligible = (scores >= threshold) & (scores > 0)
+    best = np.where(eligible, scores, -np.inf).argmax(axis=1)
+    found = eligible.any(axis=1)
+    rows = np.where(found, np.asarray(teacher_first_rows)[order][best], -1)
+    return rows, np.where(found, scores[np.arange(len(scores)), best], 0.0)
+
+
+def _run_shards(tasks, workers, executor):
+    if workers <= 1 or len(tasks) <= 1:
+        return [best_teachers(*task) for task in tasks]
+    if executor == "process":
+        # spawn: forking a process that runs threads (Streamlit, the match worker) is unsafe
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    elif executor == "thread":
+        # NumPy releases the GIL inside the matrix products
+        pool = ThreadPoolExecutor(workers)
+    else:
+        raise ValueError(f"Unknown shard executor: {executor}")
+    with pool:
+        return list(pool.map(best_teachers, *zip(*tasks)))
+
+
+def match_shards(learner_vectors, learner_clusters, teacher_vectors, teacher_clusters, teacher_first_rows,
+                 threshold, workers=None, executor=None, fallback=None):
+    """Best teacher row and score per distinct learner skill, shard by shard.
+
+    Inputs are per distinct skill: normalised vectors and cluster ids, plus
+    the first teacher row of each teacher skill.
+    """
+    workers = workers or WORKERS or os.cpu_count() or 1
+    executor = executor or EXECUTOR
+    fallback = FALLBACK if fallback is None else fallback
+
+    rows = np.full(len(learner_vectors), -1, dtype=np.intp)
+    scores = np.zeros(len(learner_vectors), dtype=learner_vectors.dtype)
+    shards = [c for c in np.unique(learner_clusters) if (teacher_clusters == c).any()]
+    members = [(np.nonzero(learner_clusters == c)[0], np.nonzero(teacher_clusters == c)[0]) for c in shards]
+    tasks = [(learner_vectors[l], teacher_vectors[t], teacher_first_rows[t], threshold) for l, t in members]
+    for (learner_idx, _), (shard_rows, shard_scores) in zip(members, _run_shards(tasks, workers, executor)):
+        rows[learner_idx] = shard_rows
+        scores[learner_idx] = shard_scores
+
+    if fallback:
+        left = np.nonzero(rows < 0)[0]
+        if len(left) and len(teacher_vectors):
+            rows[left], scores[left] = best_teachers(learner_vectors[left], teacher_vectors,
+                                                     teacher_first_rows, threshold)
+    return rows, scores
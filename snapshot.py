@@ -0,0 +1,292 @@
+# snapshot.py
+#
+# Columnar Parquet snapshot of the app's tables.
+#
+# The study log is written as Hive-style partitions by day
+# (data/snapshot/study_log/Date=2025-07-17/part-0.parquet), users and
+# matches by month (Month=2025-07, a day's registrations are too few rows
+# for a file of their own), ratings and targets as one file each. Every
+# table has a fixed typed schema, so the Power BI report and the admin
+# views read real timestamps, numbers and dictionary-encoded categories
+# instead of re-parsing CSV text. The admin Match Summary tab exports the
+# tables it reads before reading them.
+#
+# An export only writes what changed: the manifest keeps the source file's
+# version and a hash per partition, unchanged tables are skipped, and only
+# partitions whose rows differ (new days, mostly) are rewritten. The study
+# log is append-only, so it is read from the last exported day onwards.
+#     python snapshot.py export
+#
+# Readers project columns and push filters down to the partitions and row
+# groups, e.g. read("study_log", ["Name", "Minutes"], [("Date", ">=", day)])
+# opens only the last days' files and two of their columns.
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from filelock import FileLock
+
+import cache
+import metrics
+import ratings_store
+import storage
+import targets
+import user_schema
+
+# --- Setup ---
+DATA_DIR = "data"
+SNAPSHOT_DIR = os.environ.get("GETSKILLED_SNAPSHOT_DIR", os.path.join(DATA_DIR, "snapshot"))
+MANIFEST_FILE = "_manifest.json"
+LOCK_FILE = os.path.join(DATA_DIR, "snapshot.lock")
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+_category = pa.dictionary(pa.int32(), pa.string())
+_timestamp = pa.timestamp("s")
+
+SCHEMAS = {
+    "users": pa.schema([
+        ("Name", pa.string()), ("Email", pa.string()), ("Gender", _category), ("AgeRange", _category),
+        ("SkillLevel", _category), ("Role", _category), ("Timestamp", _timestamp), ("CanTeach", _category),
+        ("WantsToLearn", _category), ("StudyDays", pa.int16()), ("IsMatched", pa.bool_()),
+    ]),
+    "matches": pa.schema([
+        ("Learner", pa.string()), ("Teacher", pa.string()), ("Skill", _category),
+        ("AI_Confidence (%)", pa.float32()), ("Explanation", pa.string()), ("Timestamp", _timestamp),
+    ]),
+    "ratings": pa.schema([
+        ("Learner", pa.string()), ("Teacher", pa.string()), ("Rating", pa.int8()), ("Comments", pa.string()),
+    ]),
+    "study_log": pa.schema([
+        ("Name", pa.string()), ("Minutes", pa.float32()), ("Timestamp", _timestamp),
+    ]),
+    "targets": pa.schema([
+        ("Name", pa.string()), ("SkillLevel", _category), ("WantsToLearn", _category), ("CanTeach", _category),
+        ("StudyDays", pa.int16()), ("TargetMinutes", pa.float32()),
+    ]),
+}
+# table -> (partition column, source timestamp column, partition value format)
+PARTITIONS = {
+    "users": ("Month", "Timestamp", "%Y-%m"),
+    "matches": ("Month", "Timestamp", "%Y-%m"),
+    "study_log": ("Date", "Timestamp", "%Y-%m-%d"),
+}
+
+
+# --- Sources ---
+def _source_version(table):
+    """Version of the live table, comparable across processes."""
+    if table == "targets":
+        return storage.file_version(targets.TARGETS_FILE)
+    if storage.using_sqlite():
+        return storage.version(table)[1]
+    return storage.file_version(storage.TABLES[table][0])
+
+
+def _load_source(table, since=None):
+    if table == "users":
+        return user_schema.enforce(cache.load("users"))
+    if table == "ratings":
+        return ratings_store.get_store().table()
+    if table == "targets":
+        return targets.load_targets()
+    if table == "study_log":
+        if not storage.exists("study_log"):
+            return pd.DataFrame(columns=SCHEMAS["study_log"].names)
+        return storage.load_study_log(since=since)
+    return cache.load(table)
+
+
+def typed_frame(table, df):
+    """``df`` reduced to the snapshot columns of ``table``, converted to their types."""
+    if table in storage.TABLES:
+        df = storage.canonical_columns(table, df)
+    columns = {}
+    for field in SCHEMAS[table]:
+        col = df[field.name] if field.name in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if pa.types.is_timestamp(field.type):
+            col = pd.to_datetime(col, errors="coerce", format="ISO8601").dt.floor("s")
+        elif pa.types.is_boolean(field.type):
+            col = user_schema.parse_flags(col)
+        elif pa.types.is_integer(field.type):
+            col = pd.to_numeric(col, errors="coerce").round().astype(f"Int{field.type.bit_width}")
+        elif pa.types.is_floating(field.type):
+            col = pd.to_numeric(col, errors="coerce").astype("float32")
+        elif pa.types.is_dictionary(field.type):
+            col = col.astype(object).astype("string").astype("category")
+        else:
+            col = col.astype(object).astype("string")
+        columns[field.name] = col.reset_index(drop=True)
+    return pd.DataFrame(columns)
+
+
+def _partitions(table, df):
+    """(partition value, rows) pairs; the value is None for unpartitioned tables."""
+    if table not in PARTITIONS:
+        return [(None, df)]
+    _, source, fmt = PARTITIONS[table]
+    values = df[source].dt.strftime(fmt).fillna(NULL_PARTITION)
+    return [(value, rows.reset_index(drop=True)) for value, rows in df.groupby(values, sort=True)]
+
+
+def _digest(df):
+    hashed = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+# --- Writing ---
+def _partition_dir(table, value):
+    base = os.path.join(SNAPSHOT_DIR, table)
+    return base if value is None else os.path.join(base, f"{PARTITIONS[table][0]}={value}")
+
+
+def _write_partition(table, value, df):
+    directory = _partition_dir(table, value)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "part-0.parquet")
+    arrow = pa.Table.from_pandas(df, schema=SCHEMAS[table], preserve_index=False)
+    with metrics.timer("parquet.write"):
+        pq.write_table(arrow, path + ".tmp", compression="zstd")
+    os.replace(path + ".tmp", path)
+
+
+def _load_manifest():
+    path = os.path.join(SNAPSHOT_DIR, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest):
+    path = os.path.join(SNAPSHOT_DIR, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def export_table(table, manifest):
+    """Bring one table's snapshot up to date; returns the partitions written."""
+    version = _source_version(table)
+    version = list(version) if isinstance(version, tuple) else version
+    entry = manifest.get(table, {})
+    if version is None or entry.get("version") == version:
+        return 0
+
+    # Study log rows are appended in time order: while the file only grew,
+    # the days before the last exported one cannot have changed
+    since = None
+    previous = entry.get("version")
+    if (table == "study_log" and entry.get("last") and previous is not None
+            and (storage.using_sqlite() or version[1] >= previous[1])):
+        since = entry["last"]
+
+    df = typed_frame(table, _load_source(table, since))
+    digests = dict(entry.get("partitions", {})) if since else {}
+    written = 0
+    for value, rows in _partitions(table, df):
+        key = value or ""
+        digest = _digest(rows)
+        if entry.get("partitions", {}).get(key) != digest:
+            _write_partition(table, value, rows)
+            written += 1
+        digests[key] = digest
+
+    # A full read is the whole table: drop partitions whose rows are gone
+    for key in set(entry.get("partitions", {})) - set(digests):
+        shutil.rmtree(_partition_dir(table, key or None), ignore_errors=True)
+    if not digests:
+        shutil.rmtree(os.path.join(SNAPSHOT_DIR, table), ignore_errors=True)
+
+    keys = sorted(key for key in digests if key and key != NULL_PARTITION)
+    manifest[table] = {"version": version, "partitions": digests, "last": keys[-1] if keys else None}
+    return written
+
+
+@metrics.timed("snapshot.export")
+def export(tables=tuple(SCHEMAS)):
+    """Update the snapshot of ``tables``; returns partitions written per table."""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    with FileLock(LOCK_FILE):
+        manifest = _load_manifest()
+        written = {table: export_table(table, manifest) for table in tables}
+        _save_manifest(manifest)
+    return written
+
+
+# --- Reading ---
+def _partitioning(table):
+    if table not in PARTITIONS:
+        return None
+    return ds.partitioning(pa.schema([(PARTITIONS[table][0], pa.string())]), flavor="hive")
+
+
+def is_current(table):
+    """Whether the snapshot of ``table`` matches the live data."""
+    version = _source_version(table)
+    version = list(version) if isinstance(version, tuple) else version
+    return version is not None and _load_manifest().get(table, {}).get("version") == version
+
+
+def read(table, columns=None, filters=None):
+    """Snapshot rows of ``table``.
+
+    Only ``columns`` are read, and ``filters`` (pyarrow's list of
+    ``(column, op, value)`` tuples) skip whole partitions when they test
+    the partition column (``Date``/``Month``) and row groups by their
+    statistics otherwise.
+    """
+    path = os.path.join(SNAPSHOT_DIR, table)
+    if not os.path.exists(path):
+        names = columns or SCHEMAS[table].names
+        return pd.DataFrame(columns=names)
+    with metrics.timer("parquet.read"):
+        arrow = pq.read_table(path, columns=columns, filters=filters, partitioning=_partitioning(table))
+    return arrow.to_pandas()
+
+
+def load(table, columns=None, filters=None):
+    """``read`` while the snapshot is current, else the live table with ``columns``.
+
+    ``filters`` only apply to the snapshot; callers filtering the fallback
+    must do so themselves.
+    """
+    if is_current(table):
+        return read(table, columns, filters)
+    df = typed_frame(table, _load_source(table))
+    return df[columns] if columns else df
+
+
+# --- Admin readers ---
+def user_match_status(columns):
+    """``columns`` of users plus the Learner/Teacher names of every match."""
+    users = load("users", columns)
+    matches = load("matches", ["Learner", "Teacher"])
+    return users, matches
+
+
+def study_minutes_since(since):
+    """Minutes studied per user since ``since``, most first."""
+    since = pd.Timestamp(since)
+    if is_current("study_log"):
+        logs = read("study_log", ["Name", "Minutes", "Timestamp"],
+                    [("Date", ">=", since.strftime("%Y-%m-%d"))])
+    else:
+        logs = typed_frame("study_log", _load_source("study_log", since))
+    logs = logs[logs["Timestamp"] >= since]
+    totals = logs.groupby("Name", observed=True)["Minutes"].sum()
+    return totals.sort_values(ascending=False).rename("Minutes").reset_index()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["export"]:
+        for table, count in export().items():
+            print(f"{table}: {count} partitions written")
+    else:
+        print("usage: python snapshot.py export")
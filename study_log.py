@@ -0,0 +1,236 @@
+# study_log.py
+#
+# Append-only CSV study log.
+#
+# Check-ins are appended under a cross-process file lock instead of
+# re-writing the whole file, and fsync is batched. Reads are chunked and
+# start at the first row inside the requested time window: rows are
+# appended in timestamp order, so that row is found with a binary search
+# over byte offsets instead of a scan of the full history.
+
+import atexit
+import csv
+import io
+import os
+import threading
+import time
+
+import pandas as pd
+from filelock import FileLock
+
+import metrics
+
+# --- Setup ---
+DATA_DIR = "data"
+STUDY_LOG_FILE = os.path.join(DATA_DIR, "study_log.csv")
+LOG_COLUMNS = ["Name", "Minutes", "Timestamp"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+FSYNC_EVERY = 20        # appends between forced fsyncs
+FSYNC_INTERVAL = 5.0    # seconds between forced fsyncs
+CHUNK_ROWS = 50_000
+LINEAR_SCAN_BYTES = 64 * 1024
+
+
+class StudyLogWriter:
+    """Appends rows to one log file; safe across threads and processes."""
+
+    def __init__(self, path=STUDY_LOG_FILE, fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(path + ".lock")
+        self._handle = None
+        self._header = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, name, minutes):
+        """Write one session stamped with the current time; returns the row written."""
+        with self._lock, self._file_lock:
+            # Stamped under the lock so the file stays in timestamp order
+            row = {"Name": name, "Minutes": minutes, "Timestamp": time.strftime(TIMESTAMP_FORMAT)}
+            handle = self._open()
+            metrics.count("csv.append_rows")
+            handle.write(_csv_line([row.get(_canonical(col), "") for col in self._header]))
+            handle.flush()
+            self._pending += 1
+            if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+        return row
+
+    def _open(self):
+        # Another process may have migrated or replaced the file since we opened it
+        if self._handle is not None and not _same_file(self._handle, self.path):
+            self._close_handle()
+        if self._handle is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            header = read_header(self.path)
+            if not header:
+                header = list(LOG_COLUMNS)
+                with open(self.path, "w", newline="", encoding="utf-8") as f:
+                    f.write(_csv_line(header))
+            elif not set(LOG_COLUMNS) <= {_canonical(col) for col in header}:
+                header = _migrate_header(self.path, header)
+            self._header = header
+            self._handle = open(self.path, "a", newline="", encoding="utf-8")
+        return self._handle
+
+    def _sync(self):
+        if self._handle is not None:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _close_handle(self):
+        if self._handle is not None:
+            self._sync()
+            self._handle.close()
+            self._handle = None
+
+    def close(self):
+        with self._lock:
+            self._close_handle()
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(path=STUDY_LOG_FILE):
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = StudyLogWriter(path)
+        return writer
+
+
+@atexit.register
+def _close_writers():
+    for writer in list(_writers.values()):
+        writer.close()
+
+
+# --- Reading ---
+def read_header(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return []
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def read_log(path=STUDY_LOG_FILE, since=None, name=None, chunksize=CHUNK_ROWS, until=None):
+    """Log rows with canonical ``Name``/``Minutes``/``Timestamp`` columns.
+
+    Only rows at or after ``since`` and before ``until`` (and for ``name``,
+    case-insensitive) are kept, and the file is read ``chunksize`` rows at a
+    time. Reading stops at the first chunk that reaches ``until``.
+    """
+    header = read_header(path)
+    columns = [_canonical(col) for col in header]
+    if "Timestamp" not in columns:
+        return pd.DataFrame(columns=columns or LOG_COLUMNS)
+    since = pd.Timestamp(since) if since is not None else None
+    until = pd.Timestamp(until) if until is not None else None
+    name = str(name).lower() if name is not None else None
+
+    parts = []
+    with metrics.timer("csv.read"), open(path, "rb") as f:
+        f.readline()
+        if since is not None:
+            f.seek(_first_offset_since(f, columns.index("Timestamp"), since))
+        if f.tell() >= os.fstat(f.fileno()).st_size:
+            return pd.DataFrame(columns=columns)
+        for chunk in pd.read_csv(f, names=columns, header=None, chunksize=chunksize):
+            metrics.count("csv.read_rows", len(chunk))
+            chunk["Timestamp"] = pd.to_datetime(chunk["Timestamp"], errors="coerce")
+            if since is not None:
+                chunk = chunk[chunk["Timestamp"] >= since]
+            done = until is not None and (chunk["Timestamp"] >= until).any()
+            if until is not None:
+                chunk = chunk[chunk["Timestamp"] < until]
+            if name is not None and "Name" in chunk.columns:
+                chunk = chunk[chunk["Name"].astype(str).str.lower() == name]
+            parts.append(chunk)
+            if done:
+                break
+
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+    if "Hours" in df.columns:
+        # Older exports recorded hours instead of minutes
+        hours_as_minutes = pd.to_numeric(df["Hours"], errors="coerce") * 60
+        df["Minutes"] = df["Minutes"].fillna(hours_as_minutes) if "Minutes" in df.columns else hours_as_minutes
+    return df
+
+
+def _first_offset_since(f, ts_col, since):
+    """Byte offset of the first data row stamped at or after ``since``."""
+    data_start = f.tell()
+    lo, hi = data_start, os.fstat(f.fileno()).st_size
+
+    while hi - lo > LINEAR_SCAN_BYTES:
+        mid = (lo + hi) // 2
+        f.seek(mid - 1)
+        f.readline()
+        line_start = f.tell()
+        if line_start >= hi:
+            break
+        stamp = _row_timestamp(f.readline(), ts_col)
+        if stamp is None:
+            return data_start
+        if stamp < since:
+            lo = f.tell()
+        else:
+            hi = line_start
+
+    f.seek(lo)
+    while f.tell() < hi:
+        line_start = f.tell()
+        stamp = _row_timestamp(f.readline(), ts_col)
+        if stamp is None or stamp >= since:
+            return line_start
+    return hi
+
+
+def _row_timestamp(line, ts_col):
+    try:
+        row = next(csv.reader([line.decode("utf-8")]))
+        return pd.Timestamp(row[ts_col])
+    except (StopIteration, IndexError, ValueError):
+        return None
+
+
+# --- Helpers ---
+def _canonical(column):
+    return {"name": "Name", "minutes": "Minutes", "timestamp": "Timestamp", "hours": "Hours",
+            "skill": "Skill"}.get(str(column).strip().lower(), column)
+
+
+def _csv_line(values):
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(values)
+    return buffer.getvalue()
+
+
+def _same_file(handle, path):
+    try:
+        return os.path.samestat(os.fstat(handle.fileno()), os.stat(path))
+    except OSError:
+        return False
+
+
+def _migrate_header(path, header):
+    """One-off rewrite adding the writer's columns to an older header."""
+    with metrics.timer("csv.read"):
+        existing = pd.read_csv(path)
+    existing.columns = [_canonical(col) for col in existing.columns]
+    for col in LOG_COLUMNS:
+        if col not in existing.columns:
+            existing[col] = None
+    tmp_path = path + ".tmp"
+    with metrics.timer("csv.write"):
+        existing.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return list(existing.columns)
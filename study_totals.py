@@ -0,0 +1,192 @@
+# study_totals.py
+#
+# Rolling per-user, per-day study totals.
+#
+# Every logged session also updates a small aggregate table
+# (Name, Date, Minutes, Sessions) holding only the last RETENTION_DAYS
+# days. Weekly totals and summaries are then answered from this table,
+# whose size depends on the number of users rather than the length of
+# the log. The window is still the last 7 x 24 hours: whole days come from
+# the table and only the partial first day is read from the log. Recompute
+# it from the raw log, or check it, with:
+#     python study_totals.py rebuild
+#     python study_totals.py verify
+
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from filelock import FileLock
+
+import metrics
+import storage
+
+# --- Setup ---
+DATA_DIR = "data"
+STUDY_LOG_FILE = os.path.join(DATA_DIR, "study_log.csv")
+DAILY_COLUMNS = ["Name", "Date", "Minutes", "Sessions"]
+RETENTION_DAYS = 35
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+_cache = {}
+_cache_lock = threading.Lock()
+_file_locks = {}
+
+
+def daily_path(log_path=STUDY_LOG_FILE):
+    """Aggregate file that sits next to ``log_path``."""
+    return os.path.splitext(log_path)[0] + "_daily.csv"
+
+
+def _file_lock(path):
+    # One (re-entrant) FileLock per file, so rebuild() can run inside record_session()
+    with _cache_lock:
+        lock = _file_locks.get(path)
+        if lock is None:
+            lock = _file_locks[path] = FileLock(path + ".lock")
+        return lock
+
+
+# --- Reading ---
+def load_daily(log_path=STUDY_LOG_FILE):
+    """The aggregate table, re-read only when the file changes on disk."""
+    path = daily_path(log_path)
+    if not os.path.exists(path):
+        if not storage.exists("study_log", log_path):
+            return pd.DataFrame(columns=DAILY_COLUMNS)
+        return rebuild(log_path)
+
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    with metrics.timer("csv.read"):
+        daily = pd.read_csv(path, dtype={"Name": str, "Date": str})
+    with _cache_lock:
+        _cache[path] = (version, daily)
+    return daily
+
+
+def _window(daily, days):
+    """Rows of the last ``days`` calendar days (today included); used for retention."""
+    first_day = (datetime.now() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    return daily[daily["Date"] >= first_day]
+
+
+def _rolling(days, log_path):
+    """Per-day rows covering exactly the last ``days`` x 24 hours.
+
+    Whole days come from the aggregate. The first day is only partly inside
+    the window, so its rows are computed from the log sessions between the
+    cutoff and that day's midnight.
+    """
+    since = datetime.now() - timedelta(days=days)
+    midnight = (since + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    daily = load_daily(log_path)
+    whole = daily[daily["Date"] >= midnight.strftime("%Y-%m-%d")]
+    partial = _per_day(storage.load_study_log(since=since, path=log_path, until=midnight))
+    parts = [rows for rows in (partial, whole) if not rows.empty]
+    return pd.concat(parts, ignore_index=True) if parts else whole
+
+
+def recent_totals(days=7, log_path=STUDY_LOG_FILE):
+    """Minutes per user over the last ``days`` x 24 hours."""
+    recent = _rolling(days, log_path)
+    return recent.groupby("Name", as_index=False)["Minutes"].sum()
+
+
+def sessions_by_weekday(name, days=7, log_path=STUDY_LOG_FILE):
+    """Number of sessions per weekday for ``name`` (case-insensitive) over the last ``days`` x 24 hours."""
+    recent = _rolling(days, log_path)
+    recent = recent[recent["Name"].str.lower() == str(name).lower()]
+    weekdays = pd.to_datetime(recent["Date"]).dt.day_name()
+    return recent["Sessions"].groupby(weekdays).sum().reindex(WEEKDAYS, fill_value=0).astype(int).to_dict()
+
+
+# --- Writing ---
+def record_session(name, minutes, timestamp=None, log_path=STUDY_LOG_FILE):
+    """Add one session, already written to the log, to its (user, day) row and drop expired days."""
+    path = daily_path(log_path)
+    day = pd.Timestamp(timestamp or datetime.now()).strftime("%Y-%m-%d")
+    with _file_lock(path):
+        if not os.path.exists(path):
+            # First use: the rebuild already counts the session just logged
+            rebuild(log_path)
+            return
+        daily = load_daily(log_path).copy()
+        row = (daily["Name"] == name) & (daily["Date"] == day)
+        if row.any():
+            daily.loc[row, "Minutes"] += float(minutes)
+            daily.loc[row, "Sessions"] += 1
+        else:
+            new = pd.DataFrame([{"Name": name, "Date": day, "Minutes": float(minutes), "Sessions": 1}])
+            daily = pd.concat([daily, new], ignore_index=True) if not daily.empty else new
+        _write(_window(daily, RETENTION_DAYS), path)
+
+
+def rebuild(log_path=STUDY_LOG_FILE):
+    """Recompute the aggregate from the raw log and save it."""
+    daily = compute_from_log(log_path)
+    path = daily_path(log_path)
+    with _file_lock(path):
+        _write(daily, path)
+    return daily
+
+
+def compute_from_log(log_path=STUDY_LOG_FILE):
+    since = (datetime.now() - timedelta(days=RETENTION_DAYS - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return _per_day(storage.load_study_log(since=since, path=log_path))
+
+
+def _per_day(logs):
+    """Log sessions summed per (user, day)."""
+    if logs.empty or not {"Name", "Minutes", "Timestamp"}.issubset(logs.columns):
+        return pd.DataFrame(columns=DAILY_COLUMNS)
+    logs = logs.assign(
+        Date=pd.to_datetime(logs["Timestamp"]).dt.strftime("%Y-%m-%d"),
+        Minutes=pd.to_numeric(logs["Minutes"], errors="coerce").fillna(0),
+    )
+    daily = logs.groupby(["Name", "Date"], as_index=False).agg(
+        Minutes=("Minutes", "sum"), Sessions=("Minutes", "size")
+    )
+    return daily[DAILY_COLUMNS]
+
+
+def verify(log_path=STUDY_LOG_FILE):
+    """Compare the saved aggregate with a fresh rebuild; returns the mismatching rows."""
+    saved = _window(load_daily(log_path), RETENTION_DAYS)
+    fresh = compute_from_log(log_path)
+    merged = saved.merge(fresh, on=["Name", "Date"], how="outer", suffixes=("", "_log"), indicator=True)
+    # An empty side has object columns; numbers first, so fillna has nothing to downcast
+    for col in ("Minutes", "Sessions", "Minutes_log", "Sessions_log"):
+        merged[col] = pd.to_numeric(merged[col]).fillna(0)
+    same = np.isclose(merged["Minutes"], merged["Minutes_log"]) & (merged["Sessions"] == merged["Sessions_log"])
+    return merged[~same].drop(columns="_merge")
+
+
+def _write(daily, path):
+    daily = daily.sort_values(["Date", "Name"])[DAILY_COLUMNS]
+    tmp_path = path + ".tmp"
+    with metrics.timer("csv.write"):
+        daily.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    stat = os.stat(path)
+    with _cache_lock:
+        _cache[path] = ((stat.st_mtime_ns, stat.st_size), daily.reset_index(drop=True))
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "rebuild":
+        print(f"{len(rebuild())} user-day rows rebuilt")
+    elif command == "verify":
+        mismatches = verify()
+        print("aggregate matches the log" if mismatches.empty else mismatches.to_string(index=False))
+        sys.exit(0 if mismatches.empty else 1)
+    else:
+        print("usage: python study_totals.py rebuild|verify")
@@ -0,0 +1,112 @@
+# targets.py
+#
+# Weekly study targets.
+#
+# TargetMinutes = 30 + 10 for beginners (5 otherwise) + 10 x cosine
+# similarity between what a user wants to learn and what they can teach.
+# This is the only target formula: update_targets() is the entry point
+# behind habit_tracker.get_study_targets (the target shown to users) and
+# match_engine.generate_study_targets, and get_defaulters checks the same
+# saved file.
+# Skill strings are encoded once per unique value (through the embedding
+# cache) and the formula runs as column operations. targets.csv keeps the
+# inputs each target was computed from, so only users whose SkillLevel,
+# WantsToLearn, CanTeach or StudyDays changed are recomputed.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from embedding_store import encode as cached_encode
+import cache
+import metrics
+
+# --- Setup ---
+DATA_DIR = "data"
+TARGETS_FILE = os.path.join(DATA_DIR, "targets.csv")
+INPUT_COLUMNS = ["SkillLevel", "WantsToLearn", "CanTeach", "StudyDays"]
+TARGET_COLUMNS = ["Name"] + INPUT_COLUMNS + ["TargetMinutes"]
+
+BASE_MINUTES = 30
+BEGINNER_BOOST = 10
+OTHER_BOOST = 5
+SIMILARITY_WEIGHT = 10
+
+
+# --- Computing ---
+def compute_targets(users_df):
+    """TargetMinutes for every row of ``users_df``, as a float array."""
+    if users_df.empty:
+        return np.zeros(0)
+    level = _column(users_df, "SkillLevel").astype(str).str.lower()
+    boost = np.where(level == "beginner", BEGINNER_BOOST, OTHER_BOOST)
+    similarity = _skill_similarity(_column(users_df, "WantsToLearn").astype(str),
+                                   _column(users_df, "CanTeach").astype(str))
+    return np.round(BASE_MINUTES + boost + SIMILARITY_WEIGHT * similarity, 2)
+
+
+def _skill_similarity(wants, teach):
+    """Row-wise cosine similarity, encoding each distinct skill string once."""
+    codes, uniques = pd.factorize(pd.concat([wants, teach], ignore_index=True))
+    try:
+        vectors = np.asarray(cached_encode(list(uniques)), dtype=np.float32)
+    except Exception:
+        return np.zeros(len(wants))
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-8)
+    wants_codes, teach_codes = codes[:len(wants)], codes[len(wants):]
+    return np.einsum("ij,ij->i", vectors[wants_codes], vectors[teach_codes]).astype(float)
+
+
+# --- Persisted targets ---
+def load_targets(path=TARGETS_FILE):
+    """Saved targets with canonical column names (older files used lowercase)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return pd.DataFrame(columns=TARGET_COLUMNS)
+    with metrics.timer("csv.read"):
+        saved = pd.read_csv(path)
+    by_lower = {col.lower(): col for col in TARGET_COLUMNS}
+    saved = saved.rename(columns={col: by_lower[col.lower()] for col in saved.columns if col.lower() in by_lower})
+    return saved.reindex(columns=TARGET_COLUMNS)
+
+
+def update_targets(users_df, path=TARGETS_FILE):
+    """Bring ``path`` up to date with ``users_df`` and return ``Name``/``TargetMinutes``.
+
+    Users whose inputs match the saved row keep their saved target; new or
+    changed users are recomputed in one batch. The file is only rewritten
+    when something changed.
+    """
+    users = users_df.reindex(columns=TARGET_COLUMNS[:-1]).reset_index(drop=True)
+    saved = load_targets(path).drop_duplicates("Name", keep="last").set_index("Name")
+
+    target = users["Name"].map(saved["TargetMinutes"])
+    unchanged = users["Name"].map(_input_key(saved)).eq(_input_key(users).values) & target.notna()
+    stale = ~unchanged.values
+    if stale.any():
+        target[stale] = compute_targets(users[stale])
+
+    result = users.assign(TargetMinutes=target.astype(float))
+    if stale.any() or len(saved) != users["Name"].nunique():
+        _write(result, path)
+    return result[["Name", "TargetMinutes"]]
+
+
+def _input_key(df):
+    """One comparable string per row built from the target inputs."""
+    texts = [df[col].astype(object).fillna("").astype(str) for col in INPUT_COLUMNS[:-1]]
+    days = pd.to_numeric(df["StudyDays"], errors="coerce").astype("Float64").astype(str)
+    return texts[0].str.cat(texts[1:] + [days], sep="\x1f")
+
+
+def _column(df, col):
+    return df[col] if col in df.columns else pd.Series("", index=df.index)
+
+
+def _write(targets, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with metrics.timer("csv.write"):
+        targets[TARGET_COLUMNS].to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    cache.invalidate(path)
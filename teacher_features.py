@@ -0,0 +1,76 @@
+# teacher_features.py
+#
+# Teacher quality features for rating-aware matching.
+#
+# Per-teacher rating averages and counts come from the ratings store's
+# running aggregates and are cached until the ratings change. For a match
+# run they are aligned with the teacher columns of the similarity matrix as
+# plain arrays, so scoring every candidate is one vectorized expression:
+#     score = cosine + RATING_WEIGHT * quality - LEVEL_WEIGHT * level_gap
+# quality is the Bayesian-smoothed average rating scaled to [-1, 1] (few
+# ratings stay close to the neutral prior) and level_gap counts how many
+# SkillLevel steps a teacher is below their learner. The cosine threshold
+# still decides which teachers are acceptable; the features only re-rank.
+
+import numpy as np
+import pandas as pd
+
+import cache
+import ratings_store
+
+LEVELS = {"beginner": 0, "intermediate": 1, "advanced": 2}
+PRIOR_MEAN = 3.0        # neutral rating on the 1-5 scale
+PRIOR_COUNT = 3         # ratings a teacher needs to move halfway off the prior
+RATING_WEIGHT = 0.05
+LEVEL_WEIGHT = 0.05
+
+
+def level_codes(levels):
+    """SkillLevel text to 0/1/2 (beginner..advanced), -1 where unknown."""
+    text = pd.Series(levels).astype(str).str.strip().str.lower()
+    return text.map(LEVELS).fillna(-1).to_numpy(dtype=np.int8)
+
+
+@cache.cached("ratings")
+def rating_table():
+    """Average and count of ratings per teacher name."""
+    store = ratings_store.get_store()
+    averages = store.averages().set_index("Teacher")["Average Rating"]
+    counts = pd.Series(store.counts(), dtype=np.int64)
+    return pd.DataFrame({"Average": averages, "Count": counts.reindex(averages.index).fillna(0)})
+
+
+class TeacherFeatures:
+    """Feature arrays with one entry per teacher column of the similarity matrix."""
+
+    def __init__(self, avg_rating, rating_count, level):
+        self.avg_rating = avg_rating
+        self.rating_count = rating_count
+        self.level = level
+
+    @classmethod
+    def build(cls, teachers, ratings=None):
+        ratings = rating_table() if ratings is None else ratings
+        aligned = ratings.reindex(teachers["Name"].astype(str))
+        count = aligned["Count"].fillna(0).to_numpy(dtype=np.int32)
+        avg = aligned["Average"].to_numpy(dtype=np.float32)
+        level = level_codes(teachers["SkillLevel"]) if "SkillLevel" in teachers else np.full(len(teachers), -1, np.int8)
+        return cls(np.where(count > 0, avg, np.nan).astype(np.float32), count, level)
+
+    def quality(self):
+        """Smoothed average rating scaled to [-1, 1]; 0 for unrated teachers."""
+        total = np.nan_to_num(self.avg_rating) * self.rating_count + PRIOR_MEAN * PRIOR_COUNT
+        smoothed = total / (self.rating_count + PRIOR_COUNT)
+        return ((smoothed - PRIOR_MEAN) / 2).astype(np.float32)
+
+
+def rated_scores(similarity, learner_levels, features, rating_weight=RATING_WEIGHT, level_weight=LEVEL_WEIGHT):
+    """Ranking scores for a learner x teacher ``similarity`` matrix."""
+    # One adjustment row per learner level (unknown, beginner..advanced),
+    # so the whole matrix takes a single gather-and-add
+    learner_rows = np.arange(-1, len(LEVELS))[:, None]
+    gap = learner_rows - features.level[None, :]
+    known = (learner_rows >= 0) & (features.level[None, :] >= 0)
+    adjust = rating_weight * features.quality()[None, :] - level_weight * np.where(known, np.maximum(gap, 0), 0)
+    adjust = adjust.astype(similarity.dtype)
+    return similarity + adjust[np.asarray(learner_levels, dtype=np.intp) + 1]
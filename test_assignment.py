@@ -0,0 +1,66 @@
+# test_assignment.py
+
+import numpy as np
+import pytest
+from scipy.optimize import linear_sum_assignment
+
+from assignment import optimal_assignment
+
+THRESHOLD = 0.6
+
+
+def _user_level_optimum(learner_codes, teacher_codes, teacher_capacity, skill_scores):
+    """Best total score found by matching learners to individual teacher slots."""
+    slots = np.repeat(teacher_codes, teacher_capacity)
+    scores = skill_scores[np.asarray(learner_codes)[:, None], slots[None, :]]
+    scores = np.where((scores >= THRESHOLD) & (scores > 0), scores, 0.0)
+    rows, cols = linear_sum_assignment(scores, maximize=True)
+    return scores[rows, cols].sum()
+
+
+def _check(learner_codes, teacher_codes, teacher_capacity, skill_scores):
+    learners, teachers, scores = optimal_assignment(learner_codes, teacher_codes, teacher_capacity,
+                                                    skill_scores, THRESHOLD)
+    # Each learner at most once, each teacher within capacity, scores as given
+    assert len(set(learners.tolist())) == len(learners)
+    load = np.bincount(teachers, minlength=len(teacher_codes))
+    assert (load <= teacher_capacity).all()
+    expected = skill_scores[np.asarray(learner_codes)[learners], np.asarray(teacher_codes)[teachers]]
+    np.testing.assert_allclose(scores, expected, rtol=1e-6)
+    assert (scores >= THRESHOLD).all()
+
+    optimum = _user_level_optimum(learner_codes, teacher_codes, teacher_capacity, skill_scores)
+    assert scores.sum() == pytest.approx(optimum, rel=1e-5)
+    return learners, teachers, scores
+
+
+def test_beats_greedy_choice():
+    # Greedy gives the single teacher of skill 0 to learner skill 0 (0.95) and
+    # leaves learner skill 1 unmatched; the optimum matches both
+    skill_scores = np.array([[0.95, 0.9], [0.9, 0.0]])
+    learners, teachers, _ = _check([0, 1], [0, 1], np.array([1, 1]), skill_scores)
+    assert dict(zip(learners.tolist(), teachers.tolist())) == {0: 1, 1: 0}
+
+
+def test_respects_capacity_and_threshold():
+    skill_scores = np.array([[0.8, 0.5], [0.7, 0.65]])
+    # The third learner of skill 0 only scores 0.5 against the teacher with room left
+    learners, teachers, _ = _check([0, 0, 0, 1], [0, 1], np.array([2, 3]), skill_scores)
+    assert learners.tolist() == [0, 1, 3]
+    assert teachers.tolist() == [0, 0, 1]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_brute_force_on_random_instances(seed):
+    rng = np.random.default_rng(seed)
+    n_learn_skills, n_teach_skills = rng.integers(1, 5, size=2)
+    skill_scores = rng.uniform(0.3, 1.0, size=(n_learn_skills, n_teach_skills)).round(2)
+    learner_codes = rng.integers(0, n_learn_skills, size=rng.integers(1, 12))
+    teacher_codes = rng.integers(0, n_teach_skills, size=rng.integers(1, 6))
+    teacher_capacity = rng.integers(1, 4, size=len(teacher_codes))
+    _check(learner_codes, teacher_codes, teacher_capacity, skill_scores)
+
+
+def test_no_eligible_pairs():
+    learners, teachers, scores = optimal_assignment([0], [0], np.array([1]), np.array([[0.2]]), THRESHOLD)
+    assert len(learners) == len(teachers) == len(scores) == 0
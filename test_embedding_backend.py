@@ -0,0 +1,43 @@
+# test_embedding_backend.py
+#
+# The parity test needs sentence-transformers, onnxruntime and tokenizers
+# plus a local model directory from ``python embedding_backend.py export``:
+#     GETSKILLED_MODEL_DIR=models/minilm python -m pytest test_embedding_backend.py
+
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks.embedding_backend import TOLERANCE, parity
+from benchmarks.synthetic import free_text_skills
+from embedding_backend import ONNX, SENTENCE_TRANSFORMERS, find_onnx_file, load_backend
+
+MODEL_DIR = os.environ.get("GETSKILLED_MODEL_DIR")
+
+
+def test_parity_reports_the_largest_cosine_difference():
+    rng = np.random.default_rng(0)
+    reference = rng.normal(size=(20, 16))
+    report = parity(reference, reference * 3)
+    assert report["max_abs_diff"] == 0 and report["top1_agreement"] == 1.0
+    assert parity(reference, reference + rng.normal(scale=0.5, size=reference.shape))["max_abs_diff"] > TOLERANCE
+
+
+def test_onnx_scores_match_sentence_transformers():
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    if not MODEL_DIR or not os.path.isdir(MODEL_DIR):
+        pytest.skip("GETSKILLED_MODEL_DIR does not point at a local model directory")
+    try:
+        find_onnx_file(MODEL_DIR)
+    except FileNotFoundError as e:
+        pytest.skip(str(e))
+
+    phrases = free_text_skills()
+    reference = load_backend(SENTENCE_TRANSFORMERS, model_dir=MODEL_DIR).encode(phrases)
+    candidate = load_backend(ONNX, model_dir=MODEL_DIR).encode(phrases)
+
+    report = parity(reference, candidate)
+    assert report["max_abs_diff"] <= TOLERANCE, report
@@ -0,0 +1,74 @@
+# test_match_engine.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import match_engine
+from conftest import EMBEDDING_DIM
+from teacher_features import TeacherFeatures, level_codes, rated_scores
+
+LEVELS = ["Beginner", "Intermediate", "Advanced", None]
+
+
+def _population(seed, n_learners=120, n_teachers=80, n_skills=30, n_topics=6):
+    """Users over skills that cluster into topics, so many pairs clear the threshold."""
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(n_topics, EMBEDDING_DIM))
+    # Learner and teacher skill texts differ, so no two scores tie exactly
+    wants = [f"learn {seed}-{i}" for i in range(n_skills)]
+    teaches = [f"teach {seed}-{i}" for i in range(n_skills)]
+    skills = wants + teaches
+    vectors = topics[np.arange(2 * n_skills) % n_topics] + 0.8 * rng.normal(size=(2 * n_skills, EMBEDDING_DIM))
+    learners = pd.DataFrame({
+        "Name": [f"L{i}" for i in range(n_learners)], "WantsToLearn": rng.choice(wants, n_learners),
+        "CanTeach": None, "SkillLevel": rng.choice(LEVELS, n_learners),
+    })
+    teachers = pd.DataFrame({
+        "Name": [f"T{i}" for i in range(n_teachers)], "WantsToLearn": None,
+        "CanTeach": rng.choice(teaches, n_teachers), "SkillLevel": rng.choice(LEVELS, n_teachers),
+    })
+    users = pd.concat([learners, teachers], ignore_index=True).assign(IsMatched=False)
+    return users, skills, vectors
+
+
+def _pairs(matches):
+    return {(m["Learner"], m["Teacher"]): m["AI_Confidence (%)"] for m in matches}
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_vectorized_matches_loop(embeddings, monkeypatch, seed):
+    users, skills, vectors = _population(seed)
+    embeddings(skills, vectors)
+    # Small chunks so the learner skills are scored over several products
+    monkeypatch.setattr(match_engine, "SCORE_CHUNK", 7)
+
+    loop, loop_unmatched = match_engine.match_users(users, 0.6, "loop")
+    vectorized, unmatched = match_engine.match_users(users, 0.6, "vectorized")
+
+    assert len(loop) > 20 and loop_unmatched
+    assert _pairs(vectorized) == pytest.approx(_pairs(loop))
+    assert unmatched == loop_unmatched
+
+
+def test_rated_matches_dense_ranking(embeddings, monkeypatch):
+    users, skills, vectors = _population(7)
+    embeddings(skills, vectors)
+    monkeypatch.setattr(match_engine, "SCORE_CHUNK", 5)
+    learners = users[users["WantsToLearn"].notna()]
+    teachers = users[users["CanTeach"].notna()]
+
+    # Reference: the full learner x teacher matrix, ranked in one go
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    position = {skill: i for i, skill in enumerate(skills)}
+    similarity = (normed[learners["WantsToLearn"].map(position)] @ normed[teachers["CanTeach"].map(position)].T)
+    similarity = similarity.astype(np.float32)
+    eligible = similarity >= 0.6
+    rank = rated_scores(similarity, level_codes(learners["SkillLevel"]), TeacherFeatures.build(teachers))
+    best = np.where(eligible, rank, -np.inf).argmax(axis=1)
+    expected = {(learner, teachers["Name"].iloc[j]) for learner, j, ok
+                in zip(learners["Name"], best, eligible.any(axis=1)) if ok}
+
+    assert expected
+    matches, _ = match_engine.match_users(users, 0.6, "vectorized", scoring="rated")
+    assert set(_pairs(matches)) == expected
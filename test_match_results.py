@@ -0,0 +1,46 @@
+# test_match_results.py
+
+import pytest
+
+import bulk_encoder
+import storage
+import user_schema
+from match_engine import find_matches
+from match_results import first_exact_teacher
+
+
+@pytest.fixture
+def users(embeddings):
+    users = user_schema.enforce(storage.load("users"))
+    embeddings(bulk_encoder.skill_texts(users))
+    return users
+
+
+def test_first_exact_teacher_without_teachers():
+    first = first_exact_teacher(["A", "B"], ["SQL", "Excel"], [], [])
+    assert first.tolist() == [-1, -1]
+
+
+def test_first_exact_teacher_skips_the_learner_themselves():
+    first = first_exact_teacher(["A", "B"], ["sql", "excel"], ["A", "C"], ["SQL ", "Python"])
+    assert first.tolist() == [-1, -1]
+    first = first_exact_teacher(["A"], ["sql"], ["A", "C"], ["SQL", "sql"])
+    assert first.tolist() == [1]
+
+
+def test_exact_prefilter_with_no_teachers(users):
+    users["CanTeach"] = None
+    learners = users.loc[users["WantsToLearn"].notna() & (users["IsMatched"] != True), "Name"].tolist()
+
+    matches, unmatched = find_matches(users, prefilter="exact")
+    assert matches.empty
+    assert unmatched == learners
+
+
+def test_exact_prefilter_with_every_teacher_matched(users):
+    users.loc[users["CanTeach"].notna(), "IsMatched"] = True
+    learners = users.loc[users["WantsToLearn"].notna() & (users["IsMatched"] != True), "Name"].tolist()
+
+    matches, unmatched = find_matches(users, prefilter="exact")
+    assert matches.empty
+    assert unmatched == learners
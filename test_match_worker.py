@@ -0,0 +1,148 @@
+# test_match_worker.py
+
+import collections
+import threading
+
+import pandas as pd
+import pytest
+
+import bulk_encoder
+import match_worker
+import metrics
+import storage
+import user_schema
+
+
+@pytest.fixture
+def queue(data_dir, monkeypatch):
+    """The job queue in a fresh data/jobs.db; connections are per thread."""
+    monkeypatch.setattr(match_worker, "_local", threading.local())
+    yield match_worker
+    conn = getattr(match_worker._local, "conn", None)
+    if conn is not None:
+        conn.close()
+
+
+def _matched(name, users_df, threshold):
+    match = {"Learner": name, "Teacher": "Alice Johnson"}
+    return users_df, match
+
+
+def test_process_batch_finishes_registrations(queue, monkeypatch):
+    monkeypatch.setattr(queue, "match_registered_user", _matched)
+    job_id = queue.enqueue(queue.USER_REGISTERED, {"Name": "Mark Smith"})
+    unknown = queue.enqueue("resize")
+
+    queue.process_batch(queue._claim())
+
+    job = queue.job_status(job_id)
+    assert job["status"] == "done"
+    assert job["result"] == {"matched": True, "Teacher": "Alice Johnson", "Learner": "Mark Smith"}
+    assert queue.job_status(unknown)["status"] == "failed"
+    assert queue.pending_count() == 0
+
+
+def test_process_batch_records_a_failed_match(queue, monkeypatch):
+    def broken(name, users_df, threshold):
+        raise ValueError("no model")
+
+    monkeypatch.setattr(queue, "match_registered_user", broken)
+    job_id = queue.enqueue(queue.USER_REGISTERED, {"Name": "Mark Smith"})
+    queue.process_batch(queue._claim())
+
+    job = queue.job_status(job_id)
+    assert job["status"] == "failed"
+    assert "no model" in job["error"]
+
+
+def test_process_batch_fails_claimed_jobs_when_users_cannot_load(queue, monkeypatch):
+    def unreadable():
+        raise OSError("users.csv is locked")
+
+    monkeypatch.setattr(queue, "_load_users", unreadable)
+    job_ids = [queue.enqueue(queue.USER_REGISTERED, {"Name": "Mark Smith"}), queue.enqueue(queue.REMATCH)]
+    with pytest.raises(OSError):
+        queue.process_batch(queue._claim())
+
+    assert [queue.job_status(job_id)["status"] for job_id in job_ids] == ["failed", "failed"]
+    assert queue.run_once() == 0
+
+
+def test_requeue_stale_leaves_live_jobs_alone(queue):
+    live, dead = queue.enqueue(queue.REMATCH), queue.enqueue(queue.REMATCH)
+    queue._claim()
+    queue._connect().execute("UPDATE jobs SET heartbeat = 0 WHERE id = ?", (dead,))
+
+    queue._requeue_stale()
+    assert queue.job_status(live)["status"] == "running"
+    assert queue.job_status(dead)["status"] == "queued"
+
+
+def test_register_user_stores_schema_columns_only(queue):
+    header = list(storage.load("users").columns)
+    job_id = queue.register_user({"Name": "Test User", "WantsToLearn": "Excel", "IsMatched": False,
+                                  "Reason": "pending"})
+
+    users = user_schema.enforce(storage.load("users"))
+    assert list(storage.load("users").columns) == header
+    assert users["Name"].iloc[-1] == "Test User"
+    assert queue.job_status(job_id)["status"] == "queued"
+
+
+def _seed_shipped(embeddings):
+    """Vectors for the shipped skills and the names match confidences encode."""
+    users = user_schema.enforce(storage.load("users"))
+    names = users["Name"].str.lower().tolist() + ["new learner", "new teacher"]
+    embeddings(bulk_encoder.skill_texts(users) + names)
+
+
+@pytest.mark.filterwarnings("error::FutureWarning")
+def test_registered_learner_is_matched_on_shipped_data(queue, embeddings):
+    _seed_shipped(embeddings)
+    header = list(storage.load("users").columns)
+
+    job_id = queue.register_user({"Name": "New Learner", "Email": "new@example.com", "Role": "Learner",
+                                  "WantsToLearn": "Python", "StudyDays": 3, "IsMatched": False})
+    assert queue.run_once() == 1
+
+    job = queue.job_status(job_id)
+    assert job["status"] == "done", job["error"]
+    assert job["result"] == {"matched": True, "Teacher": "Amelia Young", "Learner": "New Learner"}
+    assert list(storage.load("users").columns) == header
+    users = user_schema.enforce(storage.load("users")).set_index("Name")
+    assert users.loc["New Learner", "IsMatched"] and users.loc["Amelia Young", "IsMatched"]
+    assert storage.load("matches").iloc[-1][["Learner", "Teacher"]].tolist() == ["New Learner", "Amelia Young"]
+
+
+@pytest.mark.filterwarnings("error::FutureWarning")
+def test_registered_teacher_takes_a_waiting_learner(queue, embeddings):
+    _seed_shipped(embeddings)
+    storage.save("unmatched", pd.DataFrame({"Name": ["Mark Smith"], "WantsToLearn": ["Excel"], "Reason": ["x"]}))
+
+    job_id = queue.register_user({"Name": "New Teacher", "Role": "Teacher", "CanTeach": "Excel",
+                                  "IsMatched": False})
+    queue.run_once()
+
+    job = queue.job_status(job_id)
+    assert job["status"] == "done", job["error"]
+    assert job["result"]["Learner"] == "Mark Smith"
+    assert storage.load("unmatched").empty
+    users = user_schema.enforce(storage.load("users")).set_index("Name")
+    assert users.loc["New Teacher", "IsMatched"] and users.loc["Mark Smith", "IsMatched"]
+
+
+def test_batches_on_the_worker_thread_reach_recent_runs(queue, monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    monkeypatch.setattr(metrics, "METRICS_FILE", None)
+    monkeypatch.setattr(metrics, "_history", collections.deque(maxlen=metrics.HISTORY))
+    monkeypatch.setattr(queue, "match_registered_user", _matched)
+    queue.enqueue(queue.USER_REGISTERED, {"Name": "Mark Smith"})
+
+    worker = threading.Thread(target=queue.run_once)
+    worker.start()
+    worker.join()
+
+    runs = metrics.recent_runs()
+    assert [run["label"] for run in runs] == ["worker"]
+    assert runs[0]["timers"]["csv.read"]["calls"] >= 1
+    assert any(row["label"] == "worker" and row["name"] == "csv.read" for row in metrics.summary_table())
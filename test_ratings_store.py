@@ -0,0 +1,60 @@
+# test_ratings_store.py
+
+import pandas as pd
+import pytest
+
+import ratings_store
+import storage
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "BACKEND", "csv")
+    return ratings_store.RatingsStore(str(tmp_path / "ratings.csv"))
+
+
+def _averages(store):
+    return store.averages().set_index("Teacher")["Average Rating"].to_dict()
+
+
+def test_upsert_keeps_latest_rating_per_pair(store):
+    store.upsert("A", "T1", 3, "ok")
+    store.upsert("B", "T1", 5)
+    store.upsert("A", "T1", 4)
+
+    table = store.table().set_index(["Learner", "Teacher"])
+    assert len(table) == 2
+    assert table.loc[("A", "T1"), "Rating"] == 4
+    # A rating without comments keeps the earlier comment
+    assert table.loc[("A", "T1"), "Comments"] == "ok"
+    assert _averages(store) == {"T1": pytest.approx(4.5)}
+    assert store.counts() == {"T1": 2}
+
+
+def test_aggregates_match_a_rebuild_from_the_file(store):
+    for i in range(30):
+        store.upsert(f"L{i % 7}", f"T{i % 3}", 1 + i % 5)
+
+    rows = pd.read_csv(store.path).drop_duplicates(["Learner", "Teacher"], keep="last")
+    expected = rows.groupby("Teacher")["Rating"].mean().to_dict()
+    assert _averages(store) == pytest.approx(expected)
+    assert store.verify().empty
+
+
+def test_rows_appended_by_another_process_are_read(store):
+    store.upsert("A", "T1", 2)
+    other = ratings_store.RatingsStore(store.path)
+    other.upsert("A", "T1", 5)
+    other.upsert("C", "T2", 1)
+
+    assert _averages(store) == {"T1": 5.0, "T2": 1.0}
+    assert len(store.table()) == 2
+
+
+def test_compact_leaves_one_row_per_pair(store):
+    for rating in (1, 2, 3):
+        store.upsert("A", "T1", rating)
+    store.compact()
+
+    assert len(pd.read_csv(store.path)) == 1
+    assert _averages(store) == {"T1": 3.0}
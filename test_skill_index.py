@@ -0,0 +1,75 @@
+# test_skill_index.py
+
+import numpy as np
+
+import bulk_encoder
+import storage
+import user_schema
+from match_engine import load_teacher_index, teacher_index_path
+from skill_index import SkillIndex
+
+
+def _vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def _exact_top(vectors, queries, threshold):
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ vectors.T
+    best = scores.argmax(axis=1)
+    return [int(j) if scores[i, j] >= threshold else None for i, j in enumerate(best)]
+
+
+def test_search_probing_every_list_is_exact():
+    vectors = _vectors(200)
+    queries = vectors[:50] + 0.3 * _vectors(50, seed=1)
+    index = SkillIndex(n_lists=8, nprobe=8).build(range(200), vectors)
+
+    hits = index.search(queries, k=1, threshold=0.5)
+    assert [h[0][0] if h else None for h in hits] == _exact_top(vectors, queries, 0.5)
+
+
+def test_equal_scores_resolve_to_the_earliest_item():
+    vector = _vectors(1)
+    index = SkillIndex(n_lists=1).build(["b", "a", "c"], np.repeat(vector, 3, axis=0))
+    assert [item for item, _ in index.search(vector, k=3, threshold=0.5)[0]] == ["b", "a", "c"]
+
+
+def test_remove_and_re_add():
+    vectors = _vectors(20)
+    index = SkillIndex(n_lists=2, nprobe=2).build(range(20), vectors)
+
+    index.remove([3, 99])
+    assert 3 not in index and len(index) == 19
+    assert index.search(vectors[3:4], k=1, threshold=0.99)[0] == []
+
+    # Re-adding an id replaces its vector
+    index.add([5], vectors[3:4])
+    assert index.search(vectors[3:4], k=1, threshold=0.99)[0][0][0] == 5
+    assert index.search(vectors[5:6], k=1, threshold=0.99)[0] == []
+
+
+def test_save_and_load(tmp_path):
+    vectors = _vectors(100)
+    index = SkillIndex(n_lists=5, nprobe=2).build([f"t{i}" for i in range(100)], vectors)
+    index.remove(["t0", "t1"])
+    path = tmp_path / "index.npz"
+    index.save(path)
+
+    loaded = SkillIndex.load(path)
+    assert loaded.ids == index.ids
+    queries = _vectors(10, seed=2)
+    assert loaded.search(queries, k=3, threshold=0.0) == index.search(queries, k=3, threshold=0.0)
+
+
+def test_saved_teacher_index_follows_the_open_teachers(embeddings):
+    users = user_schema.enforce(storage.load("users"))
+    embeddings(bulk_encoder.skill_texts(users))
+    teachers = users[users["CanTeach"].notna()]
+    names = teachers["Name"].tolist()
+
+    load_teacher_index(teachers).save(teacher_index_path())
+    index = load_teacher_index(teachers.iloc[1:])
+    assert sorted(index.ids) == sorted(names[1:])
+    assert names[0] not in index
@@ -0,0 +1,95 @@
+# test_snapshot.py
+
+import os
+
+import pandas as pd
+import pytest
+
+import snapshot
+import study_log
+
+SUMMARY_TABLES = ("users", "matches", "study_log")
+
+
+def _append_session(name, minutes):
+    writer = study_log.StudyLogWriter(study_log.STUDY_LOG_FILE)
+    try:
+        return writer.append(name, minutes)
+    finally:
+        writer.close()
+
+
+def _legacy_minutes():
+    legacy = pd.read_csv(study_log.STUDY_LOG_FILE)
+    return (legacy.groupby("name")["hours"].sum() * 60).to_dict()
+
+
+def test_second_export_only_writes_new_rows(data_dir):
+    first = snapshot.export(SUMMARY_TABLES)
+    assert all(first[table] > 0 for table in SUMMARY_TABLES)
+    days = sorted(snapshot._load_manifest()["study_log"]["partitions"])
+    assert days == ["2025-07-17", "2025-07-21"]
+
+    assert snapshot.export(SUMMARY_TABLES) == {table: 0 for table in SUMMARY_TABLES}
+
+    row = _append_session("Rachel Patterson", 25)
+    assert not snapshot.is_current("study_log")
+    assert snapshot.export(SUMMARY_TABLES) == {"users": 0, "matches": 0, "study_log": 1}
+    assert snapshot.is_current("study_log")
+
+    today = row["Timestamp"][:10]
+    assert sorted(snapshot._load_manifest()["study_log"]["partitions"]) == days + [today]
+    new_rows = snapshot.read("study_log", ["Name", "Minutes"], [("Date", "=", today)])
+    assert new_rows.to_dict("records") == [{"Name": "Rachel Patterson", "Minutes": 25.0}]
+
+
+def test_study_minutes_since_converts_legacy_hours(data_dir):
+    expected = _legacy_minutes()
+
+    # Live log before any export, then the snapshot
+    for exported in (False, True):
+        if exported:
+            snapshot.export(["study_log"])
+        assert snapshot.is_current("study_log") == exported
+        totals = snapshot.study_minutes_since("2025-07-01")
+        assert dict(zip(totals["Name"], totals["Minutes"])) == pytest.approx(expected)
+
+    totals = snapshot.study_minutes_since("2025-07-20")
+    assert totals["Name"].tolist() == ["Mrs. Cassandra Guerra"]
+
+
+def _parquet_mtimes():
+    root = snapshot.SNAPSHOT_DIR
+    return {os.path.join(path, f): os.stat(os.path.join(path, f)).st_mtime_ns
+            for path, _, files in os.walk(root) for f in files if f.endswith(".parquet")}
+
+
+def test_summary_tab_reads_the_snapshot_without_re_exporting(data_dir, monkeypatch):
+    pytest.importorskip("streamlit")
+    import admin_summary
+
+    shown = []
+    for call in ("markdown", "subheader", "info", "warning"):
+        monkeypatch.setattr(admin_summary.st, call, lambda *args, **kwargs: None)
+    monkeypatch.setattr(admin_summary.st, "dataframe", lambda df, *args, **kwargs: shown.append(df))
+
+    # The first visit exports the tables the tab reads
+    admin_summary.show_summary_tab()
+    assert all(snapshot.is_current(table) for table in admin_summary.SUMMARY_TABLES)
+
+    # With nothing changed, the next visit writes no partitions and reads no live table
+    written = []
+    export = snapshot.export
+    monkeypatch.setattr(snapshot, "export", lambda tables: written.append(export(tables)) or written[-1])
+    monkeypatch.setattr(snapshot, "_load_source", lambda table, since=None: pytest.fail(f"read live {table}"))
+    mtimes = _parquet_mtimes()
+    shown.clear()
+
+    admin_summary.show_summary_tab()
+
+    assert written == [{table: 0 for table in admin_summary.SUMMARY_TABLES}]
+    assert _parquet_mtimes() == mtimes
+    all_users, unpaired, minutes = shown
+    assert set(all_users["Match Status"]) <= {"Paired", "Unpaired"}
+    assert len(unpaired) == (all_users["Match Status"] == "Unpaired").sum()
+    assert list(minutes.columns) == ["Name", "Minutes"]
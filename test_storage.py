@@ -0,0 +1,115 @@
+# test_storage.py
+
+import os
+
+import pandas as pd
+import pytest
+
+import storage
+import user_schema
+
+
+def _header(path):
+    with open(path) as f:
+        return f.readline().strip().split(",")
+
+
+def _lowercase_duplicates(header):
+    lowered = [col.lower() for col in header]
+    return {col for col in lowered if lowered.count(col) > 1}
+
+
+def test_append_registration_to_shipped_users(data_dir):
+    header = _header(data_dir / "users.csv")
+    # The registration form's row carries keys outside the users schema
+    storage.append("users", pd.DataFrame([{
+        "Name": "Test User", "Email": "test@example.com", "Role": "Learner", "WantsToLearn": "Excel",
+        "StudyDays": 3, "IsMatched": False, "Reason": "pending", "Date": "2025-07-21",
+    }]))
+
+    assert _header(data_dir / "users.csv") == header
+    users = user_schema.enforce(storage.load("users"))
+    assert users["Name"].iloc[-1] == "Test User"
+    assert users["WantsToLearn"].iloc[-1] == "Excel"
+
+
+def test_append_new_schema_column_migrates_once(data_dir):
+    path = data_dir / "matches.csv"
+    storage.append("matches", pd.DataFrame([{
+        "Learner": "A", "Teacher": "B", "Skill": "SQL", "AI_Confidence (%)": 91.0,
+        "Explanation": "x", "Timestamp": "2025-07-21 10:00:00", "Extra": 1,
+    }]))
+
+    header = _header(path)
+    assert not _lowercase_duplicates(header)
+    assert "Extra" not in header
+    matches = storage.load("matches")
+    assert matches["Learner"].iloc[-1] == "A"
+    assert matches["Learner"].notna().all()
+
+
+def test_load_merges_columns_duplicated_by_case(data_dir):
+    path = data_dir / "users.csv"
+    pd.DataFrame({"name": ["Old", None], "Name": [None, "New"], "ismatched": [True, None]}).to_csv(path, index=False)
+
+    users = user_schema.enforce(storage.load("users"))
+    assert users["Name"].tolist() == ["Old", "New"]
+    assert users["IsMatched"].tolist() == [True, False]
+
+
+def test_save_drops_columns_outside_schema(data_dir):
+    users = storage.load("users").assign(Reason="x")
+    storage.save("users", users)
+    assert "Reason" not in _header(data_dir / "users.csv")
+
+
+def test_append_adds_rows_after_existing(data_dir):
+    before = storage.load("matches")
+    row = pd.DataFrame([{"Learner": "A", "Teacher": "B", "Skill": "SQL", "AI_Confidence (%)": 91.0}])
+    storage.append("matches", row)
+    storage.append("matches", row.assign(Learner="C"))
+
+    matches = storage.load("matches")
+    assert len(matches) == len(before) + 2
+    assert matches["Learner"].tail(2).tolist() == ["A", "C"]
+    pd.testing.assert_frame_equal(matches.head(len(before))[list(before.columns)], before, check_dtype=False)
+
+
+def test_transaction_commits_tables_together(data_dir):
+    start = storage.generation()
+    with storage.transaction() as tx:
+        tx.save("unmatched", pd.DataFrame({"Name": ["A"], "WantsToLearn": ["SQL"], "Reason": ["x"]}))
+        tx.append("matches", pd.DataFrame([{"Learner": "A", "Teacher": "B", "Skill": "SQL"}]))
+        # Nothing is visible before the block exits
+        assert storage.load("unmatched")["Name"].tolist() != ["A"]
+
+    assert storage.generation() == start + 2
+    assert storage.load("unmatched")["Name"].tolist() == ["A"]
+    assert storage.load("matches")["Learner"].iloc[-1] == "A"
+    assert not [name for name in os.listdir(data_dir) if name.endswith(".tmp")]
+
+
+def test_transaction_writes_nothing_when_block_raises(data_dir):
+    start = storage.generation()
+    matches = (data_dir / "matches.csv").read_bytes()
+    with pytest.raises(RuntimeError):
+        with storage.transaction() as tx:
+            tx.append("matches", pd.DataFrame([{"Learner": "A", "Teacher": "B", "Skill": "SQL"}]))
+            raise RuntimeError("match run failed")
+
+    assert storage.generation() == start
+    assert (data_dir / "matches.csv").read_bytes() == matches
+
+
+def test_save_user_changes_keeps_users_registered_meanwhile(data_dir):
+    users = user_schema.enforce(storage.load("users"))
+    name = users["Name"].iloc[0]
+    storage.append("users", pd.DataFrame([{"Name": "Late User", "WantsToLearn": "Excel", "IsMatched": False}]))
+
+    with storage.transaction() as tx:
+        tx.save_user_changes(users, None, [name])
+
+    saved = user_schema.enforce(storage.load("users"))
+    assert len(saved) == len(users) + 1
+    assert saved.loc[saved["Name"] == name, "IsMatched"].all()
+    assert saved.loc[saved["Name"] == "Late User", "IsMatched"].eq(False).all()
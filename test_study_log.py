@@ -0,0 +1,64 @@
+# test_study_log.py
+
+import pandas as pd
+import pytest
+
+import study_log
+
+
+@pytest.fixture
+def ordered_log(data_dir, monkeypatch):
+    """A log of one row per minute, with the binary search kicking in early."""
+    monkeypatch.setattr(study_log, "LINEAR_SCAN_BYTES", 64)
+    stamps = pd.date_range("2025-07-01", periods=2000, freq="min")
+    log = pd.DataFrame({"Name": [f"user{i % 7}" for i in range(len(stamps))],
+                        "Minutes": range(len(stamps)), "Timestamp": stamps.strftime(study_log.TIMESTAMP_FORMAT)})
+    path = str(data_dir / "ordered_log.csv")
+    log.to_csv(path, index=False)
+    return path, log.assign(Timestamp=stamps)
+
+
+def test_first_offset_since_finds_the_first_row_in_the_window(ordered_log):
+    path, log = ordered_log
+    with open(path, "rb") as f:
+        for since in ["2025-06-30", "2025-07-01 00:00", "2025-07-01 13:37:30", "2025-07-02 09:19", "2025-08-01"]:
+            f.seek(0)
+            f.readline()
+            f.seek(study_log._first_offset_since(f, 2, pd.Timestamp(since)))
+            line = f.readline().decode()
+            expected = log[log["Timestamp"] >= pd.Timestamp(since)]
+            if expected.empty:
+                assert line == ""
+            else:
+                assert line.split(",")[2].strip() == expected["Timestamp"].iloc[0].strftime(study_log.TIMESTAMP_FORMAT)
+
+
+def test_read_log_window_matches_a_full_scan(ordered_log):
+    path, log = ordered_log
+    since, until = pd.Timestamp("2025-07-01 05:00:30"), pd.Timestamp("2025-07-01 21:10")
+
+    window = study_log.read_log(path, since=since, until=until, chunksize=100)
+    expected = log[(log["Timestamp"] >= since) & (log["Timestamp"] < until)]
+    assert window["Minutes"].tolist() == expected["Minutes"].tolist()
+
+    named = study_log.read_log(path, since=since, name="USER3", chunksize=100)
+    expected = log[(log["Timestamp"] >= since) & (log["Name"] == "user3")]
+    assert named["Minutes"].tolist() == expected["Minutes"].tolist()
+
+
+def test_appending_to_a_legacy_hours_log_migrates_the_header(data_dir):
+    path = study_log.STUDY_LOG_FILE
+    legacy = pd.read_csv(path)
+    assert list(legacy.columns) == ["name", "skill", "hours", "timestamp"]
+
+    writer = study_log.StudyLogWriter(path)
+    try:
+        writer.append("Rachel Patterson", 45)
+    finally:
+        writer.close()
+
+    assert set(study_log.LOG_COLUMNS) <= set(study_log.read_header(path))
+    log = study_log.read_log(path)
+    assert len(log) == len(legacy) + 1
+    assert log["Minutes"].tolist() == pytest.approx((legacy["hours"] * 60).tolist() + [45])
+    assert log["Name"].iloc[-1] == "Rachel Patterson"
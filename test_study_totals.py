@@ -0,0 +1,72 @@
+# test_study_totals.py
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import habit_tracker
+import storage
+import study_totals
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+@pytest.fixture
+def log_path(data_dir):
+    """A study log spanning the edges of the 7 x 24 hour window, with its aggregate built."""
+    now = datetime.now()
+    sessions = [
+        ("Ann", 50, now - timedelta(days=7, hours=1)),     # just outside the window
+        ("Ann", 30, now - timedelta(days=7) + timedelta(minutes=1)),  # partial first day
+        ("Ben", 20, now - timedelta(days=7) + timedelta(minutes=2)),
+        ("Ann", 15, now - timedelta(days=3)),
+        ("Ben", 45, now - timedelta(days=1)),
+        ("Ann", 10, now - timedelta(minutes=5)),
+    ]
+    path = data_dir / "study_log.csv"
+    pd.DataFrame([(name, minutes, ts.strftime(TIMESTAMP_FORMAT)) for name, minutes, ts in sessions],
+                 columns=["Name", "Minutes", "Timestamp"]).to_csv(path, index=False)
+    study_totals.rebuild(str(path))
+    return str(path)
+
+
+def test_recent_totals_cover_the_last_seven_times_24_hours(log_path):
+    since = datetime.now() - timedelta(days=7)
+    raw = storage.load_study_log(since=since, path=log_path).groupby("Name")["Minutes"].sum().to_dict()
+
+    totals = study_totals.recent_totals(7, log_path).set_index("Name")["Minutes"].to_dict()
+    assert totals == raw == {"Ann": 55, "Ben": 65}
+
+
+def test_sessions_by_weekday_match_the_raw_log(log_path):
+    since = datetime.now() - timedelta(days=7)
+    raw = pd.to_datetime(storage.load_study_log(name="ann", since=since, path=log_path)["Timestamp"])
+    expected = raw.dt.day_name().value_counts().to_dict()
+
+    summary = study_totals.sessions_by_weekday("ANN", 7, log_path)
+    assert {day: count for day, count in summary.items() if count} == expected
+
+
+def test_defaulters_count_sessions_from_the_partial_first_day(log_path, data_dir):
+    targets = data_dir / "targets_test.csv"
+    pd.DataFrame({"Name": ["Ann", "Ben"], "TargetMinutes": [55, 66]}).to_csv(targets, index=False)
+
+    defaulters = habit_tracker.get_defaulters(str(targets), log_path)
+    assert defaulters["Name"].tolist() == ["Ben"]
+
+
+@pytest.mark.filterwarnings("error::FutureWarning")
+def test_logging_into_an_empty_aggregate_and_verifying_do_not_warn(data_dir):
+    path = str(data_dir / "fresh_log.csv")
+    habit_tracker.log_study_activity("Ann", 20, path)
+    pd.DataFrame(columns=study_totals.DAILY_COLUMNS).to_csv(study_totals.daily_path(path), index=False)
+    habit_tracker.log_study_activity("Ann", 25, path)
+    habit_tracker.log_study_activity("Ben", 5, path)
+
+    totals = study_totals.recent_totals(7, path).set_index("Name")["Minutes"].to_dict()
+    assert totals == {"Ann": 25, "Ben": 5}
+    assert len(study_totals.verify(path)) == 1
+
+    pd.DataFrame(columns=study_totals.DAILY_COLUMNS).to_csv(study_totals.daily_path(path), index=False)
+    assert len(study_totals.verify(path)) == 2
@@ -0,0 +1,57 @@
+# test_targets.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import habit_tracker
+import match_engine
+import targets
+
+
+@pytest.fixture
+def users(embeddings):
+    # Excel and Advanced Excel point the same way; SQL and a missing skill are orthogonal to them
+    basis = np.eye(4, dtype=np.float32)
+    embeddings(["Excel", "Advanced Excel", "SQL", "nan", "None"],
+               [basis[0], basis[0] * 2, basis[1], basis[2], basis[3]])
+    return pd.DataFrame({
+        "Name": ["Ann", "Ben", "Cat"],
+        "SkillLevel": ["Beginner", "Advanced", "Intermediate"],
+        "WantsToLearn": ["Excel", "SQL", "Excel"],
+        "CanTeach": ["Advanced Excel", "Excel", None],
+        "StudyDays": [3, 5, 1],
+    })
+
+
+def test_target_formula(users, data_dir):
+    result = targets.update_targets(users, str(data_dir / "targets.csv"))
+    # 30 + level boost + 10 x cosine(wants, teach)
+    assert result.set_index("Name")["TargetMinutes"].to_dict() == {"Ann": 50.0, "Ben": 35.0, "Cat": 35.0}
+
+
+def test_only_changed_users_are_recomputed(users, data_dir, monkeypatch):
+    path = str(data_dir / "targets.csv")
+    targets.update_targets(users, path)
+    scored = []
+    compute = targets.compute_targets
+    monkeypatch.setattr(targets, "compute_targets", lambda df: scored.extend(df["Name"]) or compute(df))
+
+    targets.update_targets(users, path)
+    assert scored == []
+    targets.update_targets(users.assign(SkillLevel=["Intermediate", "Advanced", "Intermediate"]), path)
+    assert scored == ["Ann"]
+    assert targets.load_targets(path).set_index("Name").loc["Ann", "TargetMinutes"] == 45.0
+
+
+def test_every_entry_point_uses_the_saved_targets(users, data_dir):
+    shown = habit_tracker.get_study_targets(users, habit_tracker.TARGET_FILE)
+    assert match_engine.generate_study_targets(users).equals(shown)
+    saved = targets.load_targets(match_engine.TARGETS_FILE)
+    assert saved["TargetMinutes"].tolist() == shown["TargetMinutes"].tolist()
+
+
+def test_lowercase_headers_are_read(data_dir):
+    path = data_dir / "old_targets.csv"
+    pd.DataFrame({"name": ["Ann"], "targetminutes": [40.0]}).to_csv(path, index=False)
+    assert targets.load_targets(str(path))[["Name", "TargetMinutes"]].values.tolist() == [["Ann", 40.0]]
@@ -0,0 +1,42 @@
+# test_user_directory.py
+
+import pandas as pd
+import pytest
+
+import storage
+import user_directory
+
+
+@pytest.fixture
+def directory(data_dir, monkeypatch):
+    monkeypatch.setattr(user_directory, "_directory", None)
+    monkeypatch.setattr(user_directory, "_directory_version", None)
+    return user_directory.get_directory
+
+
+def test_directory_is_reused_until_a_write(directory):
+    first = directory()
+    assert directory() is first
+    assert first.find_user("  alice JOHNSON ")["Email"] == "alice.johnson@example.com"
+    assert first.find_user("Nobody Here") is None
+
+
+def test_appending_a_user_rebuilds_the_index(directory):
+    before = directory()
+    assert before.find_user("New Person") is None
+    assert not before.email_exists("new.person@example.com")
+
+    storage.append("users", pd.DataFrame([{"Name": "New Person", "Email": "new.person@example.com",
+                                           "Role": "Learner", "WantsToLearn": "SQL"}]))
+
+    after = directory()
+    assert after is not before
+    assert after.find_user("new person")["WantsToLearn"] == "SQL"
+    assert after.email_exists("NEW.PERSON@example.com")
+
+
+def test_appending_a_match_rebuilds_the_index(directory):
+    assert directory().match_for("Zoe Learner") is None
+    storage.append("matches", pd.DataFrame([{"Learner": "Zoe Learner", "Teacher": "Alice Johnson",
+                                             "Skill": "Python", "Score": 0.9}]))
+    assert directory().match_for("zoe learner")["Teacher"] == "Alice Johnson"
@@ -0,0 +1,41 @@
+# test_user_schema.py
+
+import pandas as pd
+
+import storage
+import user_schema
+
+
+def test_shipped_users_load_with_the_schema_dtypes(data_dir):
+    raw = pd.read_csv("data/users.csv")
+    users = user_schema.enforce(storage.load("users"))
+
+    assert list(users.columns[:len(user_schema.USER_COLUMNS)]) == user_schema.USER_COLUMNS
+    for col in user_schema.CATEGORY_COLUMNS:
+        assert isinstance(users[col].dtype, pd.CategoricalDtype), col
+    assert users["SkillLevel"].tolist() == raw["skilllevel"].tolist()
+    assert str(users["StudyDays"].dtype) == user_schema.STUDY_DAYS_DTYPE
+    assert users["StudyDays"].tolist() == raw["studydays"].tolist()
+    assert users["IsMatched"].dtype == bool
+    assert pd.api.types.is_datetime64_any_dtype(users["Timestamp"])
+
+
+def test_study_days_are_whole_days_in_range():
+    users = user_schema.enforce(pd.DataFrame({"Name": list("abcdef"),
+                                              "StudyDays": ["3", 5.0, "2.6", "9", "-1", "often"]}))
+    assert str(users["StudyDays"].dtype) == "Int16"
+    assert users["StudyDays"].tolist() == [3, 5, 3, pd.NA, pd.NA, pd.NA]
+    # 7 days * 30 minutes must not overflow the small int
+    assert (users["StudyDays"] * 30).max() == 150
+
+
+def test_skill_level_and_flags_from_lower_case_headers():
+    users = user_schema.enforce(pd.DataFrame({
+        "name": ["a", "b", "c", "d"],
+        "skilllevel": ["Beginner", "Advanced", None, "Beginner"],
+        "ismatched": ["true", "False", None, 1],
+    }))
+    assert users["SkillLevel"].dtype == pd.CategoricalDtype(["Advanced", "Beginner"])
+    assert users["SkillLevel"].isna().tolist() == [False, False, True, False]
+    assert users["IsMatched"].tolist() == [True, False, False, True]
+    assert users["Gender"].isna().all()
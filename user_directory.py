@@ -0,0 +1,75 @@
+# user_directory.py
+#
+# Dictionary indexes over users and matches.
+#
+# Login, duplicate-email checks and "who am I matched with" look users up
+# by normalised name or email. The directory builds one dict per key
+# when the data changes (tracked with storage.version) and answers each
+# lookup in constant time instead of scanning the frames.
+
+import threading
+
+import pandas as pd
+
+import storage
+from habit_tracker import load_users
+
+
+def normalize_key(value):
+    return str(value).strip().lower()
+
+
+def _first_positions(keys):
+    """{key: position of its first row}, skipping blank and missing keys."""
+    keys = keys.astype(str).str.strip().str.lower().where(keys.notna(), "")
+    first = ~keys.duplicated() & (keys != "")
+    return dict(zip(keys[first], first.to_numpy().nonzero()[0]))
+
+
+class UserDirectory:
+    """Constant-time lookups by name and email, plus each learner's match."""
+
+    def __init__(self, users_df, matches_df=None):
+        self.users = users_df.reset_index(drop=True)
+        self.matches = (matches_df if matches_df is not None else pd.DataFrame()).reset_index(drop=True)
+        self._by_name = _first_positions(self.users["Name"]) if "Name" in self.users else {}
+        self._by_email = _first_positions(self.users["Email"]) if "Email" in self.users else {}
+        self._match_by_learner = _first_positions(self.matches["Learner"]) if "Learner" in self.matches else {}
+
+    def find_user(self, name):
+        """First user row whose name matches ``name`` (case/space-insensitive), or None."""
+        pos = self._by_name.get(normalize_key(name))
+        return None if pos is None else self.users.iloc[pos]
+
+    def email_exists(self, email):
+        return normalize_key(email) in self._by_email
+
+    def match_for(self, learner_name):
+        """First match row for ``learner_name``, or None."""
+        pos = self._match_by_learner.get(normalize_key(learner_name))
+        return None if pos is None else self.matches.iloc[pos]
+
+
+# --- Shared instance ---
+_lock = threading.Lock()
+_directory = None
+_directory_version = None
+
+
+def get_directory():
+    """The shared directory, rebuilt only when users or matches were written."""
+    global _directory, _directory_version
+    current = (storage.version("users"), storage.version("matches"))
+    with _lock:
+        if _directory is None or _directory_version != current:
+            matches = storage.load("matches") if storage.exists("matches") else pd.DataFrame()
+            _directory = UserDirectory(load_users(), matches)
+            _directory_version = current
+        return _directory
+
+
+def invalidate():
+    """Drop the shared directory; the next lookup rebuilds it."""
+    global _directory
+    with _lock:
+        _directory = None
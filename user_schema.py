@@ -0,0 +1,59 @@
+# user_schema.py
+#
+# Typed in-memory representation of the users table.
+#
+# CSV round-trips leave every column as Python strings and IsMatched as a
+# mix of bools and "true"/"false" text. enforce() gives the frame a fixed
+# schema instead: categories for the low-cardinality text columns, a real
+# bool for IsMatched, datetime64 for Timestamp and a small nullable int for
+# StudyDays. Headers are matched case-insensitively, so the lower-case
+# headers of older files (name, ismatched, ...) load under the names the
+# code expects.
+
+import numpy as np
+import pandas as pd
+
+import storage
+
+USER_COLUMNS = [
+    "Name", "Email", "Gender", "AgeRange", "SkillLevel", "Role", "Timestamp",
+    "CanTeach", "WantsToLearn", "StudyDays", "IsMatched",
+]
+CATEGORY_COLUMNS = ["Gender", "AgeRange", "SkillLevel", "Role", "CanTeach", "WantsToLearn"]
+TRUE_VALUES = {"true", "1", "1.0", "yes"}
+# Int16 rather than Int8 so that StudyDays * 30 (minutes) cannot overflow
+STUDY_DAYS_DTYPE = "Int16"
+
+
+def parse_flags(values):
+    """Boolean array from bools, 0/1 or "true"/"false" text; missing is False."""
+    if pd.api.types.is_bool_dtype(values):
+        return values.astype(bool)
+    # Parse each distinct value once
+    codes, uniques = pd.factorize(values)
+    flags = np.array([str(value).strip().lower() in TRUE_VALUES for value in uniques] + [False])
+    return pd.Series(flags[codes], index=values.index)
+
+
+def enforce(df):
+    """``df`` with canonical headers and the users schema dtypes.
+
+    Missing schema columns are added (empty); other columns are kept as they are.
+    """
+    df = storage.canonical_columns("users", df)
+    columns = {col: df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+               for col in USER_COLUMNS}
+
+    typed = {col: columns[col].astype("category") for col in CATEGORY_COLUMNS}
+    typed["IsMatched"] = parse_flags(columns["IsMatched"])
+    typed["Timestamp"] = pd.to_datetime(columns["Timestamp"], errors="coerce", format="ISO8601")
+    days = pd.to_numeric(columns["StudyDays"], errors="coerce")
+    typed["StudyDays"] = days.where(days.between(0, 7)).round().astype(STUDY_DAYS_DTYPE)
+    for col in ("Name", "Email"):
+        typed[col] = columns[col]
+    return df.assign(**typed)
+
+
+def memory_per_user(df):
+    """Bytes per row, counting the Python string objects."""
+    return df.memory_usage(deep=True).sum() / max(len(df), 1)
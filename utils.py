@@ -1,10 +1,9 @@
-
 import pandas as pd
-from constants import USER_FILE
+import storage
 
 def safe_load_users():
     try:
-        users = pd.read_csv(USER_FILE)
+        users = storage.load("users")
         users.fillna("", inplace=True)
         return users
     except Exception as e: